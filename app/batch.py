@@ -0,0 +1,144 @@
+# ---------------------------------------------------------------------------
+# Análise em lote – várias entradas, uma gramática, pool de processos
+# ---------------------------------------------------------------------------
+#
+# O pool (SASC_BATCH_WORKERS processos) é criado uma vez, na subida da API
+# (start_pool), e dividido por todas as requisições.  Cada requisição vira
+# um BatchJob – tudo o que a análise precisa, montado localmente – e as
+# entradas são repartidas em blocos; cada bloco leva o job junto, então
+# requisições simultâneas nunca compartilham estado.
+# ---------------------------------------------------------------------------
+
+import math
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+from app import packed_table
+from app import parsing_algorithm
+from app.shared_tables import SHARED_TABLES
+
+BATCH_WORKERS = int(os.getenv("SASC_BATCH_WORKERS", "0")) or os.cpu_count() or 1
+
+# blocos por worker: equilibra a carga sem serializar o job vezes demais
+_CHUNKS_PER_WORKER = 2
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+class BatchJob(NamedTuple):
+    analysis_type: str
+    tables:        dict | None     # tabelas de string (None no driver rápido)
+    lexer:         object          # app.lexer.Lexer
+    compiled:      object          # CompiledTable / PackedTable / SharedRef / None
+    recovery:      object          # error_recovery.RecoveryTable / None
+    trace:         str
+
+
+def _analyze(job: BatchJob, input: str) -> dict:
+    try:
+        tokens, ids = job.lexer.tokenize(input)
+        if job.compiled is not None:
+            result = packed_table.parse_tables(job.compiled, tokens, ids=ids)
+            return {
+                "ERROR_CODE":   0,
+                "accepted":     result["accepted"],
+                "errors":       result["errors"],
+                "stepsParsing": [],
+            }
+
+        tables = job.tables
+        step_trace = parsing_algorithm.StepTrace(job.trace)
+        if job.analysis_type == "ll1":
+            steps, errors = parsing_algorithm.top_down_algorithm(
+                tables["ll1_table"], tables["start_symbol"], tokens,
+                tables["follow_table"], step_trace
+            )
+        else:
+            steps, errors = parsing_algorithm.bottom_up_algorithm(
+                tables["action_table"], tables["goto_table"], tokens,
+                step_trace, job.recovery
+            )
+        return {
+            "ERROR_CODE":   0,
+            "accepted":     step_trace.accepted,
+            "errors":       errors,
+            "stepsParsing": steps,
+        }
+
+    except Exception as e:
+        return {
+            "ERROR_CODE":   1,
+            "errorMessage": f"Houve um erro! {e}"
+        }
+
+
+def _analyze_chunk(job: BatchJob, inputs: list[str]) -> list[dict]:
+    """Roda num processo do pool; tabelas do store chegam como SharedRef."""
+    job = job._replace(compiled=SHARED_TABLES.resolve(job.compiled))
+    return [_analyze(job, input) for input in inputs]
+
+
+# ---------------------------------------------------------------------------
+# Pool
+# ---------------------------------------------------------------------------
+
+def start_pool() -> ProcessPoolExecutor:
+    """Cria o pool compartilhado (idempotente); chamado na subida da API."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=BATCH_WORKERS)
+        return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(cancel_futures=True)
+
+
+def run_batch(analysis_type: str, tables: dict, inputs: list[str], lexer,
+              compiled=None, recovery=None, trace: str = "none",
+              workers: int | None = None) -> list[dict]:
+    """
+    Analisa `inputs` com as mesmas tabelas; resultados na ordem das entradas.
+
+    `lexer` é o léxico da gramática (app.lexer).  `compiled` (tabelas de
+    compiled_table ou packed_table) é usado quando trace == "none" numa
+    análise LR; `recovery` (error_recovery) evita recalcular os esperados
+    por estado em cada entrada.  `workers` limita quantos processos do pool
+    a requisição usa (no máximo SASC_BATCH_WORKERS); com um só (ou uma só
+    entrada) tudo roda no processo atual, sem passar pelo pool.
+    """
+    if trace not in parsing_algorithm.TRACE_LEVELS:
+        raise ValueError(f"Nível de trace inválido: {trace}")
+    if trace != "none" or analysis_type == "ll1":
+        compiled = None
+
+    job = BatchJob(
+        analysis_type,
+        tables if compiled is None else None,
+        lexer,
+        compiled,
+        recovery if compiled is None else None,
+        trace,
+    )
+    workers = max(1, min(workers or BATCH_WORKERS, BATCH_WORKERS, len(inputs)))
+
+    if workers == 1:
+        return [_analyze(job, input) for input in inputs]
+
+    # tabelas do store compartilhado vão como referência: cada processo do
+    # pool mapeia o mesmo arquivo em vez de receber uma cópia
+    job = job._replace(compiled=SHARED_TABLES.reference(compiled))
+
+    size    = max(1, math.ceil(len(inputs) / (workers * _CHUNKS_PER_WORKER)))
+    pool    = start_pool()
+    futures = [pool.submit(_analyze_chunk, job, inputs[i:i + size])
+               for i in range(0, len(inputs), size)]
+    return [result for future in futures for result in future.result()]
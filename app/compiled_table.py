@@ -0,0 +1,213 @@
+# ---------------------------------------------------------------------------
+# Tabelas LR compiladas (inteiros) + driver rápido
+# ---------------------------------------------------------------------------
+#
+# As tabelas de string ("EMPILHAR[ 3 ]", "REDUZIR[ E -> E + T ]"…) continuam
+# sendo as da UI.  Para executar o parser, elas são compiladas uma vez em
+# vetores densos de inteiros:
+#
+#     action[estado * n_terminais + id_terminal] = (argumento << 2) | tipo
+#     goto[estado * n_nao_terminais + id_nao_terminal] = estado | -1
+#
+# com tipo ∈ {ERROR, SHIFT, REDUCE, ACCEPT}; o argumento é o estado destino
+# (SHIFT) ou o id da produção (REDUCE), cujo tamanho e lado esquerdo ficam
+# em prod_len / prod_lhs.
+# ---------------------------------------------------------------------------
+
+from array import array
+from typing import NamedTuple
+
+from app.error_recovery import (
+    LEXICAL_ERROR_MESSAGE, expected_fragment, message_from_fragment,
+)
+from app.parse_tree import TreeArena
+
+ERROR, SHIFT, REDUCE, ACCEPT = 0, 1, 2, 3
+
+
+class CompiledTable(NamedTuple):
+    terminals:       list[str]        # id -> terminal
+    terminal_ids:    dict[str, int]
+    nonterminals:    list[str]        # id -> não-terminal
+    nonterminal_ids: dict[str, int]
+    n_states:        int
+    action:          array            # n_states × len(terminals)
+    goto:            array            # n_states × len(nonterminals)
+    prod_len:        array
+    prod_lhs:        array            # id do não-terminal
+    productions:     list[str]        # texto "E -> E + T", por id
+    error_fragments: list[str]        # esperados já formatados, por estado
+
+
+# ---------------------------------------------------------------------------
+# Compilação
+# ---------------------------------------------------------------------------
+
+def _cell_argument(cell: str) -> str:
+    """'EMPILHAR[ 3 ]' -> '3'; 'REDUZIR[ E -> T ]' -> 'E -> T'."""
+    return cell[cell.index("[") + 1:cell.rindex("]")].strip()
+
+
+def compile_tables(action_table: dict, goto_table: dict) -> CompiledTable:
+    terminals    = list(action_table)
+    nonterminals = list(goto_table)
+    terminal_ids    = {t: i for i, t in enumerate(terminals)}
+    nonterminal_ids = {nt: i for i, nt in enumerate(nonterminals)}
+    n_states = len(next(iter(action_table.values()), {}))
+
+    n_t, n_nt = len(terminals), len(nonterminals)
+    action = array("i", [ERROR]) * (n_states * n_t)
+    goto   = array("i", [-1]) * (n_states * n_nt)
+
+    productions: list[str] = []
+    production_ids: dict[str, int] = {}
+    prod_len, prod_lhs = array("i"), array("i")
+
+    for t, column in action_table.items():
+        tid = terminal_ids[t]
+        for row, cell in column.items():
+            state = int(row) - 1
+            cell  = cell.strip()
+            if cell.startswith("EMPILHAR"):
+                code = (int(_cell_argument(cell)) << 2) | SHIFT
+            elif cell.startswith("REDUZIR"):
+                text = _cell_argument(cell)
+                if text not in production_ids:
+                    lhs, rhs = text.split("->", 1)
+                    production_ids[text] = len(productions)
+                    productions.append(text)
+                    prod_len.append(len(rhs.split()))
+                    prod_lhs.append(nonterminal_ids[lhs.strip()])
+                code = (production_ids[text] << 2) | REDUCE
+            elif cell == "ACEITO":
+                code = ACCEPT
+            else:
+                code = ERROR
+            action[state * n_t + tid] = code
+
+    for nt, column in goto_table.items():
+        ntid = nonterminal_ids[nt]
+        for row, cell in column.items():
+            parts = cell.split()
+            if len(parts) >= 2:
+                goto[(int(row) - 1) * n_nt + ntid] = int(parts[1])
+
+    compiled = CompiledTable(terminals, terminal_ids, nonterminals,
+                             nonterminal_ids, n_states, action, goto,
+                             prod_len, prod_lhs, productions, [])
+    compiled.error_fragments.extend(
+        expected_fragment(expected_terminals(compiled, state))
+        for state in range(n_states)
+    )
+    return compiled
+
+
+def expected_terminals(compiled: CompiledTable, state: int) -> list[str]:
+    """Terminais com movimento diferente de erro na linha `state`."""
+    n_t  = len(compiled.terminals)
+    base = state * n_t
+    return [
+        compiled.terminals[tid] for tid in range(n_t)
+        if compiled.action[base + tid] != ERROR
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Driver rápido (sem passo-a-passo)
+# ---------------------------------------------------------------------------
+
+def parse_compiled(compiled: CompiledTable, tokens: list[str],
+                   max_steps: int | None = None,
+                   ids: list[int] | None = None,
+                   tree: TreeArena | None = None) -> dict:
+    """
+    Executa o parser LR sobre as tabelas compiladas.
+
+    Mesma recuperação de bottom_up_algorithm (descarta tokens até um que o
+    estado atual aceite), mas sem registrar o passo-a-passo: tempo e memória
+    O(n) no número de tokens, sem limite fixo de iterações.
+
+    A análise desiste – com um erro fatal em `errors` – se houver mais
+    reduções seguidas sem consumir entrada do que uma tabela LR válida
+    permite, ou se `max_steps` (opcional) for excedido.  `ids` (opcional)
+    são os ids dos terminais já calculados pelo léxico (app.lexer).
+
+    Com `tree` (uma TreeArena criada por parse_tree.tree_for), a árvore
+    sintática é montada durante as reduções; tree.root só é definido se o
+    parser chegar à aceitação.  Devolve { accepted, errors, steps } –
+    `accepted` só é True se a entrada pertence à linguagem (aceitação sem
+    nenhum erro recuperado no caminho).
+    """
+    action, goto = compiled.action, compiled.goto
+    prod_len, prod_lhs = compiled.prod_len, compiled.prod_lhs
+    n_t, n_nt = len(compiled.terminals), len(compiled.nonterminals)
+    n_states = compiled.n_states
+    terminal_ids = compiled.terminal_ids
+    fragments = compiled.error_fragments
+
+    tape  = tokens + ["$"]
+    if ids is None:
+        ids = [terminal_ids.get(tok, -1) for tok in tokens]
+    ids   = list(ids) + [terminal_ids.get("$", -1)]
+    end   = len(tape)
+    stack = [0]
+    errors: list[dict] = []
+    pointer = steps = 0
+    reductions, reduction_limit = 0, n_states * 2
+    nodes: list[int] = []     # nós da árvore, paralelos a stack[1:]
+
+    def give_up(message: str) -> dict:
+        errors.append({"index": pointer, "lexeme": tape[pointer],
+                       "message": message})
+        return {"accepted": False, "errors": errors, "steps": steps}
+
+    while True:
+        state = stack[-1]
+        tid   = ids[pointer]
+        code  = action[state * n_t + tid] if tid >= 0 else ERROR
+
+        # descarte de tokens (modo pânico)
+        while code == ERROR:
+            token = tape[pointer]
+            errors.append({
+                "index":   pointer,
+                "lexeme":  token,
+                "message": (message_from_fragment(fragments[state], token)
+                            if tid >= 0 else LEXICAL_ERROR_MESSAGE),
+            })
+            pointer += 1
+            if pointer >= end:
+                return {"accepted": False, "errors": errors, "steps": steps}
+            tid  = ids[pointer]
+            code = action[state * n_t + tid] if tid >= 0 else ERROR
+
+        steps += 1
+        if max_steps is not None and steps > max_steps:
+            return give_up(f"Análise interrompida: limite de {max_steps} "
+                           f"passos excedido.")
+        kind = code & 3
+
+        if kind == SHIFT:
+            stack.append(code >> 2)
+            if tree is not None:
+                nodes.append(tree.leaf(tid, pointer))
+            pointer += 1
+            reductions, reduction_limit = 0, n_states * (len(stack) + 1)
+        elif kind == REDUCE:
+            reductions += 1
+            if reductions > reduction_limit:
+                return give_up("Erro fatal: a análise não termina (ciclo de "
+                               "reduções sem consumir a entrada).")
+            prod = code >> 2
+            size = prod_len[prod]
+            if size:
+                del stack[-size:]
+            if tree is not None:
+                children = nodes[len(nodes) - size:]
+                del nodes[len(nodes) - size:]
+                nodes.append(tree.node(n_t + prod_lhs[prod], children, pointer))
+            stack.append(goto[stack[-1] * n_nt + prod_lhs[prod]])
+        else:  # ACCEPT
+            if tree is not None and nodes:
+                tree.root = nodes[-1]
+            return {"accepted": not errors, "errors": errors, "steps": steps}
@@ -0,0 +1,56 @@
+# ---------------------------------------------------------------------------
+# Informações de erro pré-calculadas por estado (uma vez por tabela)
+# ---------------------------------------------------------------------------
+#
+# Para cada estado LR guarda:
+#   expected  – terminais com movimento diferente de "ERRO!"
+#   fragments – lista de esperados já formatada ("(, id, $")
+#
+# A recuperação (modo pânico) só descarta tokens: cada token que o estado
+# do topo não aceita vira um erro e é pulado, até aparecer um que esteja em
+# expected[estado] – a mesma regra de todos os drivers (compiled_table,
+# packed_table, incremental).  Com isso a recuperação e as mensagens custam
+# O(1) por token descartado, independentemente do número de colunas.
+# Um token que não é terminal da gramática (id LEXICAL_ERROR no léxico)
+# também é descartado, mas com LEXICAL_ERROR_MESSAGE.
+# ---------------------------------------------------------------------------
+
+from typing import NamedTuple
+
+LEXICAL_ERROR_MESSAGE = "Erro léxico: token desconhecido."
+
+
+class RecoveryTable(NamedTuple):
+    expected:  list[frozenset[str]]
+    fragments: list[str]
+
+
+def expected_fragment(expected) -> str:
+    """Lista de esperados em ordem alfabética, com '$' sempre por último."""
+    ordered = sorted(expected, key=lambda s: (s == "$", s))
+    return ", ".join(ordered) if ordered else "$"
+
+
+def message_from_fragment(fragment: str, token: str) -> str:
+    if token == "$":
+        return f"Fim de entrada prematuro. Esperava: {fragment}."
+    return f"Símbolo inesperado '{token}'. Esperava: {fragment}."
+
+
+def error_message(recovery: RecoveryTable, state: int, token: str) -> str:
+    return message_from_fragment(recovery.fragments[state], token)
+
+
+def build_recovery_table(action_table: dict) -> RecoveryTable:
+    n_states = len(next(iter(action_table.values()), {}))
+
+    expected: list[set[str]] = [set() for _ in range(n_states)]
+    for t, column in action_table.items():
+        for row, cell in column.items():
+            if cell != "ERRO!":
+                expected[int(row) - 1].add(t)
+
+    return RecoveryTable(
+        [frozenset(tokens) for tokens in expected],
+        [expected_fragment(tokens) for tokens in expected],
+    )
@@ -0,0 +1,155 @@
+# ---------------------------------------------------------------------------
+# Gramática – leitura da saída de utils.grammar_formatter
+# ---------------------------------------------------------------------------
+
+from typing import NamedTuple
+
+END_MARKER = "$"
+
+
+class Production(NamedTuple):
+    lhs: str
+    rhs: tuple[str, ...]
+
+    def __str__(self) -> str:
+        # mesmo formato exibido pelo smlweb: "E -> E + T" / "A -> "
+        return f"{self.lhs} -> {' '.join(self.rhs)}"
+
+
+class Grammar(NamedTuple):
+    start:        str
+    productions:  list[Production]
+    terminals:    list[str]          # ordem de aparição, sem '$'
+    nonterminals: list[str]          # ordem de aparição dos lados esquerdos
+
+
+def parse_grammar(grammar: str) -> Grammar:
+    """
+    Converte a gramática formatada ("E->E + T.E->T.") em produções.
+
+    • Cada regra termina com '.'; alternativas separadas por '|'.
+    • Alternativa vazia representa a produção ε.
+    • Não-terminais são os símbolos que aparecem à esquerda de '->'.
+    """
+    rules: list[tuple[str, list[list[str]]]] = []
+
+    for rule in grammar.split("."):
+        if not rule.strip():
+            continue
+        if "->" not in rule:
+            raise ValueError(f"Regra sem '->': {rule.strip()}")
+        lhs, rhs = rule.split("->", 1)
+        lhs = lhs.strip()
+        if not lhs:
+            raise ValueError(f"Regra sem lado esquerdo: {rule.strip()}")
+        alternatives = [alt.split() for alt in rhs.split("|")]
+        rules.append((lhs, alternatives))
+
+    if not rules:
+        raise ValueError("Gramática vazia.")
+
+    nonterminals: list[str] = []
+    for lhs, _ in rules:
+        if lhs not in nonterminals:
+            nonterminals.append(lhs)
+
+    productions: list[Production] = []
+    terminals:   list[str]        = []
+    nonterminal_set = set(nonterminals)
+
+    for lhs, alternatives in rules:
+        for alt in alternatives:
+            productions.append(Production(lhs, tuple(alt)))
+            for sym in alt:
+                if sym not in nonterminal_set and sym not in terminals:
+                    terminals.append(sym)
+
+    return Grammar(nonterminals[0], productions, terminals, nonterminals)
+
+
+# ---------------------------------------------------------------------------
+# Conjuntos NULLABLE / FIRST / FOLLOW (iteração de ponto fixo)
+# ---------------------------------------------------------------------------
+
+def nullable_set(grammar: Grammar) -> set[str]:
+    nullable: set[str] = set()
+    changed = True
+    while changed:
+        changed = False
+        for prod in grammar.productions:
+            if prod.lhs not in nullable and all(s in nullable for s in prod.rhs):
+                nullable.add(prod.lhs)
+                changed = True
+    return nullable
+
+
+def first_sets(grammar: Grammar,
+               nullable: set[str] | None = None) -> dict[str, set[str]]:
+    """FIRST de cada não-terminal (ε não entra; use nullable_set)."""
+    if nullable is None:
+        nullable = nullable_set(grammar)
+
+    first: dict[str, set[str]] = {nt: set() for nt in grammar.nonterminals}
+    changed = True
+    while changed:
+        changed = False
+        for prod in grammar.productions:
+            target = first[prod.lhs]
+            before = len(target)
+            for sym in prod.rhs:
+                if sym in first:
+                    target |= first[sym]
+                    if sym not in nullable:
+                        break
+                else:
+                    target.add(sym)
+                    break
+            if len(target) != before:
+                changed = True
+    return first
+
+
+def first_of_sequence(symbols, first: dict[str, set[str]],
+                      nullable: set[str]) -> tuple[set[str], bool]:
+    """Devolve (FIRST da sequência, sequência deriva ε?)."""
+    result: set[str] = set()
+    for sym in symbols:
+        if sym in first:
+            result |= first[sym]
+            if sym not in nullable:
+                return result, False
+        else:
+            result.add(sym)
+            return result, False
+    return result, True
+
+
+def follow_sets(grammar: Grammar,
+                first: dict[str, set[str]] | None = None,
+                nullable: set[str] | None = None) -> dict[str, set[str]]:
+    if nullable is None:
+        nullable = nullable_set(grammar)
+    if first is None:
+        first = first_sets(grammar, nullable)
+
+    follow: dict[str, set[str]] = {nt: set() for nt in grammar.nonterminals}
+    follow[grammar.start].add(END_MARKER)
+
+    changed = True
+    while changed:
+        changed = False
+        for prod in grammar.productions:
+            for i, sym in enumerate(prod.rhs):
+                if sym not in follow:
+                    continue
+                target = follow[sym]
+                before = len(target)
+                rest_first, rest_nullable = first_of_sequence(
+                    prod.rhs[i + 1:], first, nullable
+                )
+                target |= rest_first
+                if rest_nullable:
+                    target |= follow[prod.lhs]
+                if len(target) != before:
+                    changed = True
+    return follow
@@ -0,0 +1,220 @@
+# ---------------------------------------------------------------------------
+# Análise da gramática (NULLABLE / FIRST / FOLLOW / conflitos) com bitsets
+# ---------------------------------------------------------------------------
+#
+# Versão inteira de app.grammar para validar gramáticas antes da análise:
+#
+#   • terminais viram bits (bit t = grammar.terminals[t]; o último é '$');
+#   • NULLABLE é um bitset sobre os não-terminais;
+#   • FIRST[A] / FOLLOW[A] são inteiros Python usados como bitsets, e a
+#     iteração de ponto fixo faz só OR / AND entre eles;
+#   • os sufixos das produções (FIRST do resto + "o resto deriva ε?") são
+#     pré-calculados uma vez, então cada volta do FOLLOW é um OR por aresta.
+#
+# Conflitos LL(1) saem direto dos conjuntos (interseção dos conjuntos de
+# predição das alternativas de cada não-terminal).  Os conflitos LR exigem
+# o autômato de itens e vêm de app.lr_table – ou de quem o chamador passar
+# em `lr_conflicts` (a API lê das tabelas do TABLE_CACHE).  Por padrão só
+# entram ll1, lr0 e slr1 (autômato LR(0), milissegundos); LALR(1) e LR(1)
+# precisam dos fechamentos LR(1) – segundos numa gramática grande – e só
+# são calculados quando pedidos.
+# ---------------------------------------------------------------------------
+
+from typing import NamedTuple
+
+from app import lr_table
+from app.grammar import END_MARKER, Grammar, parse_grammar
+
+ANALYSIS_TYPES = ("ll1",) + lr_table.ANALYSIS_TYPES
+DEFAULT_ANALYSIS_TYPES = ("ll1", "lr0", "slr1")
+
+
+class GrammarSets(NamedTuple):
+    grammar:      Grammar
+    columns:      list[str]           # bit → terminal (grammar.terminals + '$')
+    prod_rhs:     list[list[int]]     # símbolos por produção (ver _encode)
+    prod_lhs:     list[int]
+    nullable:     int                 # bit i = nonterminals[i] deriva ε
+    first:        list[int]           # por não-terminal
+    follow:       list[int]           # por não-terminal
+    predict:      list[int]           # por produção (LL(1))
+
+
+# ---------------------------------------------------------------------------
+# Codificação em ids inteiros
+#   símbolo >= 0  → terminal (bit do terminal)
+#   símbolo <  0  → não-terminal ~id
+# ---------------------------------------------------------------------------
+
+def _encode(grammar: Grammar) -> tuple[list[int], list[list[int]]]:
+    terminal_ids    = {t: i for i, t in enumerate(grammar.terminals)}
+    nonterminal_ids = {nt: i for i, nt in enumerate(grammar.nonterminals)}
+    prod_lhs = [nonterminal_ids[p.lhs] for p in grammar.productions]
+    prod_rhs = [
+        [~nonterminal_ids[s] if s in nonterminal_ids else terminal_ids[s]
+         for s in p.rhs]
+        for p in grammar.productions
+    ]
+    return prod_lhs, prod_rhs
+
+
+def _sequence_first(symbols, first: list[int], nullable: int) -> tuple[int, bool]:
+    """(FIRST da sequência como bitset, sequência deriva ε?)."""
+    bits = 0
+    for sym in symbols:
+        if sym >= 0:
+            return bits | 1 << sym, False
+        bits |= first[~sym]
+        if not nullable >> ~sym & 1:
+            return bits, False
+    return bits, True
+
+
+# ---------------------------------------------------------------------------
+# Conjuntos
+# ---------------------------------------------------------------------------
+
+def compute_sets(grammar: str | Grammar) -> GrammarSets:
+    """Conjuntos da gramática formatada (utils.grammar_formatter)."""
+    parsed = parse_grammar(grammar) if isinstance(grammar, str) else grammar
+    prod_lhs, prod_rhs = _encode(parsed)
+    n_nt = len(parsed.nonterminals)
+    end_bit = 1 << len(parsed.terminals)
+
+    # NULLABLE: só produções sem terminais podem derivar ε
+    candidates = [
+        (lhs, rhs) for lhs, rhs in zip(prod_lhs, prod_rhs)
+        if all(sym < 0 for sym in rhs)
+    ]
+    nullable, changed = 0, True
+    while changed:
+        changed = False
+        for lhs, rhs in candidates:
+            if not nullable >> lhs & 1 and all(nullable >> ~s & 1 for s in rhs):
+                nullable |= 1 << lhs
+                changed = True
+
+    # FIRST
+    first = [0] * n_nt
+    changed = True
+    while changed:
+        changed = False
+        for lhs, rhs in zip(prod_lhs, prod_rhs):
+            bits, _ = _sequence_first(rhs, first, nullable)
+            if bits & ~first[lhs]:
+                first[lhs] |= bits
+                changed = True
+
+    # FOLLOW: FOLLOW[B] ⊇ FIRST(β) para A -> α B β (fixo) e
+    #         FOLLOW[B] ⊇ FOLLOW[A] se β deriva ε (aresta A → B)
+    follow = [0] * n_nt
+    follow[prod_lhs[0]] |= end_bit
+    edges: set[tuple[int, int]] = set()
+    for lhs, rhs in zip(prod_lhs, prod_rhs):
+        rest, rest_nullable = 0, True          # FIRST / ε do sufixo, de trás p/ frente
+        for sym in reversed(rhs):
+            if sym < 0:
+                follow[~sym] |= rest
+                if rest_nullable and ~sym != lhs:
+                    edges.add((lhs, ~sym))
+                rest = (rest if nullable >> ~sym & 1 else 0) | first[~sym]
+                rest_nullable = rest_nullable and bool(nullable >> ~sym & 1)
+            else:
+                rest, rest_nullable = 1 << sym, False
+    changed = True
+    while changed:
+        changed = False
+        for source, target in edges:
+            if follow[source] & ~follow[target]:
+                follow[target] |= follow[source]
+                changed = True
+
+    predict = []
+    for lhs, rhs in zip(prod_lhs, prod_rhs):
+        bits, derives_empty = _sequence_first(rhs, first, nullable)
+        predict.append(bits | follow[lhs] if derives_empty else bits)
+
+    return GrammarSets(parsed, parsed.terminals + [END_MARKER], prod_rhs,
+                       prod_lhs, nullable, first, follow, predict)
+
+
+def bits_to_symbols(bits: int, columns: list[str]) -> list[str]:
+    symbols = []
+    while bits:
+        low = bits & -bits
+        symbols.append(columns[low.bit_length() - 1])
+        bits ^= low
+    return symbols
+
+
+# ---------------------------------------------------------------------------
+# Conflitos
+# ---------------------------------------------------------------------------
+
+def ll1_conflicts(sets: GrammarSets) -> list[str]:
+    """
+    Uma entrada por célula disputada, como em ll_table.build_ll1_table:
+    "M[A, a]: A -> α / A -> β" (todas as produções da célula).
+    """
+    productions = sets.grammar.productions
+    by_lhs: dict[int, dict] = {}             # produções repetidas contam uma vez
+    for index, lhs in enumerate(sets.prod_lhs):
+        by_lhs.setdefault(lhs, {}).setdefault(productions[index], index)
+
+    conflicts: list[str] = []
+    for lhs, unique in by_lhs.items():
+        alternatives = list(unique.values())
+        seen = disputed = 0
+        for p in alternatives:
+            disputed |= seen & sets.predict[p]
+            seen     |= sets.predict[p]
+        while disputed:
+            bit = disputed & -disputed
+            disputed ^= bit
+            cell = " / ".join(str(productions[p]) for p in alternatives
+                              if sets.predict[p] & bit)
+            conflicts.append(f"M[{sets.grammar.nonterminals[lhs]}, "
+                             f"{sets.columns[bit.bit_length() - 1]}]: {cell}")
+    return conflicts
+
+
+def _build_lr_conflicts(grammar: str, analysis_type: str) -> list[str]:
+    return lr_table.build_lr_tables(grammar, analysis_type).conflicts
+
+
+def conflicts(grammar: str, sets: GrammarSets, analysis_type: str,
+              lr_conflicts=_build_lr_conflicts) -> list[str]:
+    if analysis_type == "ll1":
+        return ll1_conflicts(sets)
+    if analysis_type not in lr_table.ANALYSIS_TYPES:
+        raise ValueError(f"Tipo de análise desconhecido: {analysis_type}")
+    return lr_conflicts(grammar, analysis_type)
+
+
+def analyze_grammar(grammar: str, analysis_types=DEFAULT_ANALYSIS_TYPES,
+                    lr_conflicts=_build_lr_conflicts) -> dict:
+    """
+    Relatório da gramática formatada: NULLABLE, FIRST, FOLLOW e, para cada
+    tipo de `analysis_types`, a lista de conflitos (vazia = a gramática é
+    daquela classe).  `lr_conflicts(grammar, analysis_type)` fornece os
+    conflitos LR (padrão: gera as tabelas com app.lr_table).
+    """
+    sets = compute_sets(grammar)
+    nonterminals, columns = sets.grammar.nonterminals, sets.columns
+    report = {
+        analysis_type: conflicts(grammar, sets, analysis_type, lr_conflicts)
+        for analysis_type in analysis_types
+    }
+    return {
+        "start":        sets.grammar.start,
+        "terminals":    sets.grammar.terminals,
+        "nonterminals": nonterminals,
+        "nullable":     [nt for i, nt in enumerate(nonterminals)
+                         if sets.nullable >> i & 1],
+        "first":        {nt: bits_to_symbols(sets.first[i], columns)
+                         for i, nt in enumerate(nonterminals)},
+        "follow":       {nt: bits_to_symbols(sets.follow[i], columns)
+                         for i, nt in enumerate(nonterminals)},
+        "conflicts":    report,
+        "valid":        {t: not c for t, c in report.items()},
+    }
@@ -0,0 +1,141 @@
+# ---------------------------------------------------------------------------
+# Registro de gramáticas pré-compiladas
+# ---------------------------------------------------------------------------
+#
+# POST /grammars normaliza a gramática, gera as tabelas uma única vez e
+# guarda tudo sob um ID derivado do conteúdo (mesma gramática + tipo →
+# mesmo ID, em qualquer instância).  As rotas que recebem o ID não fazem
+# nenhum trabalho de gramática: só passam a entrada pelo léxico da
+# gramática (app.lexer) e rodam o parser.
+#
+# O registro é um LRU em memória (SASC_REGISTRY_SIZE).  Com um diretório
+# configurado – SASC_REGISTRY_DIR ou, sem ele, sasc-grammars dentro de
+# SASC_CACHE_DIR – cada ID grava também o texto da gramática e o tipo de
+# análise (<id>.json, poucos bytes; o diretório é criado no primeiro
+# registro).  Um ID ausente da memória (registrado por outro worker, ou
+# expirado no LRU) é reconstruído a partir desse arquivo por quem o
+# consultar (main._registered): o ID vale enquanto o arquivo existir.  Sem
+# diretório, o ID só vale no worker que o registrou e enquanto estiver no
+# LRU – com vários workers, configure um dos dois.
+# ---------------------------------------------------------------------------
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+from app.compiled_table import CompiledTable
+from app.error_recovery import RecoveryTable
+from app.lexer import Lexer
+from app.packed_table import PackedTable
+
+from app.table_cache import CACHE_DIR
+
+REGISTRY_SIZE = int(os.getenv("SASC_REGISTRY_SIZE", "1024"))
+REGISTRY_DIR  = os.getenv("SASC_REGISTRY_DIR") or (
+    os.path.join(CACHE_DIR, "sasc-grammars") if CACHE_DIR else None
+)
+
+_ID_RE = re.compile(r"[0-9a-f]{16}\Z")
+
+
+class RegisteredGrammar(NamedTuple):
+    grammar_id:    str
+    analysis_type: str
+    grammar:       str                     # já formatada (grammar_formatter)
+    productions:   list[str]
+    tables:        dict                    # mesmo formato de get_goto_action_tables
+    compiled:      CompiledTable | PackedTable | None  # None para "ll1"
+    recovery:      RecoveryTable | None    # None para "ll1"
+    lexer:         Lexer
+
+
+def grammar_id(formatted_grammar: str, analysis_type: str) -> str:
+    """ID estável: hash do tipo de análise + gramática já formatada."""
+    return hashlib.sha256(
+        f"{analysis_type}\n{formatted_grammar}".encode()
+    ).hexdigest()[:16]
+
+
+class GrammarRegistry:
+    def __init__(self, maxsize: int = REGISTRY_SIZE,
+                 directory: str | None = REGISTRY_DIR):
+        self.maxsize   = maxsize
+        self.directory = directory
+        self._entries: OrderedDict[str, RegisteredGrammar] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def register(self, formatted_grammar: str, analysis_type: str, tables: dict,
+                 lexer: Lexer,
+                 compiled: CompiledTable | PackedTable | None = None,
+                 recovery: RecoveryTable | None = None) -> RegisteredGrammar:
+        entry = RegisteredGrammar(
+            grammar_id(formatted_grammar, analysis_type),
+            analysis_type,
+            formatted_grammar,
+            formatted_grammar.split(".")[:-1],
+            tables,
+            compiled,
+            recovery,
+            lexer,
+        )
+        with self._lock:
+            self._entries[entry.grammar_id] = entry
+            self._entries.move_to_end(entry.grammar_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        self._save(entry)
+        return entry
+
+    def get(self, grammar_id: str) -> RegisteredGrammar:
+        with self._lock:
+            if grammar_id not in self._entries:
+                raise LookupError(f"Gramática não registrada: {grammar_id}")
+            self._entries.move_to_end(grammar_id)
+            return self._entries[grammar_id]
+
+    def source(self, grammar_id: str) -> tuple[str, str]:
+        """
+        (gramática formatada, tipo de análise) gravados para o ID – para
+        reconstruir uma entrada que não está na memória deste processo.
+        """
+        path = self._path(grammar_id)
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            return data["grammar"], data["analysis_type"]
+        except (OSError, ValueError, KeyError, TypeError):
+            raise LookupError(f"Gramática não registrada: {grammar_id}") from None
+
+    # -----------------------------------------------------------------------
+    # Persistência
+    # -----------------------------------------------------------------------
+    def _path(self, grammar_id: str) -> str:
+        if not self.directory or not _ID_RE.match(grammar_id):
+            raise LookupError(f"Gramática não registrada: {grammar_id}")
+        return os.path.join(self.directory, f"{grammar_id}.json")
+
+    def _save(self, entry: RegisteredGrammar) -> None:
+        if not self.directory or os.path.exists(self._path(entry.grammar_id)):
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        except OSError:
+            return                  # sem disco, o ID continua valendo em memória
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"grammar": entry.grammar,
+                           "analysis_type": entry.analysis_type},
+                          f, ensure_ascii=False)
+            os.replace(tmp, self._path(entry.grammar_id))
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+
+GRAMMARS = GrammarRegistry()
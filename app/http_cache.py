@@ -0,0 +1,166 @@
+# ---------------------------------------------------------------------------
+# Cache HTTP das rotas GET determinísticas (ETag / 304 / compressão)
+# ---------------------------------------------------------------------------
+#
+#   • o corpo é serializado com orjson (OPT_NON_STR_KEYS: as tabelas têm
+#     chaves inteiras) – json da biblioteca padrão se orjson faltar;
+#   • ETag fraco = hash do corpo; o último ETag de cada URL fica guardado
+#     (ETAGS), então um If-None-Match igual responde 304 antes de qualquer
+#     trabalho de gramática ou análise;
+#   • Cache-Control: public, max-age=SASC_HTTP_MAX_AGE nas respostas de
+#     sucesso, no-store nas de erro;
+#   • br (se o pacote brotli estiver instalado) ou gzip conforme o
+#     Accept-Encoding, para corpos a partir de SASC_COMPRESS_MIN_SIZE bytes.
+# ---------------------------------------------------------------------------
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from fastapi import Request, Response
+
+try:
+    import orjson
+except ImportError:           # pragma: no cover - orjson faz parte do requirements
+    orjson = None
+
+try:
+    import brotli
+except ImportError:           # opcional: sem ele só há gzip
+    brotli = None
+
+MAX_AGE           = int(os.getenv("SASC_HTTP_MAX_AGE", "3600"))
+COMPRESS_MIN_SIZE = int(os.getenv("SASC_COMPRESS_MIN_SIZE", "1024"))
+ETAG_CACHE_SIZE   = int(os.getenv("SASC_ETAG_CACHE_SIZE", "4096"))
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+def dumps(payload) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, ensure_ascii=False,
+                      separators=(",", ":")).encode()
+
+
+def etag(body: bytes) -> str:
+    return f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def request_key(request: Request) -> str:
+    """URL canônica (caminho + parâmetros ordenados) da requisição."""
+    query = sorted(request.query_params.multi_items())
+    return f"{request.url.path}?{query}"
+
+
+class ETagStore:
+    """LRU URL → último ETag servido (sucessos apenas)."""
+
+    def __init__(self, maxsize: int = ETAG_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: str) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+ETAGS = ETagStore()
+
+
+# ---------------------------------------------------------------------------
+# Negociação
+# ---------------------------------------------------------------------------
+
+def _matches(if_none_match: str | None, tag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = tag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque
+               for candidate in if_none_match.split(","))
+
+
+def _encoding(accept_encoding: str) -> str | None:
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+def _cache_headers(tag: str) -> dict:
+    return {
+        "ETag":          tag,
+        "Cache-Control": f"public, max-age={MAX_AGE}",
+        "Vary":          "Accept-Encoding",
+    }
+
+
+# ---------------------------------------------------------------------------
+# Respostas
+# ---------------------------------------------------------------------------
+
+def not_modified(request: Request) -> Response | None:
+    """304 se o cliente já tem a última versão desta URL; senão None."""
+    tag = ETAGS.get(request_key(request))
+    if tag is None or not _matches(request.headers.get("if-none-match"), tag):
+        return None
+    return Response(status_code=304, headers=_cache_headers(tag))
+
+
+def json_response(request: Request, payload: dict, cacheable: bool = True,
+                  headers: dict | None = None) -> Response:
+    """
+    Corpo JSON (orjson) com ETag / Cache-Control quando `cacheable` e
+    comprimido conforme o Accept-Encoding.
+    """
+    body = dumps(payload)
+    response_headers = dict(headers or {})
+
+    if cacheable:
+        tag = etag(body)
+        ETAGS.put(request_key(request), tag)
+        response_headers.update(_cache_headers(tag))
+        if _matches(request.headers.get("if-none-match"), tag):
+            return Response(status_code=304, headers=response_headers)
+    else:
+        response_headers["Cache-Control"] = "no-store"
+
+    if len(body) >= COMPRESS_MIN_SIZE:
+        encoding = _encoding(request.headers.get("accept-encoding", ""))
+        if encoding == "br":
+            body = brotli.compress(body, quality=5)
+        elif encoding == "gzip":
+            body = gzip.compress(body, compresslevel=6)
+        if encoding:
+            response_headers["Content-Encoding"] = encoding
+        response_headers.setdefault("Vary", "Accept-Encoding")
+
+    return Response(content=body, media_type=JSON_MEDIA_TYPE,
+                    headers=response_headers)
@@ -0,0 +1,256 @@
+# ---------------------------------------------------------------------------
+# Re-análise incremental (editores ao vivo)
+# ---------------------------------------------------------------------------
+#
+# Uma ParseSession guarda, para cada posição de token, o checkpoint da pilha
+# do parser no momento em que aquele token passa a ser o atual.  A pilha é
+# persistente (nós encadeados (estado, anterior, altura)), então cada checkpoint
+# custa O(1) e as pilhas antigas e novas compartilham a base.
+#
+# Numa edição (offset, tamanho removido, texto novo):
+#   1. re-tokeniza só a partir do primeiro token afetado, até reencontrar um
+#      token antigo (deslocado) fora da região editada;
+#   2. retoma o parser do checkpoint anterior à mudança;
+#   3. para assim que, já na cauda reaproveitada, a pilha volta a coincidir
+#      com a da análise anterior – dali em diante o resultado é o mesmo.
+#
+# Assim o trabalho de léxico e de análise é proporcional ao tamanho da
+# edição, não do documento.  Trabalha sobre as tabelas LR compiladas
+# (compiled_table) e o léxico da gramática (app.lexer), com a mesma
+# recuperação de erros do driver rápido.
+# ---------------------------------------------------------------------------
+
+import uuid
+from bisect import bisect_left
+from collections import OrderedDict
+
+from app.compiled_table import ACCEPT, ERROR, REDUCE, SHIFT, CompiledTable
+from app.error_recovery import LEXICAL_ERROR_MESSAGE, message_from_fragment
+from app.lexer import Lexer
+
+MAX_SESSIONS = 1_000
+
+_BOTTOM = (0, None, 1)   # pilha inicial: só o estado 0
+
+
+def _same_stack(a, b) -> bool:
+    """Compara duas pilhas persistentes (rápido quando compartilham a base)."""
+    while a is not b:
+        if a is None or b is None or a[0] != b[0]:
+            return False
+        a, b = a[1], b[1]
+    return True
+
+
+class ParseSession:
+    def __init__(self, compiled: CompiledTable, lexer: Lexer, text: str):
+        self.compiled = compiled
+        self.lexer    = lexer
+        self.text     = text
+
+        # tokens em listas paralelas; o índice len(tokens) é o '$'
+        self.starts:  list[int] = []
+        self.lexemes: list[str] = []
+        self.ids:     list[int] = []
+        for token in lexer.scan(text):
+            self.starts.append(token.offset)
+            self.lexemes.append(token.lexeme)
+            self.ids.append(token.id)
+
+        self.checkpoints: list = []              # pilha antes de cada token
+        self.errors_at:   list = []              # erros por token (ou None)
+        self.accepted     = False
+        self.reparsed     = 0                    # tokens re-analisados na última vez
+
+        self._parse_from(0, _BOTTOM, None)
+
+    # -----------------------------------------------------------------------
+    # Edição
+    # -----------------------------------------------------------------------
+    def edit(self, offset: int, length: int, text: str) -> None:
+        """Substitui text[offset:offset + length] por `text` e re-analisa."""
+        if not (0 <= offset <= len(self.text) and 0 <= length <= len(self.text) - offset):
+            raise ValueError("Edição fora dos limites do documento.")
+
+        new_text = self.text[:offset] + text + self.text[offset + length:]
+        delta    = len(text) - length
+        edit_end = offset + len(text)            # fim da região editada (novo texto)
+        n        = len(self.starts)
+
+        # primeiro token afetado: o primeiro que termina em/após o offset
+        # (um token que termina exatamente no offset pode se fundir ao texto
+        # novo); recua mais um, pois "1." seguido de "5" vira "1.5" e "<"
+        # seguido de "=" pode virar "<="
+        first = max(self._first_affected(offset) - 1, 0)
+        relex_from = min(self.starts[first] if first < n else offset, offset)
+
+        # cauda reaproveitável: tokens antigos que começam depois da região removida
+        tail = bisect_left(self.starts, offset + length)
+
+        mid_starts, mid_lexemes, mid_ids = [], [], []
+        for token in self.lexer.scan(new_text, pos=relex_from):
+            start = token.offset
+            while tail < n and self.starts[tail] + delta < start:
+                tail += 1
+            if (start >= edit_end and tail < n
+                    and self.starts[tail] + delta == start
+                    and self.lexemes[tail] == token.lexeme):
+                break                             # léxico ressincronizado
+            mid_starts.append(start)
+            mid_lexemes.append(token.lexeme)
+            mid_ids.append(token.id)
+        else:
+            tail = n
+
+        old = (self.checkpoints, self.errors_at, self.accepted,
+               first + len(mid_starts), tail - first - len(mid_starts))
+
+        self.text    = new_text
+        self.starts  = (self.starts[:first] + mid_starts
+                        + [s + delta for s in self.starts[tail:]])
+        self.lexemes = self.lexemes[:first] + mid_lexemes + self.lexemes[tail:]
+        self.ids     = self.ids[:first] + mid_ids + self.ids[tail:]
+
+        resume = min(first, len(self.checkpoints) - 1)
+        self._parse_from(resume, self.checkpoints[resume], old)
+
+    def _first_affected(self, offset: int) -> int:
+        """Índice do primeiro token cujo fim é >= offset."""
+        lo, hi = 0, len(self.starts)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.starts[mid] + len(self.lexemes[mid]) < offset:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    # -----------------------------------------------------------------------
+    # Parser com checkpoints
+    # -----------------------------------------------------------------------
+    def _parse_from(self, index: int, node, old) -> None:
+        """
+        Analisa a partir do token `index` com a pilha `node`.  `old` =
+        (checkpoints, errors_at, accepted, sync_from, shift) da análise
+        anterior: a partir do token novo `sync_from`, o token j corresponde
+        ao token antigo j + shift.
+        """
+        compiled = self.compiled
+        action, goto = compiled.action, compiled.goto
+        prod_len, prod_lhs = compiled.prod_len, compiled.prod_lhs
+        fragments = compiled.error_fragments
+        n_t, n_nt = len(compiled.terminals), len(compiled.nonterminals)
+        end_id = compiled.terminal_ids.get("$", -1)
+
+        ids, last = self.ids, len(self.ids)       # last = posição do '$'
+        checkpoints = self.checkpoints[:index]
+        errors_at   = self.errors_at[:index]
+        accepted    = False
+        j = index
+
+        while j <= last:
+            if old is not None and j >= old[3]:
+                old_checkpoints, old_errors, old_accepted, _, shift = old
+                k = j + shift
+                if k < len(old_checkpoints) and _same_stack(node, old_checkpoints[k]):
+                    checkpoints.extend(old_checkpoints[k:])
+                    errors_at.extend(old_errors[k:])
+                    accepted = old_accepted
+                    break
+
+            checkpoints.append(node)
+            tid = ids[j] if j < last else end_id
+            errors = None
+            reductions, limit = 0, compiled.n_states * (node[2] + 1)
+
+            while True:
+                code = action[node[0] * n_t + tid] if tid >= 0 else ERROR
+                kind = code & 3
+                if code == ERROR:
+                    lexeme = self.lexemes[j] if j < last else "$"
+                    errors = [message_from_fragment(fragments[node[0]], lexeme)
+                              if tid >= 0 else LEXICAL_ERROR_MESSAGE]
+                    break
+                if kind == SHIFT:
+                    node = (code >> 2, node, node[2] + 1)
+                    break
+                if kind == REDUCE:
+                    reductions += 1
+                    if reductions > limit:
+                        errors = ["Erro fatal: a análise não termina (ciclo de "
+                                  "reduções sem consumir a entrada)."]
+                        break
+                    prod = code >> 2
+                    for _ in range(prod_len[prod]):
+                        node = node[1]
+                    node = (goto[node[0] * n_nt + prod_lhs[prod]], node, node[2] + 1)
+                    continue
+                if kind == ACCEPT:
+                    accepted = True
+                    break
+
+            errors_at.append(errors)
+            if accepted or (errors and errors[0].startswith("Erro fatal")):
+                break
+            j += 1
+
+        self.reparsed    = j - index
+        self.checkpoints = checkpoints
+        self.errors_at   = errors_at
+        self.accepted    = accepted
+
+    # -----------------------------------------------------------------------
+    # Resultado
+    # -----------------------------------------------------------------------
+    def errors(self) -> list[dict]:
+        result = []
+        n = len(self.lexemes)
+        for index, messages in enumerate(self.errors_at):
+            if not messages:
+                continue
+            for message in messages:
+                result.append({
+                    "index":   index,
+                    "offset":  self.starts[index] if index < n else len(self.text),
+                    "lexeme":  self.lexemes[index] if index < n else "$",
+                    "message": message,
+                })
+        return result
+
+    def result(self) -> dict:
+        return {
+            "accepted":       self.accepted and not any(self.errors_at),
+            "errors":         self.errors(),
+            "tokens":         len(self.lexemes),
+            "reparsedTokens": self.reparsed,
+        }
+
+
+# ---------------------------------------------------------------------------
+# Sessões em memória (LRU)
+# ---------------------------------------------------------------------------
+
+class SessionStore:
+    def __init__(self, maxsize: int = MAX_SESSIONS):
+        self.maxsize = maxsize
+        self._sessions: OrderedDict[str, ParseSession] = OrderedDict()
+
+    def create(self, compiled: CompiledTable, lexer: Lexer,
+               text: str) -> tuple[str, ParseSession]:
+        session_id = uuid.uuid4().hex
+        self._sessions[session_id] = ParseSession(compiled, lexer, text)
+        while len(self._sessions) > self.maxsize:
+            self._sessions.popitem(last=False)
+        return session_id, self._sessions[session_id]
+
+    def get(self, session_id: str) -> ParseSession:
+        if session_id not in self._sessions:
+            raise LookupError(f"Sessão inexistente: {session_id}")
+        self._sessions.move_to_end(session_id)
+        return self._sessions[session_id]
+
+    def delete(self, session_id: str) -> None:
+        self._sessions.pop(session_id, None)
+
+
+SESSIONS = SessionStore()
@@ -0,0 +1,152 @@
+# ---------------------------------------------------------------------------
+# Léxico compilado por gramática
+# ---------------------------------------------------------------------------
+#
+# Em vez do TOKEN_RE genérico, cada gramática ganha um léxico montado a
+# partir dos seus terminais (sep_terminals_nonterminals):
+#
+#   • identificadores e números saem inteiros (maior casamento): "iffy" é
+#     um identificador mesmo que "if" seja palavra-chave;
+#   • uma palavra que é terminal da gramática vira aquele terminal
+#     (palavras-chave / "id", "and_symbol"…);
+#   • os demais terminais (operadores, pontuação) são tentados do mais longo
+#     para o mais curto ("<<=" antes de "<<" antes de "<");
+#   • os símbolos de utils.SYMBOLS ("(", "&"…) viram o terminal-placeholder
+#     correspondente quando a gramática usa o placeholder;
+#   • qualquer outro caractere vira um token de erro léxico (id -1), na
+#     posição em que aparece, em vez de sumir silenciosamente.
+#
+# Cada token já sai com o id inteiro do terminal (o mesmo de
+# compiled_table / packed_table), e textos grandes podem ser lidos aos
+# pedaços com scan_chunks – ou, já em bytes UTF-8 (um arquivo mapeado com
+# mmap), com scan_bytes, cujos offsets são posições em bytes.
+# ---------------------------------------------------------------------------
+
+import re
+from functools import lru_cache
+from typing import Iterable, Iterator, NamedTuple
+
+from app import utils
+
+LEXICAL_ERROR = -1
+
+_WORD_RE = re.compile(r"[A-Za-z_][A-Za-z_0-9]*\Z")
+
+_ANY_SYMBOL = r"\S"
+
+
+@lru_cache(maxsize=64)
+def _bytes_pattern(source: str) -> re.Pattern:
+    """Versão em bytes do padrão do léxico (UTF-8)."""
+    # um caractere não-ASCII fora dos terminais vira UM erro léxico, não um
+    # por byte da sequência UTF-8
+    return re.compile(source.removesuffix(_ANY_SYMBOL).encode()
+                      + rb"[\xc0-\xff][\x80-\xbf]*|\S")
+
+
+class Token(NamedTuple):
+    terminal: str          # nome do terminal (o que as tabelas conhecem)
+    lexeme:   str          # texto original
+    offset:   int          # posição do 1º caractere no texto
+    id:       int          # id do terminal ou LEXICAL_ERROR
+
+
+class Lexer(NamedTuple):
+    pattern:      re.Pattern
+    terminal_ids: dict[str, int]       # terminal → id
+    aliases:      dict[str, str]       # texto → terminal (utils.SYMBOLS)
+    margin:       int                  # maior literal (para scan_chunks)
+
+    # -----------------------------------------------------------------------
+    # Varredura
+    # -----------------------------------------------------------------------
+    def scan(self, text: str, offset: int = 0, pos: int = 0) -> Iterator[Token]:
+        """
+        Tokens de `text`, um a um, a partir da posição `pos`; `offset` é
+        somado às posições.
+        """
+        terminal_ids, aliases = self.terminal_ids, self.aliases
+        for m in self.pattern.finditer(text, pos):
+            lexeme   = m.group()
+            terminal = aliases.get(lexeme, lexeme)
+            yield Token(terminal, lexeme, m.start() + offset,
+                        terminal_ids.get(terminal, LEXICAL_ERROR))
+
+    def scan_chunks(self, chunks: Iterable[str]) -> Iterator[Token]:
+        """
+        Igual a scan, mas lendo o texto aos pedaços (arquivos grandes).
+        Tokens que encostam no fim do pedaço – e que poderiam continuar no
+        próximo – só são emitidos depois que o pedaço seguinte chega.
+        """
+        pending, base = "", 0
+        for chunk in chunks:
+            buffer = pending + chunk
+            safe   = len(buffer) - self.margin
+            resume = 0
+            for m in self.pattern.finditer(buffer):
+                if m.end() > safe:
+                    break
+                lexeme   = m.group()
+                terminal = self.aliases.get(lexeme, lexeme)
+                yield Token(terminal, lexeme, m.start() + base,
+                            self.terminal_ids.get(terminal, LEXICAL_ERROR))
+                resume = m.end()
+            pending = buffer[resume:]
+            base   += resume
+        yield from self.scan(pending, base)
+
+    def scan_bytes(self, data) -> Iterator[Token]:
+        """
+        Tokens de `data` (bytes UTF-8 ou qualquer buffer – ex.: um mmap),
+        sob demanda e sem decodificar o texto inteiro; `offset` é a
+        posição do token em bytes.
+        """
+        terminal_ids, aliases = self.terminal_ids, self.aliases
+        for m in _bytes_pattern(self.pattern.pattern).finditer(data):
+            lexeme   = m.group().decode("utf-8", "replace")
+            terminal = aliases.get(lexeme, lexeme)
+            yield Token(terminal, lexeme, m.start(),
+                        terminal_ids.get(terminal, LEXICAL_ERROR))
+
+    def tokenize(self, text: str) -> tuple[list[str], list[int]]:
+        """(terminais, ids) – entrada pronta para os drivers."""
+        terminals, ids = [], []
+        for token in self.scan(text):
+            terminals.append(token.terminal)
+            ids.append(token.id)
+        return terminals, ids
+
+
+# ---------------------------------------------------------------------------
+# Construção
+# ---------------------------------------------------------------------------
+
+def build_lexer(terminals: Iterable[str],
+                terminal_ids: dict[str, int] | None = None) -> Lexer:
+    """
+    `terminals` vem de sep_terminals_nonterminals; `terminal_ids` deve ser o
+    mapeamento das tabelas compiladas (CompiledTable.terminal_ids) quando
+    houver – senão os ids seguem a ordem de `terminals`.
+    """
+    terminals = [t for t in terminals if t != "$"]
+    if terminal_ids is None:
+        terminal_ids = {t: i for i, t in enumerate(terminals)}
+
+    aliases = {
+        symbol: placeholder for symbol, placeholder in utils.SYMBOLS.items()
+        if placeholder in terminal_ids and symbol not in terminal_ids
+    }
+    literals = {t for t in terminals if not _WORD_RE.match(t)} | set(aliases)
+
+    alternatives = [
+        *(re.escape(t) for t in sorted(literals, key=lambda t: (-len(t), t))),
+        r"[A-Za-z_][A-Za-z_0-9]*",                      # palavras
+        r"\d+\.\d+|\d+",                               # números
+        _ANY_SYMBOL,                                    # erro léxico
+    ]
+    return Lexer(
+        re.compile("|".join(alternatives)),
+        {t: i for t, i in terminal_ids.items() if t != "$"},
+        aliases,
+        max((len(t) for t in literals), default=1) + 1,
+    )
@@ -0,0 +1,63 @@
+# ---------------------------------------------------------------------------
+# Geração local da tabela LL(1) (análise preditiva – top-down)
+# ---------------------------------------------------------------------------
+#
+#     ll1_table[terminal][nao_terminal] = "E -> T R" | "ERRO!"
+#
+# Mesma orientação das tabelas LR (coluna = símbolo de entrada), para que a
+# UI desenhe as duas da mesma forma.
+# ---------------------------------------------------------------------------
+
+from typing import NamedTuple
+
+from app.grammar import (
+    END_MARKER, first_of_sequence, first_sets, follow_sets, nullable_set,
+    parse_grammar,
+)
+
+
+class LL1Table(NamedTuple):
+    ll1_table:    dict[str, dict[str, str]]
+    start_symbol: str
+    follow_table: dict[str, list[str]]   # usado na sincronização (modo pânico)
+    conflicts:    list[str]
+
+
+def build_ll1_table(grammar: str) -> LL1Table:
+    """
+    Preenche M[A, a] com A -> α para cada a em FIRST(α) e, se α deriva ε,
+    para cada a em FOLLOW(A).  Em conflito permanece a produção declarada
+    primeiro; o conflito é listado em `conflicts`.
+    """
+    parsed   = parse_grammar(grammar)
+    nullable = nullable_set(parsed)
+    first    = first_sets(parsed, nullable)
+    follow   = follow_sets(parsed, first, nullable)
+
+    columns = parsed.terminals + [END_MARKER]
+    table: dict[str, dict[str, str]] = {
+        t: {nt: "ERRO!" for nt in parsed.nonterminals} for t in columns
+    }
+    conflicts: list[str] = []
+
+    for prod in parsed.productions:
+        lookaheads, derives_empty = first_of_sequence(prod.rhs, first, nullable)
+        if derives_empty:
+            lookaheads = lookaheads | follow[prod.lhs]
+
+        for t in columns:
+            if t not in lookaheads:
+                continue
+            current = table[t][prod.lhs]
+            if current == "ERRO!":
+                table[t][prod.lhs] = str(prod)
+            elif current != str(prod):
+                conflicts.append(
+                    f"M[{prod.lhs}, {t}]: {current} / {prod}"
+                )
+
+    follow_table = {
+        nt: sorted(follow[nt], key=lambda s: (s == END_MARKER, s))
+        for nt in parsed.nonterminals
+    }
+    return LL1Table(table, parsed.start, follow_table, conflicts)
@@ -0,0 +1,331 @@
+# ---------------------------------------------------------------------------
+# Geração local das tabelas LR(0) / SLR(1) / LALR(1) / LR(1)
+# ---------------------------------------------------------------------------
+#
+# Substitui a consulta ao smlweb: constrói a coleção canônica de itens,
+# os fechamentos LR(1) e a propagação de lookaheads LALR diretamente a
+# partir da saída de utils.grammar_formatter.  O resultado tem o mesmo
+# formato de parsing_table.get_goto_action_tables:
+#
+#     action_table[terminal][estado + 1]     = "EMPILHAR[ 3 ]" | "REDUZIR[ E -> T ]"
+#                                              | "ACEITO" | "ERRO!"
+#     goto_table[nao_terminal][estado + 1]   = "EMPILHAR[ 5 ]" | " "
+# ---------------------------------------------------------------------------
+
+from typing import NamedTuple
+
+from app.grammar import (
+    END_MARKER, Grammar, Production,
+    first_of_sequence, first_sets, follow_sets, nullable_set, parse_grammar,
+)
+
+ANALYSIS_TYPES = ("lr0", "slr1", "lalr1", "lr1")
+
+# lookahead fictício usado na descoberta de propagações LALR
+_PROPAGATE = "#"
+
+
+class LRTables(NamedTuple):
+    action_table: dict[str, dict[int, str]]
+    goto_table:   dict[str, dict[int, str]]
+    conflicts:    list[str]
+
+
+class _Automaton(NamedTuple):
+    productions:  list[Production]      # índice 0 = produção aumentada
+    prods_by_lhs: dict[str, list[int]]
+    kernels:      list[tuple]           # itens-núcleo (ordenados) por estado
+    transitions:  list[dict[str, int]]  # estado -> {símbolo: estado}
+
+
+# ---------------------------------------------------------------------------
+# Gramática aumentada
+# ---------------------------------------------------------------------------
+
+def _augment(grammar: Grammar) -> tuple[list[Production], dict[str, list[int]]]:
+    aug_start = grammar.start + "'"
+    while aug_start in grammar.nonterminals or aug_start in grammar.terminals:
+        aug_start += "'"
+
+    productions = [Production(aug_start, (grammar.start,))] + grammar.productions
+
+    prods_by_lhs: dict[str, list[int]] = {}
+    for index, prod in enumerate(productions):
+        prods_by_lhs.setdefault(prod.lhs, []).append(index)
+    return productions, prods_by_lhs
+
+
+# ---------------------------------------------------------------------------
+# Fechamentos
+#   item LR(0) = (produção, ponto)
+#   item LR(1) = (produção, ponto, lookahead)
+# ---------------------------------------------------------------------------
+
+def _lr0_closure(kernel, productions, prods_by_lhs) -> list[tuple[int, int]]:
+    items = list(kernel)
+    seen  = set(items)
+    i = 0
+    while i < len(items):
+        p, d = items[i]
+        i += 1
+        rhs = productions[p].rhs
+        if d < len(rhs) and rhs[d] in prods_by_lhs:
+            for q in prods_by_lhs[rhs[d]]:
+                if (q, 0) not in seen:
+                    seen.add((q, 0))
+                    items.append((q, 0))
+    return items
+
+
+class _LR1Closure:
+    """Fechamento LR(1) com FIRST(β) memorizado por (produção, ponto)."""
+
+    def __init__(self, productions, prods_by_lhs, first, nullable):
+        self.productions  = productions
+        self.prods_by_lhs = prods_by_lhs
+        self.first        = first
+        self.nullable     = nullable
+        self._tail_first: dict[tuple[int, int], tuple[set[str], bool]] = {}
+
+    def _tail(self, p: int, d: int) -> tuple[set[str], bool]:
+        key = (p, d)
+        if key not in self._tail_first:
+            self._tail_first[key] = first_of_sequence(
+                self.productions[p].rhs[d:], self.first, self.nullable
+            )
+        return self._tail_first[key]
+
+    def __call__(self, kernel) -> list[tuple[int, int, str]]:
+        items = list(kernel)
+        seen  = set(items)
+        i = 0
+        while i < len(items):
+            p, d, a = items[i]
+            i += 1
+            rhs = self.productions[p].rhs
+            if d >= len(rhs) or rhs[d] not in self.prods_by_lhs:
+                continue
+            lookaheads, tail_nullable = self._tail(p, d + 1)
+            if tail_nullable:
+                lookaheads = lookaheads | {a}
+            for q in self.prods_by_lhs[rhs[d]]:
+                for b in sorted(lookaheads):
+                    item = (q, 0, b)
+                    if item not in seen:
+                        seen.add(item)
+                        items.append(item)
+        return items
+
+
+# ---------------------------------------------------------------------------
+# Coleções canônicas
+# ---------------------------------------------------------------------------
+
+def _build_automaton(productions, prods_by_lhs, start_item, closure) -> _Automaton:
+    """
+    Descobre os estados em largura a partir do item inicial.  Os núcleos são
+    guardados ordenados para que a numeração dos estados não dependa da
+    ordem de iteração de conjuntos.
+    """
+    start   = (start_item,)
+    kernels = [start]
+    index   = {start: 0}
+    transitions: list[dict[str, int]] = []
+
+    i = 0
+    while i < len(kernels):
+        moves: dict[str, list] = {}
+        for item in closure(kernels[i]):
+            p, d = item[0], item[1]
+            rhs = productions[p].rhs
+            if d < len(rhs):
+                moves.setdefault(rhs[d], []).append((p, d + 1) + item[2:])
+
+        trans: dict[str, int] = {}
+        for sym, moved in moves.items():
+            kernel = tuple(sorted(set(moved)))
+            if kernel not in index:
+                index[kernel] = len(kernels)
+                kernels.append(kernel)
+            trans[sym] = index[kernel]
+        transitions.append(trans)
+        i += 1
+
+    return _Automaton(productions, prods_by_lhs, kernels, transitions)
+
+
+def _lalr_lookaheads(automaton: _Automaton, closure: _LR1Closure) -> list[dict]:
+    """
+    Lookaheads dos itens-núcleo LR(0) por geração espontânea e propagação
+    (algoritmo do "livro do dragão").  Devolve, por estado,
+    {item_lr0: set(lookaheads)}.
+    """
+    productions = automaton.productions
+    lookaheads  = [{item: set() for item in kernel} for kernel in automaton.kernels]
+    propagates: dict[tuple[int, tuple[int, int]], list] = {}
+
+    lookaheads[0][(0, 0)].add(END_MARKER)
+
+    for state, kernel in enumerate(automaton.kernels):
+        for item in kernel:
+            targets = propagates.setdefault((state, item), [])
+            for p, d, a in closure([item + (_PROPAGATE,)]):
+                rhs = productions[p].rhs
+                if d >= len(rhs):
+                    continue
+                target_state = automaton.transitions[state][rhs[d]]
+                target_item  = (p, d + 1)
+                if a == _PROPAGATE:
+                    targets.append((target_state, target_item))
+                else:
+                    lookaheads[target_state][target_item].add(a)
+
+    changed = True
+    while changed:
+        changed = False
+        for (state, item), targets in propagates.items():
+            source = lookaheads[state][item]
+            if not source:
+                continue
+            for target_state, target_item in targets:
+                target = lookaheads[target_state][target_item]
+                before = len(target)
+                target |= source
+                if len(target) != before:
+                    changed = True
+
+    return lookaheads
+
+
+# ---------------------------------------------------------------------------
+# Montagem da tabela
+# ---------------------------------------------------------------------------
+
+def _reductions(analysis_type, automaton, grammar, closure_lr1):
+    """Devolve, por estado, a lista [(terminal, produção)] de reduções."""
+    productions  = automaton.productions
+    prods_by_lhs = automaton.prods_by_lhs
+    terminals    = grammar.terminals + [END_MARKER]
+    result: list[list[tuple[str, int]]] = []
+
+    if analysis_type in ("lr0", "slr1"):
+        follow = follow_sets(grammar) if analysis_type == "slr1" else None
+        for kernel in automaton.kernels:
+            reds = []
+            for p, d in _lr0_closure(kernel, productions, prods_by_lhs):
+                if p == 0 or d < len(productions[p].rhs):
+                    continue
+                columns = terminals if follow is None else [
+                    t for t in terminals if t in follow[productions[p].lhs]
+                ]
+                reds.extend((t, p) for t in columns)
+            result.append(reds)
+
+    elif analysis_type == "lalr1":
+        for state_lookaheads in _lalr_lookaheads(automaton, closure_lr1):
+            kernel = sorted(
+                item + (a,)
+                for item, las in state_lookaheads.items() for a in las
+            )
+            result.append([
+                (a, p) for p, d, a in closure_lr1(kernel)
+                if p != 0 and d == len(productions[p].rhs)
+            ])
+
+    else:  # lr1
+        for kernel in automaton.kernels:
+            result.append([
+                (a, p) for p, d, a in closure_lr1(kernel)
+                if p != 0 and d == len(productions[p].rhs)
+            ])
+
+    return result
+
+
+def _describe(entry, productions) -> str:
+    kind, arg = entry
+    if kind == "s":
+        return f"EMPILHAR[ {arg} ]"
+    if kind == "r":
+        return f"REDUZIR[ {productions[arg]} ]"
+    return "ACEITO"
+
+
+def build_lr_tables(grammar: str, analysis_type: str) -> LRTables:
+    """
+    Gera as tabelas action/goto da gramática formatada.
+
+    Conflitos são resolvidos como no yacc (empilhar vence reduzir; entre
+    reduções vence a produção declarada primeiro) e listados em `conflicts`.
+    """
+    if analysis_type not in ANALYSIS_TYPES:
+        raise ValueError(f"Tipo de análise desconhecido: {analysis_type}")
+
+    parsed = parse_grammar(grammar)
+    productions, prods_by_lhs = _augment(parsed)
+    nullable = nullable_set(parsed)
+    closure_lr1 = _LR1Closure(productions, prods_by_lhs,
+                              first_sets(parsed, nullable), nullable)
+
+    if analysis_type == "lr1":
+        automaton = _build_automaton(productions, prods_by_lhs,
+                                     (0, 0, END_MARKER), closure_lr1)
+    else:
+        automaton = _build_automaton(
+            productions, prods_by_lhs, (0, 0),
+            lambda kernel: _lr0_closure(kernel, productions, prods_by_lhs),
+        )
+
+    n_states = len(automaton.kernels)
+    actions: list[dict[str, tuple[str, int]]] = [{} for _ in range(n_states)]
+    conflicts: list[str] = []
+
+    def add(state: int, terminal: str, entry: tuple[str, int]) -> None:
+        current = actions[state].get(terminal)
+        if current is None:
+            actions[state][terminal] = entry
+            return
+        if current == entry:
+            return
+        conflicts.append(
+            f"Estado {state}, símbolo '{terminal}': "
+            f"{_describe(current, productions)} / {_describe(entry, productions)}"
+        )
+        if current[0] == "r" and entry[0] == "s":
+            actions[state][terminal] = entry
+        elif current[0] == entry[0] == "r" and entry[1] < current[1]:
+            actions[state][terminal] = entry
+
+    for state, trans in enumerate(automaton.transitions):
+        for sym, target in trans.items():
+            if sym not in prods_by_lhs:
+                add(state, sym, ("s", target))
+        if any(item[0] == 0 and item[1] == 1 for item in automaton.kernels[state]):
+            add(state, END_MARKER, ("acc", 0))
+
+    for state, reds in enumerate(_reductions(analysis_type, automaton,
+                                             parsed, closure_lr1)):
+        for terminal, prod in reds:
+            add(state, terminal, ("r", prod))
+
+    # -----------------------------------------------------------------------
+    # Formato de saída (linhas indexadas por estado + 1, como no smlweb)
+    # -----------------------------------------------------------------------
+    action_table = {
+        t: {
+            state + 1: (_describe(actions[state][t], productions)
+                        if t in actions[state] else "ERRO!")
+            for state in range(n_states)
+        }
+        for t in parsed.terminals + [END_MARKER]
+    }
+    goto_table = {
+        nt: {
+            state + 1: (f"EMPILHAR[ {automaton.transitions[state][nt]} ]"
+                        if nt in automaton.transitions[state] else " ")
+            for state in range(n_states)
+        }
+        for nt in parsed.nonterminals
+    }
+
+    return LRTables(action_table, goto_table, conflicts)
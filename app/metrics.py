@@ -0,0 +1,255 @@
+# ---------------------------------------------------------------------------
+# Instrumentação: tempo por fase, Server-Timing e métricas Prometheus
+# ---------------------------------------------------------------------------
+#
+#   with metrics.request_timer(analysis_type) as timer:
+#       with metrics.phase("grammar"):
+#           ...
+#   response.headers["Server-Timing"] = timer.server_timing()
+#
+# `phase` pode ser usado em qualquer ponto da pilha de chamadas (ex.: dentro
+# de parsing_table): a fase é anotada no timer da requisição atual (via
+# contextvars) e sempre alimenta o histograma sasc_phase_duration_seconds.
+# O formato de /metrics é o texto de exposição do Prometheus, gerado aqui
+# mesmo (sem dependência externa).
+# ---------------------------------------------------------------------------
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# rótulo analysis_type vem da URL: valores fora desta lista viram "other",
+# para não criar uma série nova por requisição inválida
+ANALYSIS_TYPES = ("lr0", "slr1", "lalr1", "lr1", "ll1")
+
+# limites (em segundos) dos histogramas de latência
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# limites dos histogramas de contagem de passos
+STEP_BUCKETS = (10, 50, 100, 500, 1_000, 5_000, 10_000, 50_000, 100_000)
+
+
+# ---------------------------------------------------------------------------
+# Tipos de métrica
+# ---------------------------------------------------------------------------
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name, self.help, self.labels = name, help, labels
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: tuple = (),
+                 buckets: tuple = LATENCY_BUCKETS):
+        self.name, self.help, self.labels = name, help, labels
+        self.buckets = buckets
+        # por combinação de rótulos: [contagem por bucket..., soma, total]
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels) -> None:
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * len(self.buckets) + [0.0, 0]
+            index = bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    le = _format_labels(self.labels, labels, f'le="{bound}"')
+                    lines.append(f"{self.name}_bucket{le} {cumulative}")
+                le = _format_labels(self.labels, labels, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{le} {series[-1]}")
+                plain = _format_labels(self.labels, labels)
+                lines.append(f"{self.name}_sum{plain} {series[-2]}")
+                lines.append(f"{self.name}_count{plain} {series[-1]}")
+        return lines
+
+
+PHASE_SECONDS = Histogram(
+    "sasc_phase_duration_seconds",
+    "Duração de cada fase da análise, em segundos.",
+    ("phase", "analysis_type"),
+)
+REQUEST_SECONDS = Histogram(
+    "sasc_request_duration_seconds",
+    "Duração total das requisições de análise, em segundos.",
+    ("analysis_type",),
+)
+PARSE_STEPS = Histogram(
+    "sasc_parse_steps",
+    "Movimentos do parser (empilhar/reduzir/aceitar; LL(1): expandir/casar/aceitar) por análise.",
+    ("analysis_type",),
+    STEP_BUCKETS,
+)
+ANALYSES = Counter(
+    "sasc_analyses_total",
+    "Análises executadas, por resultado.",
+    ("analysis_type", "accepted"),
+)
+PARSE_ERRORS = Counter(
+    "sasc_parse_errors_total",
+    "Erros sintáticos relatados nas análises.",
+    ("analysis_type",),
+)
+FAILURES = Counter(
+    "sasc_failures_total",
+    "Requisições de análise que terminaram com ERROR_CODE 1.",
+    ("analysis_type",),
+)
+
+REGISTRY = [PHASE_SECONDS, REQUEST_SECONDS, PARSE_STEPS, ANALYSES,
+            PARSE_ERRORS, FAILURES]
+
+
+# ---------------------------------------------------------------------------
+# Timer por requisição
+# ---------------------------------------------------------------------------
+
+def type_label(analysis_type: str | None) -> str:
+    return analysis_type if analysis_type in ANALYSIS_TYPES else "other"
+
+
+class RequestTimer:
+    def __init__(self, analysis_type: str):
+        self.analysis_type = type_label(analysis_type)
+        self.phases: dict[str, float] = {}      # fase → segundos (acumulado)
+        self.total = 0.0
+
+    def add(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def server_timing(self) -> str:
+        """Valor do cabeçalho Server-Timing (durações em milissegundos)."""
+        entries = [f"{name};dur={seconds * 1e3:.3f}"
+                   for name, seconds in self.phases.items()]
+        entries.append(f"total;dur={self.total * 1e3:.3f}")
+        return ", ".join(entries)
+
+
+_current: ContextVar[RequestTimer | None] = ContextVar("sasc_timer", default=None)
+_active:  ContextVar[frozenset] = ContextVar("sasc_phases", default=frozenset())
+
+
+@contextmanager
+def request_timer(analysis_type: str):
+    timer = RequestTimer(analysis_type)
+    token = _current.set(timer)
+    start = time.perf_counter()
+    try:
+        yield timer
+    finally:
+        timer.total = time.perf_counter() - start
+        _current.reset(token)
+        REQUEST_SECONDS.observe(timer.total, timer.analysis_type)
+
+
+@contextmanager
+def phase(name: str, analysis_type: str | None = None):
+    """
+    Mede o bloco; sem timer ativo, só alimenta o histograma.  Uma fase
+    aninhada em outra de mesmo nome não é medida de novo (o tempo já está
+    na de fora).
+    """
+    active = _active.get()
+    if name in active:
+        yield
+        return
+    timer = _current.get()
+    if analysis_type is None and timer is not None:
+        analysis_type = timer.analysis_type
+    analysis_type = type_label(analysis_type)
+    token = _active.set(active | {name})
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        _active.reset(token)
+        if timer is not None:
+            timer.add(name, seconds)
+        PHASE_SECONDS.observe(seconds, name, analysis_type)
+
+
+def record_analysis(analysis_type: str, accepted: bool, steps: int,
+                    errors: int) -> None:
+    analysis_type = type_label(analysis_type)
+    ANALYSES.inc(analysis_type, str(bool(accepted)).lower())
+    PARSE_STEPS.observe(steps, analysis_type)
+    if errors:
+        PARSE_ERRORS.inc(analysis_type, amount=errors)
+
+
+def record_failure(analysis_type: str) -> None:
+    FAILURES.inc(type_label(analysis_type))
+
+
+# ---------------------------------------------------------------------------
+# Exposição
+# ---------------------------------------------------------------------------
+
+def _cache_lines(stats: dict) -> list[str]:
+    gauges = [
+        ("sasc_table_cache_hits_total", "counter", "Acertos do cache em memória.",
+         stats["hits"]),
+        ("sasc_table_cache_disk_hits_total", "counter", "Acertos do cache em disco.",
+         stats["disk_hits"]),
+        ("sasc_table_cache_misses_total", "counter", "Tabelas geradas (faltas no cache).",
+         stats["misses"]),
+        ("sasc_table_cache_hit_ratio", "gauge", "Fração de consultas atendidas pelo cache.",
+         stats["hit_rate"]),
+        ("sasc_table_cache_entries", "gauge", "Entradas no cache em memória.",
+         stats["size"]),
+    ]
+    lines = []
+    for name, kind, help, value in gauges:
+        lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}", f"{name} {value}"]
+    return lines
+
+
+def render(cache_stats: dict | None = None) -> str:
+    """Todas as métricas no formato de texto do Prometheus."""
+    lines = []
+    for metric in REGISTRY:
+        lines += metric.render()
+    if cache_stats is not None:
+        lines += _cache_lines(cache_stats)
+    return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
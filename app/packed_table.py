@@ -0,0 +1,470 @@
+# ---------------------------------------------------------------------------
+# Tabelas LR compactadas (row displacement + reduções padrão + bits de erro)
+# ---------------------------------------------------------------------------
+#
+# A partir de uma CompiledTable (densa), para cada estado:
+#   • redução padrão  – a redução mais frequente da linha; células iguais a
+#                       ela deixam de ser guardadas;
+#   • bits de erro    – um bit por (estado, terminal) marcando "ERRO!", para
+#                       que a redução padrão não atrase a detecção de erros;
+#   • o que sobra (shifts, outras reduções, aceitação) é encaixado em
+#     vetores compartilhados no esquema "pente" (row displacement):
+#
+#         i = base[estado] + terminal
+#         ação = value[i] if check[i] == estado else default[estado]
+#
+# base é sempre >= 0; os drivers ainda tratam um i negativo (tabelas
+# compactadas antes disso, guardadas em disco) como posição livre.
+#
+# O GOTO usa o mesmo esquema por não-terminal (padrão = destino mais comum
+# da coluna).  O driver parse_packed dá exatamente os mesmos resultados de
+# compiled_table.parse_compiled; parse_stream faz a mesma análise (sobre
+# qualquer das duas representações) lendo os tokens sob demanda.
+# ---------------------------------------------------------------------------
+
+import json
+import sys
+from array import array
+from collections import Counter
+from typing import Iterable, NamedTuple
+
+from app.compiled_table import ERROR, REDUCE, SHIFT, CompiledTable, parse_compiled
+from app.error_recovery import (
+    LEXICAL_ERROR_MESSAGE, RecoveryTable, message_from_fragment,
+)
+from app.lexer import Token
+from app.parse_tree import TreeArena
+
+
+class PackedTable(NamedTuple):
+    terminals:       list[str]
+    terminal_ids:    dict[str, int]
+    nonterminals:    list[str]
+    nonterminal_ids: dict[str, int]
+    n_states:        int
+    base:            array            # por estado
+    check:           array            # estado dono da posição (-1 = livre)
+    value:           array            # código da ação (como em compiled_table)
+    default:         array            # redução padrão por estado (ou ERROR)
+    error_bits:      bytes            # n_states × row_bytes
+    row_bytes:       int
+    goto_base:       array            # por não-terminal
+    goto_check:      array
+    goto_value:      array
+    goto_default:    array            # destino mais comum por não-terminal
+    prod_len:        array
+    prod_lhs:        array
+    productions:     list[str]
+    error_fragments: list[str]
+
+
+# ---------------------------------------------------------------------------
+# Compactação
+# ---------------------------------------------------------------------------
+
+def _pack_rows(rows: list[dict[int, int]], width: int) -> tuple[array, array, array]:
+    """
+    Encaixa as linhas esparsas (coluna → valor) em check/value, first-fit,
+    das linhas mais cheias para as mais vazias.  base nunca é negativo e
+    check/value ficam com folga de `width` no fim, então base + coluna
+    sempre cai dentro dos vetores.
+    """
+    base  = array("i", [0]) * len(rows)
+    check = array("i")
+    value = array("i")
+    first_free = 0
+
+    for row in sorted(range(len(rows)), key=lambda r: -len(rows[r])):
+        cols = sorted(rows[row])
+        if not cols:
+            continue
+        offset = max(0, first_free - cols[0])
+        while True:
+            need = offset + cols[-1] + 1
+            if need > len(check):
+                check.extend([-1] * (need - len(check)))
+                value.extend([0] * (need - len(value)))
+            if all(check[offset + c] == -1 for c in cols):
+                break
+            offset += 1
+        base[row] = offset
+        for c in cols:
+            check[offset + c] = row
+            value[offset + c] = rows[row][c]
+        while first_free < len(check) and check[first_free] != -1:
+            first_free += 1
+
+    size = max((base[r] for r in range(len(rows))), default=0) + width
+    if size > len(check):
+        check.extend([-1] * (size - len(check)))
+        value.extend([0] * (size - len(value)))
+    return base, check, value
+
+
+def pack_tables(compiled: CompiledTable) -> PackedTable:
+    n_t, n_nt = len(compiled.terminals), len(compiled.nonterminals)
+    n_states  = compiled.n_states
+    action, goto = compiled.action, compiled.goto
+
+    row_bytes  = (n_t + 7) // 8
+    error_bits = bytearray(n_states * row_bytes)
+    default    = array("i", [ERROR]) * n_states
+    rows: list[dict[int, int]] = []
+
+    for state in range(n_states):
+        codes = action[state * n_t:(state + 1) * n_t]
+        reductions = Counter(code for code in codes if code & 3 == REDUCE)
+        if reductions:
+            default[state] = min(reductions, key=lambda c: (-reductions[c], c))
+
+        row = {}
+        for tid, code in enumerate(codes):
+            if code == ERROR:
+                error_bits[state * row_bytes + (tid >> 3)] |= 1 << (tid & 7)
+            elif code != default[state]:
+                row[tid] = code
+        rows.append(row)
+
+    base, check, value = _pack_rows(rows, n_t)
+
+    goto_default = array("i", [-1]) * n_nt
+    goto_rows: list[dict[int, int]] = []
+    for ntid in range(n_nt):
+        column  = [goto[state * n_nt + ntid] for state in range(n_states)]
+        targets = Counter(target for target in column if target >= 0)
+        if targets:
+            goto_default[ntid] = min(targets, key=lambda s: (-targets[s], s))
+        goto_rows.append({
+            state: target for state, target in enumerate(column)
+            if target >= 0 and target != goto_default[ntid]
+        })
+
+    goto_base, goto_check, goto_value = _pack_rows(goto_rows, n_states)
+
+    return PackedTable(
+        compiled.terminals, compiled.terminal_ids,
+        compiled.nonterminals, compiled.nonterminal_ids, n_states,
+        base, check, value, default, bytes(error_bits), row_bytes,
+        goto_base, goto_check, goto_value, goto_default,
+        compiled.prod_len, compiled.prod_lhs, compiled.productions,
+        compiled.error_fragments,
+    )
+
+
+def packed_action(packed: PackedTable, state: int, tid: int) -> int:
+    """Código da ação (mesma codificação de compiled_table)."""
+    if packed.error_bits[state * packed.row_bytes + (tid >> 3)] >> (tid & 7) & 1:
+        return ERROR
+    i = packed.base[state] + tid
+    if i >= 0 and packed.check[i] == state:
+        return packed.value[i]
+    return packed.default[state]
+
+
+def packed_goto(packed: PackedTable, state: int, ntid: int) -> int:
+    i = packed.goto_base[ntid] + state
+    if i >= 0 and packed.goto_check[i] == ntid:
+        return packed.goto_value[i]
+    return packed.goto_default[ntid]
+
+
+# ---------------------------------------------------------------------------
+# Driver sobre a tabela compactada
+# ---------------------------------------------------------------------------
+
+def parse_packed(packed: PackedTable, tokens: list[str],
+                 max_steps: int | None = None,
+                 ids: list[int] | None = None,
+                 tree: TreeArena | None = None) -> dict:
+    """Mesmo contrato (e resultados) de compiled_table.parse_compiled."""
+    base, check, value, default = packed.base, packed.check, packed.value, packed.default
+    error_bits, row_bytes = packed.error_bits, packed.row_bytes
+    goto_base, goto_check = packed.goto_base, packed.goto_check
+    goto_value, goto_default = packed.goto_value, packed.goto_default
+    prod_len, prod_lhs = packed.prod_len, packed.prod_lhs
+    n_states, n_t = packed.n_states, len(packed.terminals)
+    terminal_ids = packed.terminal_ids
+    fragments = packed.error_fragments
+
+    def act(state: int, tid: int) -> int:
+        if tid < 0 or error_bits[state * row_bytes + (tid >> 3)] >> (tid & 7) & 1:
+            return ERROR
+        i = base[state] + tid
+        return value[i] if i >= 0 and check[i] == state else default[state]
+
+    tape  = tokens + ["$"]
+    if ids is None:
+        ids = [terminal_ids.get(tok, -1) for tok in tokens]
+    ids   = list(ids) + [terminal_ids.get("$", -1)]
+    end   = len(tape)
+    stack = [0]
+    errors: list[dict] = []
+    pointer = steps = 0
+    reductions, reduction_limit = 0, n_states * 2
+    nodes: list[int] = []     # nós da árvore, paralelos a stack[1:]
+
+    def give_up(message: str) -> dict:
+        errors.append({"index": pointer, "lexeme": tape[pointer],
+                       "message": message})
+        return {"accepted": False, "errors": errors, "steps": steps}
+
+    while True:
+        state = stack[-1]
+        tid   = ids[pointer]
+        if tid < 0 or error_bits[state * row_bytes + (tid >> 3)] >> (tid & 7) & 1:
+            code = ERROR
+        else:  # act() em linha: é o caminho quente
+            i    = base[state] + tid
+            code = value[i] if i >= 0 and check[i] == state else default[state]
+
+        # descarte de tokens (modo pânico)
+        while code == ERROR:
+            token = tape[pointer]
+            errors.append({
+                "index":   pointer,
+                "lexeme":  token,
+                "message": (message_from_fragment(fragments[state], token)
+                            if tid >= 0 else LEXICAL_ERROR_MESSAGE),
+            })
+            pointer += 1
+            if pointer >= end:
+                return {"accepted": False, "errors": errors, "steps": steps}
+            tid  = ids[pointer]
+            code = act(state, tid)
+
+        steps += 1
+        if max_steps is not None and steps > max_steps:
+            return give_up(f"Análise interrompida: limite de {max_steps} "
+                           f"passos excedido.")
+        kind = code & 3
+
+        if kind == SHIFT:
+            stack.append(code >> 2)
+            if tree is not None:
+                nodes.append(tree.leaf(ids[pointer], pointer))
+            pointer += 1
+            reductions, reduction_limit = 0, n_states * (len(stack) + 1)
+        elif kind == REDUCE:
+            reductions += 1
+            if reductions > reduction_limit:
+                return give_up("Erro fatal: a análise não termina (ciclo de "
+                               "reduções sem consumir a entrada).")
+            prod = code >> 2
+            size = prod_len[prod]
+            if size:
+                del stack[-size:]
+            if tree is not None:
+                children = nodes[len(nodes) - size:]
+                del nodes[len(nodes) - size:]
+                nodes.append(tree.node(n_t + prod_lhs[prod], children, pointer))
+            ntid = prod_lhs[prod]
+            i = goto_base[ntid] + stack[-1]
+            stack.append(goto_value[i] if i >= 0 and goto_check[i] == ntid
+                         else goto_default[ntid])
+        else:  # ACCEPT
+            if tree is not None and nodes:
+                tree.root = nodes[-1]
+            return {"accepted": not errors, "errors": errors, "steps": steps}
+
+
+def parse_tables(tables: "CompiledTable | PackedTable", tokens: list[str],
+                 max_steps: int | None = None,
+                 ids: list[int] | None = None,
+                 tree: TreeArena | None = None) -> dict:
+    """Roda o driver adequado à representação (densa ou compactada)."""
+    if isinstance(tables, PackedTable):
+        return parse_packed(tables, tokens, max_steps, ids, tree)
+    return parse_compiled(tables, tokens, max_steps, ids, tree)
+
+
+def recovery_table(tables: "CompiledTable | PackedTable") -> RecoveryTable:
+    """
+    RecoveryTable (error_recovery) a partir das tabelas do driver rápido –
+    a mesma que build_recovery_table calcula das tabelas de string.
+    """
+    n_t = len(tables.terminals)
+    if isinstance(tables, PackedTable):
+        def code(state, tid):
+            return packed_action(tables, state, tid)
+    else:
+        def code(state, tid):
+            return tables.action[state * n_t + tid]
+    return RecoveryTable(
+        [frozenset(tables.terminals[tid] for tid in range(n_t)
+                   if code(state, tid) != ERROR)
+         for state in range(tables.n_states)],
+        list(tables.error_fragments),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Driver sobre um fluxo de tokens (entradas grandes / arquivos enviados)
+# ---------------------------------------------------------------------------
+
+def parse_stream(tables: "CompiledTable | PackedTable", tokens: Iterable[Token],
+                 end_offset: int = 0, max_steps: int | None = None,
+                 max_errors: int | None = None) -> dict:
+    """
+    Mesma análise de parse_tables, mas consumindo `tokens` (app.lexer.Token,
+    ex.: Lexer.scan_bytes sobre um mmap) só à medida que o parser avança:
+    nem a fita nem a lista de ids são montadas, e a memória depende apenas
+    da altura da pilha e do número de erros.
+
+    Cada erro traz também `offset`, a posição do token na entrada (bytes,
+    com scan_bytes); o "$" final fica em `end_offset`.  Passados
+    `max_errors` erros, a análise é interrompida.
+    """
+    packed = isinstance(tables, PackedTable)
+    action = None if packed else tables.action
+    goto   = None if packed else tables.goto
+    prod_len, prod_lhs = tables.prod_len, tables.prod_lhs
+    n_t, n_nt = len(tables.terminals), len(tables.nonterminals)
+    n_states  = tables.n_states
+    fragments = tables.error_fragments
+
+    def act(state: int, tid: int) -> int:
+        if tid < 0:
+            return ERROR
+        return packed_action(tables, state, tid) if packed else action[state * n_t + tid]
+
+    def go(state: int, ntid: int) -> int:
+        return packed_goto(tables, state, ntid) if packed else goto[state * n_nt + ntid]
+
+    stream = iter(tokens)
+    end    = Token("$", "$", end_offset, tables.terminal_ids.get("$", -1))
+    stack  = [0]
+    errors: list[dict] = []
+    pointer = steps = 0
+    reductions, reduction_limit = 0, n_states * 2
+
+    def advance() -> Token | None:
+        return next(stream, end) if token is not end else None
+
+    def error(message: str) -> None:
+        errors.append({"index": pointer, "offset": token.offset,
+                       "lexeme": token.lexeme, "message": message})
+
+    def give_up(message: str) -> dict:
+        error(message)
+        return {"accepted": False, "errors": errors, "steps": steps}
+
+    token = None
+    token = advance()
+    while True:
+        state = stack[-1]
+        code  = act(state, token.id)
+
+        # descarte de tokens (modo pânico)
+        while code == ERROR:
+            if max_errors is not None and len(errors) >= max_errors:
+                return give_up(f"Análise interrompida: mais de {max_errors} "
+                               f"erros.")
+            error(message_from_fragment(fragments[state], token.lexeme)
+                  if token.id >= 0 else LEXICAL_ERROR_MESSAGE)
+            token = advance()
+            if token is None:
+                return {"accepted": False, "errors": errors, "steps": steps}
+            pointer += 1
+            code = act(state, token.id)
+
+        steps += 1
+        if max_steps is not None and steps > max_steps:
+            return give_up(f"Análise interrompida: limite de {max_steps} "
+                           f"passos excedido.")
+        kind = code & 3
+
+        if kind == SHIFT:
+            stack.append(code >> 2)
+            token = advance()
+            pointer += 1
+            reductions, reduction_limit = 0, n_states * (len(stack) + 1)
+        elif kind == REDUCE:
+            reductions += 1
+            if reductions > reduction_limit:
+                return give_up("Erro fatal: a análise não termina (ciclo de "
+                               "reduções sem consumir a entrada).")
+            prod = code >> 2
+            size = prod_len[prod]
+            if size:
+                del stack[-size:]
+            stack.append(go(stack[-1], prod_lhs[prod]))
+        else:  # ACCEPT
+            return {"accepted": not errors, "errors": errors, "steps": steps}
+
+
+# ---------------------------------------------------------------------------
+# Serialização e relatório de memória
+# ---------------------------------------------------------------------------
+
+def packed_to_dict(packed: PackedTable) -> dict:
+    """Forma JSON da tabela compactada (para o front-end ou outro driver)."""
+    return {
+        "terminals":    packed.terminals,
+        "nonterminals": packed.nonterminals,
+        "states":       packed.n_states,
+        "productions":  [
+            {"text": text, "length": length, "lhs": lhs}
+            for text, length, lhs in zip(packed.productions, packed.prod_len,
+                                         packed.prod_lhs)
+        ],
+        "action": {
+            "base":      packed.base.tolist(),
+            "check":     packed.check.tolist(),
+            "value":     packed.value.tolist(),
+            "default":   packed.default.tolist(),
+            "errorBits": packed.error_bits.hex(),
+            "rowBytes":  packed.row_bytes,
+        },
+        "goto": {
+            "base":    packed.goto_base.tolist(),
+            "check":   packed.goto_check.tolist(),
+            "value":   packed.goto_value.tolist(),
+            "default": packed.goto_default.tolist(),
+        },
+        "encoding": "code = (argumento << 2) | tipo; "
+                    "tipo: 0 erro, 1 empilhar, 2 reduzir, 3 aceito",
+    }
+
+
+def deep_sizeof(obj, seen: set | None = None) -> int:
+    """Tamanho aproximado em bytes de `obj` e de tudo que ele referencia."""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen)
+                    for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    return size
+
+
+def footprint_report(tables: dict, compiled: CompiledTable,
+                     packed: PackedTable) -> dict:
+    """Memória (bytes) e tamanho do JSON de cada representação da tabela."""
+    n_cells = compiled.n_states * len(compiled.terminals)
+    errors  = sum(1 for code in compiled.action if code == ERROR)
+    string_tables = {"action_table": tables["action_table"],
+                     "goto_table":   tables["goto_table"]}
+    return {
+        "states":       compiled.n_states,
+        "terminals":    len(compiled.terminals),
+        "nonterminals": len(compiled.nonterminals),
+        "errorCells":   errors,
+        "errorRatio":   errors / n_cells if n_cells else 0.0,
+        "memoryBytes": {
+            "strings":  deep_sizeof(string_tables),
+            "compiled": deep_sizeof(compiled.action) + deep_sizeof(compiled.goto),
+            "packed":   sum(deep_sizeof(part) for part in (
+                packed.base, packed.check, packed.value, packed.default,
+                packed.error_bits, packed.goto_base, packed.goto_check,
+                packed.goto_value, packed.goto_default,
+            )),
+        },
+        "jsonBytes": {
+            "strings": len(json.dumps(string_tables, ensure_ascii=False)),
+            "packed":  len(json.dumps(packed_to_dict(packed), ensure_ascii=False)),
+        },
+    }
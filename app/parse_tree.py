@@ -0,0 +1,159 @@
+# ---------------------------------------------------------------------------
+# Árvore sintática em arena (vetores paralelos, sem um objeto por nó)
+# ---------------------------------------------------------------------------
+#
+# Cada nó é um índice; seus campos ficam em arrays de inteiros:
+#
+#   symbol[n]        id do símbolo (nome em symbols[id])
+#   parent[n]        nó pai (-1 na raiz / enquanto não reduzido)
+#   first_child[n]   primeiro filho (-1 em folhas e produções vazias)
+#   next_sibling[n]  próximo irmão (-1 no último)
+#   start[n]/end[n]  intervalo de tokens coberto: [start, end)
+#
+# Os parsers LR criam uma folha a cada EMPILHAR e um nó interno a cada
+# REDUZIR, ligando os nós desempilhados como filhos.  Para entradas
+# grandes isso custa alguns inteiros por nó em vez de milhões de objetos.
+# ---------------------------------------------------------------------------
+
+from array import array
+
+
+class TreeArena:
+    def __init__(self, symbols: list[str] | None = None):
+        self.symbols: list[str] = list(symbols or [])
+        self._symbol_ids = {name: i for i, name in enumerate(self.symbols)}
+        self.symbol       = array("i")
+        self.parent       = array("i")
+        self.first_child  = array("i")
+        self.next_sibling = array("i")
+        self.start        = array("i")
+        self.end          = array("i")
+        self.root         = -1
+
+    def __len__(self) -> int:
+        return len(self.symbol)
+
+    def intern(self, name: str) -> int:
+        """Id do símbolo `name` (cadastrado na primeira vez)."""
+        symbol_id = self._symbol_ids.get(name)
+        if symbol_id is None:
+            symbol_id = self._symbol_ids[name] = len(self.symbols)
+            self.symbols.append(name)
+        return symbol_id
+
+    # -----------------------------------------------------------------------
+    # Construção
+    # -----------------------------------------------------------------------
+    def _append(self, symbol: int, first_child: int, start: int, end: int) -> int:
+        node = len(self.symbol)
+        self.symbol.append(symbol)
+        self.parent.append(-1)
+        self.first_child.append(first_child)
+        self.next_sibling.append(-1)
+        self.start.append(start)
+        self.end.append(end)
+        return node
+
+    def leaf(self, symbol: int, index: int) -> int:
+        """Folha para o token de posição `index`."""
+        return self._append(symbol, -1, index, index + 1)
+
+    def node(self, symbol: int, children: list[int], at: int) -> int:
+        """
+        Nó interno sobre `children` (na ordem da produção).  `at` é a
+        posição atual da entrada, usada como intervalo de produções vazias.
+        """
+        if not children:
+            return self._append(symbol, -1, at, at)
+        first = children[0]
+        node  = self._append(symbol, first, self.start[first],
+                             self.end[children[-1]])
+        parent, next_sibling = self.parent, self.next_sibling
+        previous = first
+        parent[first] = node
+        for child in children[1:]:
+            next_sibling[previous] = child
+            parent[child] = node
+            previous = child
+        return node
+
+    # -----------------------------------------------------------------------
+    # Consulta / serialização
+    # -----------------------------------------------------------------------
+    def children(self, node: int):
+        child = self.first_child[node]
+        while child != -1:
+            yield child
+            child = self.next_sibling[child]
+
+    def to_arrays(self) -> dict:
+        """Forma compacta: os próprios vetores paralelos."""
+        return {
+            "root":        self.root,
+            "symbols":     self.symbols,
+            "symbol":      self.symbol.tolist(),
+            "parent":      self.parent.tolist(),
+            "firstChild":  self.first_child.tolist(),
+            "nextSibling": self.next_sibling.tolist(),
+            "start":       self.start.tolist(),
+            "end":         self.end.tolist(),
+        }
+
+    def to_nested(self, tokens: list[str] | None = None) -> dict | None:
+        """
+        Forma aninhada para a UI: {symbol, start, end, children} nos nós
+        internos e {symbol, index, lexeme} nas folhas.  Iterativa, então
+        árvores profundas (listas recursivas à esquerda) não estouram a
+        pilha do Python.
+        """
+        if self.root == -1:
+            return None
+
+        built: dict[int, dict] = {}
+        pending = [(self.root, False)]
+        while pending:
+            node, ready = pending.pop()
+            symbol = self.symbols[self.symbol[node]]
+            first  = self.first_child[node]
+            is_leaf = first == -1 and self.end[node] - self.start[node] == 1
+
+            if is_leaf:
+                index = self.start[node]
+                built[node] = {
+                    "symbol": symbol,
+                    "index":  index,
+                    "lexeme": tokens[index] if tokens is not None else symbol,
+                }
+            elif ready:
+                built[node] = {
+                    "symbol":   symbol,
+                    "start":    self.start[node],
+                    "end":      self.end[node],
+                    "children": [built.pop(child) for child in self.children(node)],
+                }
+            else:
+                pending.append((node, True))
+                pending.extend((child, False) for child in self.children(node))
+
+        return built[self.root]
+
+
+TREE_FORMATS = ("none", "nested", "arrays")
+
+
+def serialize_tree(tree: TreeArena | None, tree_format: str,
+                   tokens: list[str] | None = None):
+    """Árvore na forma pedida (TREE_FORMATS); None se não houver árvore."""
+    if tree is None or tree_format == "none":
+        return None
+    if tree_format == "arrays":
+        return tree.to_arrays()
+    return tree.to_nested(tokens)
+
+
+def tree_for(tables) -> TreeArena:
+    """
+    Arena para os drivers de tabelas inteiras (compiled_table /
+    packed_table): ids 0..n-1 são os terminais e n + i o não-terminal i.
+    """
+    return TreeArena(list(tables.terminals) + list(tables.nonterminals))
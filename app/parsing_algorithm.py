@@ -1,14 +1,15 @@
 import re
 
+from app.error_recovery import (
+    LEXICAL_ERROR_MESSAGE, RecoveryTable, build_recovery_table, error_message,
+    expected_fragment, message_from_fragment,
+)
+from app.parse_tree import TreeArena
+
 # ---------------------------------------------------------------------------
 # Configurações e utilidades
 # ---------------------------------------------------------------------------
 
-SYNC_SYMBOLS = {
-    ';', '}', ']', ')', '$',            # delimitadores usuais
-    'a', 'b'                            # terminais simples dos exemplos-base
-}
-
 TOKEN_RE = re.compile(r"""
     [A-Za-z_][A-Za-z_0-9]* |        # identificadores / palavras-chave
     \d+\.\d+ | \d+                  |  # números
@@ -21,95 +22,219 @@ def tokenize(text: str) -> list[str]:
     """Separa a entrada em tokens simples (usado só para a fita)."""
     return TOKEN_RE.findall(text)
 
-def build_error_message(action_table, state: int, token: str) -> str:
-    """
-    Retorna uma string amigável indicando o que era esperado naquele estado.
 
-    • Inclui '$' quando ele é o único símbolo aceitável.
-    • Coloca '$' sempre por último na lista.
+def _input_tape(input: "str | list[str]") -> list[str]:
+    """Fita de entrada + '$'; aceita o texto ou a lista de tokens já separada."""
+    return (tokenize(input) if isinstance(input, str) else list(input)) + ["$"]
+
+
+def format_error_message(expected: list[str], token: str) -> str:
+    """Monta a mensagem a partir da lista de símbolos esperados."""
+    return message_from_fragment(expected_fragment(expected), token)
+
+
+# ---------------------------------------------------------------------------
+# Registro do passo-a-passo (nível de detalhe selecionável)
+# ---------------------------------------------------------------------------
+#
+#   none     – nenhum passo; só aceitação/rejeição e erros
+#   summary  – stepByStep, pointer e stepMarker de cada passo
+#   full     – summary + stepByStepDetailed + deltas da pilha:
+#              o 1º passo traz "stack" (topo primeiro) e "input" completos;
+#              os seguintes trazem só "pop" (quantos símbolos saíram do topo)
+#              e "push" (símbolos empilhados, de baixo para cima).
+#              expand_trace() reconstrói os instantâneos completos.
+# ---------------------------------------------------------------------------
+
+TRACE_LEVELS = ("none", "summary", "full")
+
+
+class StepTrace:
     """
+    Acumula os passos e erros da análise.
 
-    # tokens cujo movimento NÃO é "ERRO!" na linha (state + 1) da tabela
-    expected = [
-        t for t, col in action_table.items()
-        if col.get(state + 1) != "ERRO!"
-    ]
+    Cada passo/erro também entra numa fila de eventos, esvaziada por
+    drain() a cada iteração dos geradores iter_*; com keep=False as listas
+    `steps`/`errors` não são mantidas e a memória por passo fica constante
+    (usado no streaming).
+    """
 
-    # ordena de modo que '$' apareça por último
-    expected.sort(key=lambda s: (s == "$", s))
+    def __init__(self, level: str = "full", keep: bool = True):
+        if level not in TRACE_LEVELS:
+            raise ValueError(f"Nível de trace inválido: {level}")
+        self.level    = level
+        self.keep     = keep
+        self.steps:   list[dict] = []
+        self.errors:  list[dict] = []
+        self.accepted = False              # aceita e sem nenhum erro
+        self.error_count = 0
+        self.count    = 0                  # movimentos do parser (ver move)
+        self._pop     = 0
+        self._push:   list[str] = []
+        self._events: list[tuple[str, dict]] = []
+
+    # alterações da pilha desde o último passo registrado
+    def push(self, *symbols: str) -> None:
+        if self.level == "full":
+            self._push.extend(symbols)
+
+    def pop(self, count: int = 1) -> None:
+        if self.level != "full":
+            return
+        cancelled = min(count, len(self._push))
+        if cancelled:
+            del self._push[-cancelled:]
+        self._pop += count - cancelled
+
+    def start(self, stack: list[str], input_tape: list[str]) -> None:
+        self.record(["Inicio da análise"],
+                    [["A análise sintática será iniciada!"]], 0)
+        if self.level == "full":
+            self._events[-1][1]["stack"] = stack[::-1]
+            self._events[-1][1]["input"] = input_tape.copy()
+
+    def move(self) -> None:
+        """
+        Conta um movimento do parser – LR: empilhar / reduzir / aceitar;
+        LL(1): expandir / casar / aceitar.  É a mesma unidade dos `steps`
+        dos drivers rápidos, em qualquer nível de trace.
+        """
+        self.count += 1
+
+    def record(self, step_by_step: list[str], step_by_step_detailed: list,
+               pointer: int, marker=("", "")) -> None:
+        if self.level == "none":
+            return
+        step = {
+            "stepByStep": step_by_step,
+            "pointer":    pointer,
+            "stepMarker": list(marker),
+        }
+        if self.level == "full":
+            step["stepByStepDetailed"] = step_by_step_detailed
+            step["pop"]  = self._pop
+            step["push"] = self._push
+            self._pop, self._push = 0, []
+        if self.keep:
+            self.steps.append(step)
+        self._events.append(("step", step))
+
+    def error(self, index: int, lexeme: str, message: str) -> None:
+        self.error_count += 1
+        error = {"index": index, "lexeme": lexeme, "message": message}
+        if self.keep:
+            self.errors.append(error)
+        self._events.append(("error", error))
+
+    def drain(self) -> list[tuple[str, dict]]:
+        events, self._events = self._events, []
+        return events
+
+
+def expand_trace(steps: list[dict]) -> list[dict]:
+    """Reconstrói os instantâneos (stack/input completos) de um trace full."""
+    if not steps:
+        return []
+
+    stack = steps[0]["stack"][::-1]        # base primeiro
+    input_tape = steps[0]["input"]
+    expanded = []
+    for step in steps:
+        if step.get("pop"):
+            del stack[-step["pop"]:]
+        stack.extend(step.get("push", ()))
+        expanded.append({
+            "stepByStep":         step["stepByStep"],
+            "stepByStepDetailed": step["stepByStepDetailed"],
+            "stack":              stack[::-1],
+            "input":              input_tape.copy(),
+            "pointer":            step["pointer"],
+            "stepMarker":         step["stepMarker"],
+        })
+    return expanded
 
-    # monta string dos esperados
-    exp = ", ".join(expected) if expected else "$"
 
-    # mensagens finais
-    if token == "$":
-        return f"Fim de entrada prematuro. Esperava: {exp}."
-    else:
-        return f"Símbolo inesperado '{token}'. Esperava: {exp}."
 # ---------------------------------------------------------------------------
 # Algoritmo LR (SLR / LALR / LR(1) – bottom-up)
 # ---------------------------------------------------------------------------
 
 def bottom_up_algorithm(action_table: dict,
                         goto_table: dict,
-                        input: str) -> tuple[list[dict], list[dict]]:
+                        input: "str | list[str]",
+                        trace: "StepTrace | str" = "full",
+                        recovery: RecoveryTable | None = None,
+                        tree: TreeArena | None = None
+                        ) -> tuple[list[dict], list[dict]]:
     """
     Executa a análise sintática.
 
+    `trace` é um nível de TRACE_LEVELS ou um StepTrace já criado (útil para
+    consultar trace.accepted depois da análise).  `recovery` são as
+    informações de erro da tabela (error_recovery); se omitidas, são
+    calculadas aqui – passe-as quando a tabela vier do cache.  Com `tree`
+    (uma TreeArena), a árvore sintática é montada durante as reduções.
+
     Retorna:
-        detailed_steps  – lista com logs passo-a-passo (já existente)
+        detailed_steps  – lista com logs passo-a-passo (conforme o nível)
         errors          – lista de dicionários
                           { index, lexeme, message } para o front-end
     """
+    if isinstance(trace, str):
+        trace = StepTrace(trace)
+    for _ in iter_bottom_up(action_table, goto_table, input, trace, recovery,
+                            tree):
+        pass
+    return trace.steps, trace.errors
+
+
+def iter_bottom_up(action_table: dict,
+                   goto_table: dict,
+                   input: "str | list[str]",
+                   trace: StepTrace,
+                   recovery: RecoveryTable | None = None,
+                   tree: TreeArena | None = None):
+    """
+    Versão geradora de bottom_up_algorithm: produz ("step", passo) e
+    ("error", erro) à medida que a análise avança.
+    """
+    if recovery is None:
+        recovery = build_recovery_table(action_table)
+
     stack:    list[str] = ["0"]
     pointer:  int       = 0
-    aux_cont: int       = 0
+    nodes:    list[int] = []      # nós da árvore, um por símbolo da pilha
 
-    input_tape = tokenize(input) + ["$"]
+    input_tape = _input_tape(input)
+
+    # trava contra ciclos de reduções sem consumir a entrada (tabelas com
+    # conflito / gramáticas cíclicas): numa tabela LR válida o número de
+    # reduções entre dois EMPILHAR é limitado por n_estados × altura da pilha
+    n_states = len(next(iter(action_table.values()), {}))
+    reductions, height_at_shift = 0, len(stack)
 
     # -----------------------------------------------------------------------
     # Estrutura de resultado
     # -----------------------------------------------------------------------
-    detailed_steps: list[dict] = [{
-        "stepByStep":         ["Inicio da análise"],
-        "stepByStepDetailed": [["A análise sintática será iniciada!"]],
-        "stack":              stack[::-1].copy(),
-        "input":              input_tape.copy(),
-        "pointer":            pointer,
-        "stepMarker":         ["", ""],
-    }]
+    trace.start(stack, input_tape)
 
-    errors: list[dict] = []        # ← NOVO: lista acumulada de erros
+    def fatal_empty_stack(lexeme: str) -> None:
+        # pilha vazia → impossível recuperar
+        trace.record(["Erro fatal: não foi possível sincronizar."],
+                     [["A pilha esvaziou sem estado válido."]], pointer)
+        trace.error(pointer, lexeme,
+                    "Erro fatal: pilha vazia durante a recuperação.")
 
     # -----------------------------------------------------------------------
     # Loop principal
     # -----------------------------------------------------------------------
     while True:
-        aux_cont += 1
-        if aux_cont > 1_000:                          # trava de segurança
-            break
-
-        # rótulos convenientes
-        step_by_step, step_by_step_detailed = [], []
-
-        action, transition = ["", ""], ["", ""]
+        yield from trace.drain()
 
         if not stack:
-            # pilha vazia → impossível recuperar
-            detailed_steps.append({
-                "stepByStep":         ["Erro fatal: não foi possível sincronizar."],
-                "stepByStepDetailed": [["A pilha esvaziou sem estado válido."]],
-                "stack":              stack[::-1].copy(),
-                "input":              input_tape.copy(),
-                "pointer":            pointer,
-                "stepMarker":         ["", ""],
-            })
-            errors.append({
-                "index":   pointer,
-                "lexeme":  input_tape[pointer] if pointer < len(input_tape) else "$",
-                "message": "Erro fatal: pilha vazia durante a recuperação."
-            })
-            return detailed_steps, errors
+            fatal_empty_stack(
+                input_tape[pointer] if pointer < len(input_tape) else "$"
+            )
+            break
 
         state = int(stack[-1])
         token = input_tape[pointer]
@@ -119,60 +244,41 @@ def bottom_up_algorithm(action_table: dict,
         # -------------------------------------------------------------------
         while True:
             if not stack:
-                detailed_steps.append({
-                    "stepByStep":         ["Erro fatal: não foi possível sincronizar."],
-                    "stepByStepDetailed": [["A pilha esvaziou sem estado válido."]],
-                    "stack":              stack[::-1].copy(),
-                    "input":              input_tape.copy(),
-                    "pointer":            pointer,
-                    "stepMarker":         ["", ""],
-                })
-                errors.append({
-                    "index":   pointer,
-                    "lexeme":  token,
-                    "message": "Erro fatal: pilha vazia durante a recuperação."
-                })
-                return detailed_steps, errors
+                fatal_empty_stack(token)
+                yield from trace.drain()
+                return
 
             state = int(stack[-1])
-            if (action_table.get(token)
-                    and action_table[token].get(state + 1) != "ERRO!"):
+            if token not in action_table:
+                # erro léxico: o token não é terminal da gramática
+                trace.record([f"Descartando símbolo '{token}' para recuperar."],
+                             [[f"A entrada tem um erro léxico em: {token}.",
+                               "Um token identificado não pertence à gramática da "
+                               "linguagem fonte."]],
+                             pointer)
+                trace.error(pointer, token, LEXICAL_ERROR_MESSAGE)
+            elif token in recovery.expected[state]:
                 # ponto de sincronização encontrado
-                detailed_steps.append({
-                    "stepByStep":         [f"Recuperação concluída em '{token}'."],
-                    "stepByStepDetailed": [["Token atual pode ser consumido pelo estado da pilha."]],
-                    "stack":              stack[::-1].copy(),
-                    "input":              input_tape.copy(),
-                    "pointer":            pointer,
-                    "stepMarker":         ["", ""],
-                })
+                trace.record([f"Recuperação concluída em '{token}'."],
+                             [["Token atual pode ser consumido pelo estado da pilha."]],
+                             pointer)
                 break                 # sai do while-interno (modo-pânico)
             else:
-                detailed_steps.append({
-                    "stepByStep":         [f"Descartando símbolo '{token}' para recuperar."],
-                    "stepByStepDetailed": [["Este símbolo não pode ser consumido pelo estado atual."]],
-                    "stack":              stack[::-1].copy(),
-                    "input":              input_tape.copy(),
-                    "pointer":            pointer,
-                    "stepMarker":         ["", ""],
-                })
-                errors.append({
-                    "index":   pointer,
-                    "lexeme":  token,
-                    "message": build_error_message(action_table, state, token)
-                })
-                pointer += 1
-                if pointer >= len(input_tape):
-                    detailed_steps.append({
-                        "stepByStep":         ["Erro fatal: esgotou a entrada durante a recuperação."],
-                        "stepByStepDetailed": [["Não foi possível sincronizar até um símbolo válido."]],
-                        "stack":              stack[::-1].copy(),
-                        "input":              input_tape.copy(),
-                        "pointer":            pointer,
-                        "stepMarker":         ["", ""],
-                    })
-                    return detailed_steps, errors
-                token = input_tape[pointer]
+                trace.record([f"Descartando símbolo '{token}' para recuperar."],
+                             [["Este símbolo não pode ser consumido pelo estado atual."]],
+                             pointer)
+                trace.error(pointer, token,
+                            error_message(recovery, state, token))
+
+            pointer += 1
+            if pointer >= len(input_tape):
+                trace.record(["Erro fatal: esgotou a entrada durante a recuperação."],
+                             [["Não foi possível sincronizar até um símbolo válido."]],
+                             pointer)
+                yield from trace.drain()
+                return
+            yield from trace.drain()
+            token = input_tape[pointer]
 
         # -------------------------------------------------------------------
         # PARTE NORMAL DO ALGORITMO (SHIFT / REDUCE / ACC / ERRO)
@@ -180,31 +286,6 @@ def bottom_up_algorithm(action_table: dict,
         action_cell = action_table[token][state + 1]  # (+1: cabeçalho)
         action_movement = action_cell.split("[")
 
-        action[0] = state + 1
-        action[1] = token
-
-        # ----- ERRO LÉXICO (token não existe na tabela) --------------------
-        if token not in action_table:
-            step_by_step.append("A entrada foi rejeitada devido a um erro léxico!")
-            step_by_step_detailed.append([
-                f"A entrada tem um erro léxico em: {token}.",
-                "Um token identificado não pertence à gramática da linguagem fonte.",
-            ])
-            detailed_steps.append({
-                "stepByStep":         step_by_step.copy(),
-                "stepByStepDetailed": step_by_step_detailed.copy(),
-                "stack":              stack[::-1].copy(),
-                "input":              input_tape.copy(),
-                "pointer":            pointer,
-                "stepMarker":         ["", ""],
-            })
-            errors.append({
-                "index":   pointer,
-                "lexeme":  token,
-                "message": "Erro léxico: token desconhecido."
-            })
-            return detailed_steps, errors
-
         action_tag = action_movement[0].strip()
 
         # normaliza argumento de shift/reduce
@@ -212,132 +293,250 @@ def bottom_up_algorithm(action_table: dict,
             action_movement[1] = action_movement[1].strip(" ]")
 
         # log padrão
-        step_by_step.append(f"AÇÃO[{token}, {state}] => {action_cell}")
-        step_by_step_detailed.append([
-            "Realizada uma busca na tabela de ações.",
-            f"Na coluna >>{token}<< e linha >>{state}<< encontrado movimento: {action_cell}",
-        ])
-        detailed_steps.append({
-            "stepByStep":         step_by_step.copy(),
-            "stepByStepDetailed": step_by_step_detailed.copy(),
-            "stack":              stack[::-1].copy(),
-            "input":              input_tape.copy(),
-            "pointer":            pointer,
-            "stepMarker":         [token, state],
-        })
+        trace.record([f"AÇÃO[{token}, {state}] => {action_cell}"],
+                     [["Realizada uma busca na tabela de ações.",
+                       f"Na coluna >>{token}<< e linha >>{state}<< encontrado "
+                       f"movimento: {action_cell}"]],
+                     pointer, (token, state))
 
         # -------------------------------------------------------------------
         # Movimento REDUZIR
         # -------------------------------------------------------------------
         if action_tag.startswith("REDUZIR"):
+            trace.move()
+            reductions += 1
+            if reductions > n_states * (height_at_shift + 1):
+                trace.record(["Erro fatal: análise interrompida."],
+                             [["As reduções se repetem sem consumir a entrada; "
+                               "verifique ciclos ou conflitos na gramática."]],
+                             pointer)
+                trace.error(pointer, token,
+                            "Erro fatal: a análise não termina (ciclo de "
+                            "reduções sem consumir a entrada).")
+                break
+
             array_action_movement = action_movement[1].split(" ")
 
             reduce_elements = array_action_movement[2:]
             qt_unstack = 2 * len(reduce_elements)
             for _ in range(qt_unstack):
                 stack.pop()
+            trace.pop(qt_unstack)
 
-            # logging (mesmo que antes) …
-
-            transition[0] = int(stack[-1]) + 1
-            transition[1] = array_action_movement[0]
-            goto_movement = goto_table[transition[1]][transition[0]]
+            goto_row    = int(stack[-1]) + 1
+            goto_symbol = array_action_movement[0]
+            goto_movement = goto_table[goto_symbol][goto_row]
 
-            stack.append(array_action_movement[0])
+            stack.append(goto_symbol)
             stack.append(str(int(goto_movement.split()[1])))
+            trace.push(*stack[-2:])
+
+            if tree is not None:
+                size     = len(reduce_elements)
+                children = nodes[len(nodes) - size:]
+                del nodes[len(nodes) - size:]
+                nodes.append(tree.node(tree.intern(goto_symbol), children, pointer))
 
         # -------------------------------------------------------------------
         # Movimento SHIFT
         # -------------------------------------------------------------------
         elif action_tag.startswith("EMPILHAR"):
+            trace.move()
             stack.append(token)
             stack.append(action_movement[1])
+            trace.push(*stack[-2:])
+            if tree is not None:
+                nodes.append(tree.leaf(tree.intern(token), pointer))
             pointer += 1
+            reductions, height_at_shift = 0, len(stack)
 
         # -------------------------------------------------------------------
         # Entrada aceita
         # -------------------------------------------------------------------
         elif action_tag == "ACEITO":
-            detailed_steps.append({
-                "stepByStep":         ["A entrada foi aceita!"],
-                "stepByStepDetailed": [["Aceito"]],
-                "stack":              stack[::-1].copy(),
-                "input":              input_tape.copy(),
-                "pointer":            pointer,
-                "stepMarker":         ["", ""],
-            })
+            trace.move()
+            trace.accepted = trace.error_count == 0
+            trace.record(["A entrada foi aceita!"], [["Aceito"]], pointer)
+            if tree is not None and nodes:
+                tree.root = nodes[-1]
             break
 
+    # -----------------------------------------------------------------------
+    # Fim da análise
+    # -----------------------------------------------------------------------
+    yield from trace.drain()
+
+
+# ---------------------------------------------------------------------------
+# Algoritmo LL(1) (preditivo – top-down)
+# ---------------------------------------------------------------------------
+
+def top_down_algorithm(ll1_table: dict,
+                       start_symbol: str,
+                       input: "str | list[str]",
+                       follow_table: dict | None = None,
+                       trace: "StepTrace | str" = "full"
+                       ) -> tuple[list[dict], list[dict]]:
+    """
+    Executa a análise preditiva dirigida pela tabela LL(1).
+
+    Mesmo formato de retorno de bottom_up_algorithm.  Em erro, o modo
+    pânico desempilha o não-terminal do topo quando o token pertence ao
+    seu FOLLOW (ou é '$') e, caso contrário, descarta o token.
+    """
+    if isinstance(trace, str):
+        trace = StepTrace(trace)
+    for _ in iter_top_down(ll1_table, start_symbol, input, follow_table, trace):
+        pass
+    return trace.steps, trace.errors
+
+
+def iter_top_down(ll1_table: dict,
+                  start_symbol: str,
+                  input: "str | list[str]",
+                  follow_table: dict | None,
+                  trace: StepTrace):
+    """Versão geradora de top_down_algorithm (mesmos eventos de iter_bottom_up)."""
+    nonterminals = set(next(iter(ll1_table.values()), {}).keys())
+    follow_table = follow_table or {}
+
+    stack:   list[str] = ["$", start_symbol]
+    pointer: int       = 0
+
+    input_tape = _input_tape(input)
+
+    trace.start(stack, input_tape)
+
+    expected_by_nonterminal: dict[str, list[str]] = {}
+
+    def expected_for(top: str) -> list[str]:
+        if top not in nonterminals:
+            return [top]
+        if top not in expected_by_nonterminal:
+            expected_by_nonterminal[top] = [
+                t for t, col in ll1_table.items() if col.get(top) != "ERRO!"
+            ]
+        return expected_by_nonterminal[top]
+
+    # trava contra laços sem consumo de entrada (gramáticas com conflito,
+    # p.ex. recursão à esquerda): limite proporcional à pilha no último casamento
+    expansions, height_at_match = 0, len(stack)
+    max_rhs = max(
+        (len(cell.split("->", 1)[1].split())
+         for col in ll1_table.values() for cell in col.values()
+         if cell != "ERRO!"),
+        default=0,
+    )
+    per_level = (max_rhs + 1) * (len(nonterminals) + 1)
+
+    while True:
+        yield from trace.drain()
+
+        top   = stack[-1]
+        token = input_tape[pointer]
+
+        # -------------------------------------------------------------------
+        # Entrada aceita
+        # -------------------------------------------------------------------
+        if top == "$" and token == "$":
+            trace.move()
+            trace.accepted = trace.error_count == 0
+            trace.record(["A entrada foi aceita!"], [["Aceito"]], pointer)
+            break
+
+        # -------------------------------------------------------------------
+        # Erro léxico: o token não é terminal da gramática e é descartado
+        # -------------------------------------------------------------------
+        if token not in ll1_table:
+            trace.error(pointer, token, LEXICAL_ERROR_MESSAGE)
+            pointer += 1
+            trace.record([LEXICAL_ERROR_MESSAGE,
+                          f"Descartando símbolo '{token}' para recuperar."],
+                         [[f"A entrada tem um erro léxico em: {token}.",
+                           "Um token identificado não pertence à gramática da "
+                           "linguagem fonte."]],
+                         pointer)
+            continue
+
         # -------------------------------------------------------------------
-        # ERRO! – dispara modo-pânico
+        # Topo terminal: CASAR ou erro
         # -------------------------------------------------------------------
-        elif action_tag == "ERRO!":
-            msg = build_error_message(action_table, state, token)
-            errors.append({
-                "index":   pointer,
-                "lexeme":  token,
-                "message": msg
-            })
-
-            detailed_steps.append({
-                "stepByStep":         [msg, "Entrando em modo pânico…"],
-                "stepByStepDetailed": [[msg],
-                                       ["O analisador tentará descartar símbolos "
-                                        "até encontrar um ponto de sincronização."]],
-                "stack":              stack[::-1].copy(),
-                "input":              input_tape.copy(),
-                "pointer":            pointer,
-                "stepMarker":         ["", ""],
-            })
-
-            # --- a) DESCARTE DE ENTRADA ------------------------------------
-            while token not in SYNC_SYMBOLS:
+        if top not in nonterminals:
+            if top == token:
+                trace.move()
+                stack.pop()
+                trace.pop()
+                pointer += 1
+                expansions, height_at_match = 0, len(stack)
+                trace.record([f"CASAR '{token}'"],
+                             [["O topo da pilha é igual ao símbolo da entrada.",
+                               "O símbolo é desempilhado e o ponteiro avança."]],
+                             pointer, (token, top))
+                continue
+
+            msg = format_error_message(expected_for(top), token)
+            trace.error(pointer, token, msg)
+
+            if top == "$":
+                # sobrou entrada: descarta até o fim
                 pointer += 1
-                if pointer >= len(input_tape):
-                    return detailed_steps, errors
-                token = input_tape[pointer]
-
-            # --- b) PODA DA PILHA -----------------------------------------
-            recovered = False
-            while stack:
-                state = int(stack[-1])
-                if action_table[token][state + 1] != "ERRO!":
-                    recovered = True
-                    break
-                stack.pop()          # estado
-                if stack:
-                    stack.pop()      # símbolo
-
-            if not recovered:
-                detailed_steps.append({
-                    "stepByStep":         ["Erro fatal: não foi possível sincronizar."],
-                    "stepByStepDetailed": [["A pilha esvaziou sem estado válido."]],
-                    "stack":              stack[::-1].copy(),
-                    "input":              input_tape.copy(),
-                    "pointer":            pointer,
-                    "stepMarker":         ["", ""],
-                })
-                errors.append({
-                    "index":   pointer,
-                    "lexeme":  token,
-                    "message": "Erro fatal: pilha vazia durante recuperação."
-                })
-                return detailed_steps, errors
-
-            # log de sincronização
-            detailed_steps.append({
-                "stepByStep":         [f"Sincronizado em '{token}'. Continuando análise…"],
-                "stepByStepDetailed": [["Símbolo de sincronização encontrado.",
-                                        "Estado válido localizado na pilha. "
-                                        "Retomando o laço principal."]],
-                "stack":              stack[::-1].copy(),
-                "input":              input_tape.copy(),
-                "pointer":            pointer,
-                "stepMarker":         ["", ""],
-            })
-            continue        # volta ao topo do while principal
+                trace.record([msg, f"Descartando símbolo '{token}' para recuperar."],
+                             [[msg], ["Não há mais nada a reconhecer na pilha."]],
+                             pointer)
+            else:
+                stack.pop()
+                trace.pop()
+                trace.record([msg, f"Desempilhando terminal '{top}' para recuperar."],
+                             [[msg], ["O terminal esperado é considerado inserido."]],
+                             pointer)
+            continue
 
-    # -----------------------------------------------------------------------
-    # Fim da análise
-    # -----------------------------------------------------------------------
-    return detailed_steps, errors
+        # -------------------------------------------------------------------
+        # Topo não-terminal: consulta M[top, token]
+        # -------------------------------------------------------------------
+        cell = ll1_table[token].get(top, "ERRO!")
+
+        if cell == "ERRO!":
+            msg = format_error_message(expected_for(top), token)
+            trace.error(pointer, token, msg)
+
+            if token == "$" or token in follow_table.get(top, ()):
+                stack.pop()
+                trace.pop()
+                trace.record([msg, f"Sincronizado em '{token}'. Desempilhando '{top}'."],
+                             [[msg], ["O token pertence ao FOLLOW do não-terminal do "
+                                      "topo; o não-terminal é descartado."]],
+                             pointer)
+            else:
+                pointer += 1
+                trace.record([msg, f"Descartando símbolo '{token}' para recuperar."],
+                             [[msg], ["Este símbolo não pode iniciar nem seguir o "
+                                      "não-terminal do topo."]],
+                             pointer)
+            continue
+
+        trace.move()
+        expansions += 1
+        if expansions > per_level * (height_at_match + 1):
+            trace.error(pointer, token,
+                        "Erro fatal: a análise entrou em laço sem consumir "
+                        "a entrada (a gramática não é LL(1)).")
+            trace.record(["Erro fatal: análise interrompida."],
+                         [["As expansões se repetem sem consumir a entrada; verifique "
+                           "recursão à esquerda ou conflitos na tabela LL(1)."]],
+                         pointer)
+            break
+
+        rhs = cell.split("->", 1)[1].split()
+        stack.pop()
+        stack.extend(reversed(rhs))
+        trace.pop()
+        trace.push(*reversed(rhs))
+
+        trace.record([f"M[{top}, {token}] => {cell}"],
+                     [["Realizada uma busca na tabela LL(1).",
+                       f"Na coluna >>{token}<< e linha >>{top}<< encontrada a "
+                       f"produção: {cell}"]],
+                     pointer, (token, top))
+
+    yield from trace.drain()
@@ -1,39 +1,98 @@
 # Importacoes
-import pandas as pd
-import re
+import asyncio
+import contextvars
+import io
+import os
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 
-TOKEN_RE = re.compile(r"""
-    [A-Za-z_][A-Za-z_0-9]* |  # identificadores e palavras-chave (id, if, while)
-    \d+\.\d+ | \d+          |  # números
-    \+\+|--|==|!=|<=|>=     |  # operadores de 2 chars
-    [+\-*/%(){}\[\];|&]       # operadores / pontuação de 1 char
-""", re.VERBOSE)
+from app import compiled_table
+from app import lexer
+from app import ll_table
+from app import lr_table
+from app import metrics
+from app import packed_table
+from app import scraped_table
+from app.grammar import parse_grammar
+from app.shared_tables import SHARED_TABLES
+from app.table_cache import TABLE_CACHE, cache_key
+from app.table_fixtures import FIXTURES
 
-def tokenize(text: str) -> list[str]:
-    return TOKEN_RE.findall(text)
+# Configuração lida do ambiente a cada uso, e não na importação: mudar
+# SASC_TABLE_SOURCE, SASC_TABLE_FORMAT, SASC_SMLWEB_URL ou os timeouts
+# depois de importar o módulo (p.ex. num teste, ou ao subir o
+# app.smlweb_standin) vale para a próxima tabela gerada – as que já estão
+# no TABLE_CACHE não são refeitas.
 
-# Obtem a tabela de analise do site: https://smlweb.cpsc.ucalgary.ca/
-def get_parsing_table(grammar, analysis_type):
-    if analysis_type == "ll1":
-        aux_type = "ll1-table"
-    elif analysis_type == "slr1":
-        aux_type = "lr0"
-    else:
-        aux_type = analysis_type
-
-    print(aux_type, grammar)
-    url = f"https://smlweb.cpsc.ucalgary.ca/{aux_type}.php?grammar={grammar}"
-    url = url.replace(" ", "%20")
-
-    parsing_table = pd.read_html(url)
-    if analysis_type == "lr0" or analysis_type == "lr1":
-        return parsing_table[2]
-    elif analysis_type == "ll1":
-        return parsing_table[1]
-    elif analysis_type == "slr1" or analysis_type == "lalr1":
-        return parsing_table[3]
-    else:
-        return {"Erro": "Houve um erro!"}
+# Origem das tabelas: "native" (gerador local) ou "smlweb" (consulta remota)
+def table_source() -> str:
+    return os.getenv("SASC_TABLE_SOURCE", "native")
+
+
+# Consulta remota: endereço base e timeouts (conexão, leitura) em segundos
+def smlweb_url() -> str:
+    return os.getenv("SASC_SMLWEB_URL", "https://smlweb.cpsc.ucalgary.ca").rstrip("/")
+
+
+def fetch_timeout() -> tuple[float, float]:
+    return (float(os.getenv("SASC_FETCH_CONNECT_TIMEOUT", "5")),
+            float(os.getenv("SASC_FETCH_TIMEOUT", "30")))
+
+
+# Representação usada pelos drivers rápidos: "dense" (compiled_table) ou
+# "packed" (packed_table – bem menor em memória, um pouco mais lenta)
+def table_format() -> str:
+    return os.getenv("SASC_TABLE_FORMAT", "dense")
+
+
+# Tamanho do pool de threads que gera/busca tabelas fora do event loop (e
+# das conexões HTTP); este, sim, é fixo na importação
+TABLE_WORKERS = int(os.getenv("SASC_TABLE_WORKERS", "8"))
+
+TABLE_EXECUTOR = ThreadPoolExecutor(max_workers=TABLE_WORKERS,
+                                    thread_name_prefix="sasc-tables")
+
+# Sessão HTTP compartilhada: conexões keep-alive reaproveitadas entre buscas
+HTTP_SESSION = requests.Session()
+HTTP_SESSION.mount("https://", HTTPAdapter(pool_maxsize=TABLE_WORKERS))
+HTTP_SESSION.mount("http://", HTTPAdapter(pool_maxsize=TABLE_WORKERS))
+
+# Página do smlweb e posição da tabela (em pd.read_html) por tipo de análise
+TABLE_PAGES = {
+    "ll1":   ("ll1-table", 1),
+    "lr0":   ("lr0", 2),
+    "slr1":  ("lr0", 3),
+    "lalr1": ("lalr1", 3),
+    "lr1":   ("lr1", 2),
+}
+
+
+# HTML da página da tabela – da rede ou das fixtures (app.table_fixtures)
+def fetch_table_page(grammar, analysis_type):
+    if FIXTURES.mode == "replay":
+        return FIXTURES.load(grammar, analysis_type)
+
+    page, _ = TABLE_PAGES[analysis_type]
+    response = HTTP_SESSION.get(
+        f"{smlweb_url()}/{page}.php",
+        params={"grammar": grammar},
+        timeout=fetch_timeout(),
+    )
+    response.raise_for_status()
+
+    if FIXTURES.mode == "record":
+        FIXTURES.save(grammar, analysis_type, response.text)
+    return response.text
+
+
+# Extrai a tabela de análise (DataFrame) do HTML da página; o pandas só é
+# importado aqui (caminho reserva de convert_scraped_page)
+def read_parsing_table(html, analysis_type):
+    import pandas as pd
+
+    _, index = TABLE_PAGES[analysis_type]
+    return pd.read_html(io.StringIO(html))[index]
 
 
 # Converter tabela em dicionario
@@ -46,30 +105,207 @@ def get_parsing_dict(parsing_table):
     return parsing_table.to_dict()
 
 
-# Separar terminais e nao-terminais
+# Separar terminais e nao-terminais – mesma leitura da gramática usada
+# pelos geradores (app.grammar): os símbolos são as palavras separadas por
+# espaço, então "=", ";" e qualquer outra pontuação também são terminais
+# e "|" nunca é
 def sep_terminals_nonterminals(grammar: str):
-    nonterminals, terminals = set(), []
+    parsed = parse_grammar(grammar)
+    return {"terminals": parsed.terminals, "nonterminals": parsed.nonterminals}
+
+
+# Tabelas da gramática, reaproveitadas do cache quando possível
+def get_goto_action_tables(grammar, analysis_type):
+    with metrics.phase("tables", analysis_type):
+        return TABLE_CACHE.get_or_build(grammar, analysis_type, build_goto_action_tables)
+
+
+# Versões para as rotas async: um acerto no cache em memória responde na
+# hora; geração e consulta remota rodam no pool limitado TABLE_EXECUTOR,
+# sem travar o event loop (o contexto vai junto, para as métricas).  Os
+# dois caminhos contam na fase "tables" – um acerto aparece como ~0 ms.
+# Pedidos repetidos da mesma tabela enquanto ela é gerada esperam no próprio
+# event loop (_PENDING), sem ocupar outra thread do pool
+async def get_goto_action_tables_async(grammar, analysis_type):
+    return await _off_loop(get_goto_action_tables, grammar, analysis_type, "tables")
+
+
+async def get_compiled_tables_async(grammar, analysis_type):
+    return await _off_loop(get_compiled_tables, grammar, analysis_type, "compiled")
+
+
+async def get_packed_tables_async(grammar, analysis_type):
+    return await _off_loop(get_packed_tables, grammar, analysis_type, "packed")
+
+
+async def get_runtime_tables_async(grammar, analysis_type):
+    if table_format() == "packed":
+        return await get_packed_tables_async(grammar, analysis_type)
+    return await get_compiled_tables_async(grammar, analysis_type)
+
+
+async def get_lexer_async(grammar, analysis_type):
+    return await _off_loop(get_lexer, grammar, analysis_type, "lexer")
+
+
+async def get_recovery_table_async(grammar, analysis_type):
+    return await _off_loop(get_recovery_table, grammar, analysis_type, "recovery")
+
+
+_PENDING: dict[str, asyncio.Future] = {}     # chave do cache → geração em curso
+
+
+async def _off_loop(getter, grammar, analysis_type, kind):
+    with metrics.phase("tables", analysis_type):
+        cached = TABLE_CACHE.peek(grammar, analysis_type, kind)
+        if cached is not None:
+            return cached
+
+        key = cache_key(grammar, analysis_type, kind)
+        pending = _PENDING.get(key)
+        if pending is None:
+            context = contextvars.copy_context()
+            pending = asyncio.get_running_loop().run_in_executor(
+                TABLE_EXECUTOR, context.run, getter, grammar, analysis_type
+            )
+            _PENDING[key] = pending
+            pending.add_done_callback(lambda _: _PENDING.pop(key, None))
+        # shield: um cliente que desiste não cancela a geração dos outros
+        return await asyncio.shield(pending)
+
+
+# Tabelas LR compiladas em vetores de inteiros (para os drivers rápidos).
+# Com SASC_SHARED_TABLE_DIR, vêm mapeadas do store compartilhado entre os
+# workers (app.shared_tables), que já é a camada persistente delas
+def get_compiled_tables(grammar, analysis_type):
+    return TABLE_CACHE.get_or_build(
+        grammar, analysis_type, build_compiled_tables, kind="compiled",
+        persist=not SHARED_TABLES.enabled,
+    )
 
-    for rule in grammar.split("."):
-        if not rule.strip():
-            continue
-        lhs, rhs = rule.split("->")
-        lhs = lhs.strip()
-        nonterminals.add(lhs)
 
-        # tokeniza o lado direito inteiro
-        for tok in tokenize(rhs):
-            terminals.append(tok)
+def build_compiled_tables(grammar, analysis_type):
+    return SHARED_TABLES.get_or_build(
+        grammar, analysis_type, "compiled", _compile_tables
+    )
 
-    # remove duplicados e símbolos que são não-terminais
-    terminals = [t for t in set(terminals) if t not in nonterminals]
-    return {"terminals": terminals, "nonterminals": list(nonterminals)}
 
+def _compile_tables(grammar, analysis_type):
+    tables = get_goto_action_tables(grammar, analysis_type)
+    return compiled_table.compile_tables(
+        tables["action_table"], tables["goto_table"]
+    )
+
+
+# Tabelas compactadas (row displacement); geradas direto da forma densa,
+# sem guardar a densa no cache
+def get_packed_tables(grammar, analysis_type):
+    return TABLE_CACHE.get_or_build(
+        grammar, analysis_type, build_packed_tables, kind="packed",
+        persist=not SHARED_TABLES.enabled,
+    )
+
+
+def build_packed_tables(grammar, analysis_type):
+    return SHARED_TABLES.get_or_build(
+        grammar, analysis_type, "packed", _pack_tables
+    )
+
+
+def _pack_tables(grammar, analysis_type):
+    return packed_table.pack_tables(build_compiled_tables(grammar, analysis_type))
+
+
+# Tabelas do driver rápido, na representação escolhida por table_format()
+def get_runtime_tables(grammar, analysis_type):
+    if table_format() == "packed":
+        return get_packed_tables(grammar, analysis_type)
+    return get_compiled_tables(grammar, analysis_type)
+
+
+# Léxico da gramática (app.lexer), com os mesmos ids de terminal das
+# tabelas compiladas (ordem das colunas da tabela).  Nas análises LR vem
+# das tabelas do driver rápido – com SASC_SHARED_TABLE_DIR, mapeadas do
+# store –, sem precisar das tabelas de string neste worker
+def get_lexer(grammar, analysis_type):
+    return TABLE_CACHE.get_or_build(grammar, analysis_type, build_lexer, kind="lexer")
+
+
+def build_lexer(grammar, analysis_type):
+    if analysis_type != "ll1":
+        runtime = get_runtime_tables(grammar, analysis_type)
+        return lexer.build_lexer(runtime.terminals, runtime.terminal_ids)
+
+    tables = get_goto_action_tables(grammar, analysis_type)
+    return lexer.build_lexer(
+        tables["terminals_nonterminals"]["terminals"],
+        {t: i for i, t in enumerate(tables["ll1_table"])},
+    )
+
+
+# Esperados e mensagens de erro por estado, calculados uma vez por tabela
+# (também a partir das tabelas do driver rápido)
+def get_recovery_table(grammar, analysis_type):
+    return TABLE_CACHE.get_or_build(
+        grammar, analysis_type, build_recovery_table, kind="recovery"
+    )
+
+
+def build_recovery_table(grammar, analysis_type):
+    return packed_table.recovery_table(get_runtime_tables(grammar, analysis_type))
+
+
+# Conflitos LR (rota /grammar-analysis) lidos das tabelas em cache – a
+# análise da gramática aquece o cache para as análises de entrada que vêm
+# depois.  Tabelas raspadas do smlweb não listam conflitos, e a rota não
+# deve ir à rede: nesses casos o gerador local é chamado direto
+def get_conflicts(grammar, analysis_type):
+    if table_source() == "native":
+        tables = get_goto_action_tables(grammar, analysis_type)
+        if "conflicts" in tables:
+            return tables["conflicts"]
+    return lr_table.build_lr_tables(grammar, analysis_type).conflicts
 
 
 # Separar tabela de acoes e transicoes
-def get_goto_action_tables(grammar, analysis_type):
-    parsing_table = get_parsing_dict(get_parsing_table(grammar, analysis_type))
+def build_goto_action_tables(grammar, analysis_type, source=None):
+    # a tabela LL(1) raspada perde o rótulo das linhas; é sempre gerada aqui
+    if analysis_type == "ll1":
+        with metrics.phase("build", analysis_type):
+            return get_native_ll1_table(grammar)
+    if (source or table_source()) == "native":
+        with metrics.phase("build", analysis_type):
+            return get_native_tables(grammar, analysis_type)
+
+    with metrics.phase("fetch", analysis_type):
+        page = fetch_table_page(grammar, analysis_type)
+    with metrics.phase("convert", analysis_type):
+        return convert_scraped_page(grammar, page, analysis_type)
+
+
+# Página do smlweb → tabelas action/goto numa só passada (app.scraped_table);
+# sem lxml, usa o caminho antigo via pandas
+def convert_scraped_page(grammar, page, analysis_type):
+    if not scraped_table.AVAILABLE:
+        return convert_scraped_table(grammar, read_parsing_table(page, analysis_type))
+
+    term_nterm = sep_terminals_nonterminals(grammar)
+    action, goto = scraped_table.extract_tables(
+        page,
+        TABLE_PAGES[analysis_type][1],
+        term_nterm["terminals"],
+        term_nterm["nonterminals"],
+    )
+    return {
+        "terminals_nonterminals": term_nterm,
+        "action_table": action,
+        "goto_table": goto,
+    }
+
+
+# Converte a tabela raspada do smlweb nas tabelas action/goto
+def convert_scraped_table(grammar, raw_table):
+    parsing_table = get_parsing_dict(raw_table)
     term_nterm = sep_terminals_nonterminals(grammar)
 
     action = {
@@ -97,6 +333,29 @@ def get_goto_action_tables(grammar, analysis_type):
     }
 
 
+# Gera as tabelas localmente (sem rede), no mesmo formato do smlweb
+def get_native_tables(grammar, analysis_type):
+    tables = lr_table.build_lr_tables(grammar, analysis_type)
+    return {
+        "terminals_nonterminals": sep_terminals_nonterminals(grammar),
+        "action_table": tables.action_table,
+        "goto_table": tables.goto_table,
+        "conflicts": tables.conflicts,
+    }
+
+
+# Tabela preditiva LL(1), gerada localmente
+def get_native_ll1_table(grammar):
+    table = ll_table.build_ll1_table(grammar)
+    return {
+        "terminals_nonterminals": sep_terminals_nonterminals(grammar),
+        "ll1_table": table.ll1_table,
+        "start_symbol": table.start_symbol,
+        "follow_table": table.follow_table,
+        "conflicts": table.conflicts,
+    }
+
+
 def replace_dict(dictionary, original, final):
     for key in dictionary.keys():
         for index, value in dictionary[key].items():
@@ -122,8 +381,6 @@ def replace_functions(dictionary):
 
 
 # open_site('https://www.selenium.dev/documentation/webdriver/getting_started/install_drivers/')
-# print(get_parsing_table('SOMA->A|d.A->b.A->c.', 'slr1'))
-# print(get_parsing_dict(get_parsing_table('SOMA->A|d.A->b.A->c.', 'slr1')))
 # print(
 #    get_goto_action_tables(
 #        "E->E v T.E->T.T->T and F.T->F.F->parenteses_esq E parenteses_dir.F->id.",
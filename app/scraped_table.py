@@ -0,0 +1,91 @@
+# ---------------------------------------------------------------------------
+# Extração direta (lxml) da tabela do smlweb
+# ---------------------------------------------------------------------------
+#
+# Substitui, numa única passada pelas células, o caminho
+#
+#     pd.read_html → get_parsing_dict (drop / cabeçalho / fillna / to_dict)
+#       → replace_dict ×2 → replace_functions ×2
+#
+# produzindo direto action_table / goto_table no formato do projeto:
+#
+#     ""        → "ERRO!" (action) | " " (goto)
+#     "acc"     → "ACEITO"
+#     "r(X)"    → "REDUZIR[ X ]"
+#     "s3"      → "EMPILHAR[ 3 ]"
+#     "3"       → "EMPILHAR[ 3 ]"   (goto numérico)
+#
+# Linhas indexadas por estado + 1 e colunas na ordem da página.  Sem lxml,
+# AVAILABLE é False e parsing_table cai no caminho do pandas.
+# ---------------------------------------------------------------------------
+
+import re
+
+try:
+    from lxml import html as lxml_html
+except ImportError:           # pragma: no cover - lxml faz parte do requirements
+    lxml_html = None
+
+AVAILABLE = lxml_html is not None
+
+# mesma normalização de espaços que pd.read_html aplica ao texto das células
+_WHITESPACE_RE = re.compile(r"[\r\n]+|\s{2,}")
+
+
+def _cell_text(cell) -> str:
+    return _WHITESPACE_RE.sub(" ", cell.text_content().strip())
+
+
+def _convert(text: str, is_action: bool) -> str:
+    if not text:
+        return "ERRO!" if is_action else " "
+    if text == "acc":
+        return "ACEITO"
+    if text[0] == "r":
+        return f"REDUZIR[ {text[2:-1]} ]"
+    if text[0] == "s":
+        return f"EMPILHAR[ {text[1:]} ]"
+    if not is_action and text.isdigit():
+        return f"EMPILHAR[ {text} ]"
+    return text
+
+
+def extract_tables(page: str, index: int, terminals,
+                   nonterminals) -> tuple[dict, dict]:
+    """
+    (action_table, goto_table) da `index`-ésima <table> de `page`.
+    `terminals` / `nonterminals` escolhem as colunas ("$" sempre é ação).
+    """
+    tables = lxml_html.fromstring(page).xpath("//table")
+    if index >= len(tables):
+        raise ValueError("Página sem a tabela de análise esperada.")
+    rows = tables[index].xpath("./tr|./thead/tr|./tbody/tr|./tfoot/tr")
+    if not rows:
+        raise ValueError("Tabela de análise vazia.")
+
+    terminals    = set(terminals) | {"$"}
+    nonterminals = set(nonterminals)
+    header = [_cell_text(c) for c in rows[0].xpath("./td|./th")][1:]
+
+    action: dict[str, dict[int, str]] = {}
+    goto:   dict[str, dict[int, str]] = {}
+    columns = []                  # (coluna de destino | None, é ação?) por posição
+    for name in header:
+        if name in terminals:
+            columns.append((action.setdefault(name, {}), True))
+        elif name in nonterminals:
+            columns.append((goto.setdefault(name, {}), False))
+        else:
+            columns.append((None, False))
+    if "$" not in action:
+        raise ValueError("Tabela de análise sem a coluna '$'.")
+
+    for row_number, row in enumerate(rows[1:], start=1):
+        cells = row.xpath("./td|./th")[1:]
+        for position, (column, is_action) in enumerate(columns):
+            if column is None:
+                continue
+            text = _cell_text(cells[position]) if position < len(cells) else ""
+            column[row_number] = _convert(text, is_action)
+
+    return action, goto
@@ -0,0 +1,279 @@
+# ---------------------------------------------------------------------------
+# Tabelas compiladas compartilhadas entre workers (arquivos mapeados)
+# ---------------------------------------------------------------------------
+#
+# Com vários workers do uvicorn, cada processo geraria e guardaria a sua
+# cópia de cada tabela.  Com SASC_SHARED_TABLE_DIR definido (de preferência
+# em /dev/shm), as tabelas compiladas (compiled_table) e compactadas
+# (packed_table) viram um arquivo por gramática + tipo:
+#
+#     MAGIC | tamanho do cabeçalho | cabeçalho JSON | segmentos binários
+#
+# Os campos array/bytes ficam nos segmentos e são lidos com mmap +
+# memoryview.cast – nenhum byte é copiado para o heap do processo, e todos
+# os workers do host dividem as mesmas páginas do cache do sistema.  Os
+# demais campos (nomes de terminais, produções…) vão no cabeçalho.
+#
+# O primeiro worker que precisar de uma tabela a gera sob um flock (num
+# <chave>.tbl.lock, apagado ao fim da geração); os outros esperam e só
+# mapeiam o arquivo pronto (aquecimento uma vez por host).  A gravação é
+# atômica (arquivo temporário + os.replace).
+#
+# Cada processo mantém mapeadas no máximo SASC_CACHE_SIZE tabelas (LRU) –
+# inclusive os processos do pool do batch, que recebem SharedRef e mapeiam
+# cada arquivo uma só vez; a que sai – do LRU daqui ou do TABLE_CACHE – tem
+# o mmap (e o descritor de arquivo dele) fechado assim que nenhuma
+# requisição a estiver usando.
+# ---------------------------------------------------------------------------
+
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from array import array
+from collections import OrderedDict
+from typing import NamedTuple
+
+from app.compiled_table import CompiledTable
+from app.packed_table import PackedTable
+from app.table_cache import CACHE_SIZE, TABLE_CACHE, cache_key
+
+try:
+    import fcntl
+except ImportError:           # Windows: sem trava; no pior caso dois workers geram
+    fcntl = None
+
+SHARED_TABLE_DIR = os.getenv("SASC_SHARED_TABLE_DIR") or None
+
+KINDS = {"compiled": CompiledTable, "packed": PackedTable}
+
+_MAGIC  = b"SASCTB01"
+_HEADER = struct.Struct("<8sI")
+_ALIGN  = 8
+
+
+class SharedRef(NamedTuple):
+    """Referência serializável a uma tabela do store (ex.: para o batch)."""
+    kind: str
+    path: str
+
+
+# ---------------------------------------------------------------------------
+# Formato do arquivo
+# ---------------------------------------------------------------------------
+
+def dump_table(table, path: str) -> None:
+    """Grava `table` (CompiledTable / PackedTable) de forma atômica."""
+    fields, segments, blobs, offset = {}, {}, [], 0
+    for name, value in zip(table._fields, table):
+        if isinstance(value, (array, bytes, bytearray, memoryview)):
+            typecode = value.typecode if isinstance(value, array) else (
+                value.format if isinstance(value, memoryview) else "B")
+            data = bytes(value) if not isinstance(value, array) else value.tobytes()
+            segments[name] = [typecode, offset, len(data)]
+            blobs.append(data + b"\0" * (-len(data) % _ALIGN))
+            offset += len(blobs[-1])
+        else:
+            fields[name] = value
+
+    header = json.dumps({
+        "type":     type(table).__name__,
+        "itemsize": array("i").itemsize,
+        "fields":   fields,
+        "segments": segments,
+    }, ensure_ascii=False).encode()
+    header += b" " * (-(_HEADER.size + len(header)) % _ALIGN)
+
+    directory = os.path.dirname(path)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, len(header)))
+            f.write(header)
+            for blob in blobs:
+                f.write(blob)
+        os.replace(tmp, path)
+    except OSError:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def load_table(path: str, kind: str):
+    """Mapeia o arquivo; os campos binários são memoryviews sobre o mmap."""
+    return _map_table(path, kind)[0]
+
+
+def _map_table(path: str, kind: str):
+    """(tabela, mmap) – o mmap é devolvido para poder ser fechado depois."""
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    cls = KINDS[kind]
+    try:
+        magic, header_size = _HEADER.unpack_from(mapped)
+        if magic != _MAGIC:
+            raise ValueError(f"Arquivo de tabela inválido: {path}")
+        header = json.loads(mapped[_HEADER.size:_HEADER.size + header_size])
+        if header["type"] != cls.__name__ or header["itemsize"] != array("i").itemsize:
+            raise ValueError(f"Arquivo de tabela incompatível: {path}")
+    except BaseException:
+        mapped.close()
+        raise
+
+    base = _HEADER.size + header_size
+    view = memoryview(mapped)
+    values = dict(header["fields"])
+    for name, (typecode, offset, size) in header["segments"].items():
+        segment = view[base + offset:base + offset + size]
+        values[name] = segment if typecode == "B" else segment.cast(typecode)
+    return cls(**values), mapped
+
+
+# ---------------------------------------------------------------------------
+# Store
+# ---------------------------------------------------------------------------
+
+class SharedTableStore:
+    def __init__(self, directory: str | None = SHARED_TABLE_DIR,
+                 maxsize: int = CACHE_SIZE):
+        self.directory = directory
+        self.maxsize   = maxsize
+        self._opened: OrderedDict[str, tuple] = OrderedDict()  # chave → (tabela, mmap)
+        self._refs:   dict[int, SharedRef] = {}    # id(tabela) → referência
+        self._lock = threading.Lock()
+        self.built = self.mapped = self.released = 0
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.tbl")
+
+    def get_or_build(self, grammar: str, analysis_type: str, kind: str, build):
+        """
+        Tabela `kind` mapeada do store; gerada com build(grammar,
+        analysis_type) pelo primeiro processo que precisar dela.  Sem
+        diretório configurado, só chama build.
+        """
+        if not self.enabled:
+            return build(grammar, analysis_type)
+
+        key = cache_key(grammar, analysis_type, kind)
+        with self._lock:
+            if key in self._opened:
+                self._opened.move_to_end(key)
+                return self._opened[key][0]
+
+        path = self._path(key)
+        if not os.path.exists(path):
+            lock_path = f"{path}.lock"
+            with open(lock_path, "a") as lock:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_EX)     # outro worker pode estar gerando
+                try:
+                    if not os.path.exists(path):
+                        dump_table(build(grammar, analysis_type), path)
+                        with self._lock:
+                            self.built += 1
+                finally:
+                    # quem ainda espera na trava antiga acha a tabela pronta;
+                    # no pior caso (geração que falhou) dois workers geram
+                    try:
+                        os.remove(lock_path)
+                    except OSError:
+                        pass
+                    if fcntl is not None:
+                        fcntl.flock(lock, fcntl.LOCK_UN)
+
+        return self._map(key, kind, path)
+
+    def _map(self, key: str, kind: str, path: str):
+        """Tabela `key` já mapeada neste processo, ou mapeia `path` agora."""
+        with self._lock:
+            if key in self._opened:
+                self._opened.move_to_end(key)
+                return self._opened[key][0]
+
+        table, mapped = _map_table(path, kind)
+        evicted = []
+        with self._lock:
+            if key in self._opened:               # outra thread mapeou antes
+                evicted.append((table, mapped))
+                table = self._opened[key][0]
+            else:
+                self._opened[key] = (table, mapped)
+                self._refs[id(table)] = SharedRef(kind, path)
+                while len(self._opened) > self.maxsize:
+                    evicted.append(self._forget(next(iter(self._opened))))
+            self.mapped = len(self._opened)
+        self._close(evicted)
+        return table
+
+    # -----------------------------------------------------------------------
+    # Liberação (LRU próprio e despejos do TABLE_CACHE)
+    # -----------------------------------------------------------------------
+    def release(self, key: str) -> None:
+        """Desmapeia a tabela `key` (também chamado por TABLE_CACHE.on_evict)."""
+        with self._lock:
+            if key not in self._opened:
+                return
+            evicted = [self._forget(key)]
+            self.mapped = len(self._opened)
+        self._close(evicted)
+
+    def _forget(self, key: str) -> tuple:
+        """Tira `key` dos índices (com o lock); devolve (tabela, mmap)."""
+        table, mapped = self._opened.pop(key)
+        self._refs.pop(id(table), None)
+        return table, mapped
+
+    def _close(self, evicted: list[tuple]) -> None:
+        while evicted:
+            mapped = evicted.pop()[1]     # a tabela sai da lista junto com a tupla
+            self.released += 1
+            try:
+                mapped.close()
+            except BufferError:
+                # uma requisição (ou o TABLE_CACHE) ainda usa a tabela: o mmap
+                # e o descritor são fechados quando a última referência sumir
+                pass
+
+    # -----------------------------------------------------------------------
+    # Passagem entre processos (memoryviews não são serializáveis)
+    # -----------------------------------------------------------------------
+    def reference(self, table):
+        """SharedRef da tabela se ela veio do store; senão a própria tabela."""
+        with self._lock:
+            return self._refs.get(id(table), table)
+
+    def resolve(self, table_or_ref):
+        """
+        Inverso de reference (no processo que recebeu a referência); o
+        arquivo é mapeado uma vez por processo, e não a cada bloco.
+        """
+        if isinstance(table_or_ref, SharedRef):
+            key = os.path.basename(table_or_ref.path).removesuffix(".tbl")
+            return self._map(key, table_or_ref.kind, table_or_ref.path)
+        return table_or_ref
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled":   self.enabled,
+                "directory": self.directory,
+                "mapped":    self.mapped,
+                "maxsize":   self.maxsize,
+                "built":     self.built,
+                "released":  self.released,
+            }
+
+
+SHARED_TABLES = SharedTableStore()
+TABLE_CACHE.on_evict(SHARED_TABLES.release)
@@ -0,0 +1,162 @@
+# ---------------------------------------------------------------------------
+# Substituto local do smlweb (testes de carga / benchmarks sem rede)
+# ---------------------------------------------------------------------------
+#
+#   python -m app.smlweb_standin --port 8765 [--delay 0.2]
+#   SASC_TABLE_SOURCE=smlweb SASC_SMLWEB_URL=http://127.0.0.1:8765 uvicorn main:app
+#
+# Atende /lr0.php, /lalr1.php, /lr1.php e /ll1-table.php?grammar=... com o
+# mesmo leiaute de página que parsing_table.read_parsing_table espera: a
+# tabela de cada tipo na posição de parsing_table.TABLE_PAGES (as
+# anteriores são tabelas de preenchimento) e as células cruas do site:
+#
+#     "s3"  (empilhar / goto)   "r(E -> T)"   "acc"   ""  (erro)
+#
+# As tabelas vêm dos geradores locais (lr_table / ll_table).  `delay`
+# simula a latência do site real.
+# ---------------------------------------------------------------------------
+
+import argparse
+import html
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from app import ll_table, lr_table
+from app.grammar import parse_grammar
+from app.parsing_table import TABLE_PAGES
+
+
+# ---------------------------------------------------------------------------
+# Páginas
+# ---------------------------------------------------------------------------
+
+def _raw_cell(cell: str) -> str:
+    """Célula no formato do projeto → célula crua do smlweb."""
+    cell = cell.strip()
+    if cell.startswith(("EMPILHAR", "REDUZIR")):
+        argument = cell[cell.index("[") + 1:cell.rindex("]")].strip()
+        return f"s{argument}" if cell[0] == "E" else f"r({argument})"
+    if cell == "ACEITO":
+        return "acc"
+    return ""
+
+
+def _html_table(header: list[str], rows: list[list[str]]) -> str:
+    lines = ["<table>"]
+    for row in [[""] + header] + rows:
+        cells = "".join(f"<td>{html.escape(c)}</td>" for c in row)
+        lines.append(f"<tr>{cells}</tr>")
+    lines.append("</table>")
+    return "\n".join(lines)
+
+
+def _lr_table(grammar: str, analysis_type: str) -> str:
+    tables = lr_table.build_lr_tables(grammar, analysis_type)
+    columns = list(tables.action_table) + list(tables.goto_table)
+    cells   = {**tables.action_table, **tables.goto_table}
+    n_states = len(next(iter(tables.action_table.values()), {}))
+    rows = [
+        [str(state)] + [_raw_cell(cells[c][state + 1]) for c in columns]
+        for state in range(n_states)
+    ]
+    return _html_table(columns, rows)
+
+
+def _ll1_table(grammar: str) -> str:
+    table = ll_table.build_ll1_table(grammar).ll1_table
+    columns = list(table)
+    nonterminals = list(next(iter(table.values()), {}))
+    rows = [
+        [nt] + ["" if table[t][nt] == "ERRO!" else table[t][nt] for t in columns]
+        for nt in nonterminals
+    ]
+    return _html_table(columns, rows)
+
+
+def render_page(grammar: str, page: str) -> str:
+    """HTML de /{page}.php para a gramática formatada."""
+    types = {t: index for t, (p, index) in TABLE_PAGES.items() if p == page}
+    if not types:
+        raise LookupError(f"Página desconhecida: {page}.php")
+
+    parsed = parse_grammar(grammar)
+    filler = _html_table(["Gramática"], [
+        [str(i), str(prod)] for i, prod in enumerate(parsed.productions)
+    ])
+    slots  = [filler] * (max(types.values()) + 1)
+    for analysis_type, index in types.items():
+        slots[index] = (_ll1_table(grammar) if analysis_type == "ll1"
+                        else _lr_table(grammar, analysis_type))
+
+    body = "\n".join(slots)
+    return (f"<html><head><title>{html.escape(page)}</title></head>"
+            f"<body>\n{body}\n</body></html>")
+
+
+# ---------------------------------------------------------------------------
+# Servidor HTTP
+# ---------------------------------------------------------------------------
+
+class _Handler(BaseHTTPRequestHandler):
+    delay = 0.0
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        page = url.path.strip("/").removesuffix(".php")
+        grammar = parse_qs(url.query).get("grammar", [""])[0]
+
+        try:
+            if not grammar:
+                raise ValueError("Parâmetro 'grammar' ausente.")
+            body, status = render_page(grammar, page).encode(), 200
+        except LookupError as e:
+            body, status = str(e).encode(), 404
+        except ValueError as e:
+            body, status = str(e).encode(), 400
+
+        if self.delay:
+            time.sleep(self.delay)
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(host: str = "127.0.0.1", port: int = 0,
+                delay: float = 0.0) -> ThreadingHTTPServer:
+    handler = type("Handler", (_Handler,), {"delay": delay})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def serve_in_background(host: str = "127.0.0.1", port: int = 0,
+                        delay: float = 0.0) -> tuple[ThreadingHTTPServer, str]:
+    """Sobe o servidor numa thread daemon; devolve (servidor, URL base)."""
+    server = make_server(host, port, delay)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_port}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Substituto local do smlweb")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0,
+                        help="latência artificial por requisição (s)")
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.delay)
+    print(f"smlweb local em http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
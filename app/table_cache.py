@@ -0,0 +1,187 @@
+# ---------------------------------------------------------------------------
+# Cache de tabelas por gramática (LRU em memória + persistência em disco)
+# ---------------------------------------------------------------------------
+#
+# Chave = gramática normalizada (utils.grammar_formatter) + tipo de análise
+# (+ o tipo de artefato: tabelas de string, tabelas compiladas…).
+# A camada em disco é opcional (SASC_CACHE_DIR) e sobrevive a reinícios:
+# cada entrada vira um arquivo <chave>.pickle gravado de forma atômica.
+# Chamadas concorrentes para a mesma chave ausente são agrupadas
+# (single-flight): só uma gera/busca a tabela, as outras esperam o resultado.
+# ---------------------------------------------------------------------------
+
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from app import utils
+
+CACHE_SIZE = int(os.getenv("SASC_CACHE_SIZE", "256"))
+CACHE_DIR  = os.getenv("SASC_CACHE_DIR") or None
+
+
+def cache_key(grammar: str, analysis_type: str, kind: str = "tables") -> str:
+    normalized = utils.grammar_formatter(grammar)
+    return hashlib.sha256(
+        f"{kind}\n{analysis_type}\n{normalized}".encode()
+    ).hexdigest()
+
+
+class TableCache:
+    """
+    LRU limitado a `maxsize` entradas.  Os valores devolvidos são
+    compartilhados entre requisições e não devem ser alterados.
+    """
+
+    def __init__(self, maxsize: int = CACHE_SIZE, directory: str | None = CACHE_DIR):
+        self.maxsize   = maxsize
+        self.directory = directory
+        self._entries: OrderedDict[str, object] = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: dict[str, Future] = {}
+        self._evict_listeners: list = []
+        self.hits = self.disk_hits = self.misses = self.coalesced = 0
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    # -----------------------------------------------------------------------
+    # Consulta
+    # -----------------------------------------------------------------------
+    def get_or_build(self, grammar: str, analysis_type: str, build,
+                     kind: str = "tables", persist: bool = True):
+        """
+        Devolve a entrada em cache ou chama build(grammar, analysis_type).
+        `persist=False` deixa a entrada fora da camada em disco (valores que
+        já têm a sua própria persistência, como os de app.shared_tables).
+        """
+        key = cache_key(grammar, analysis_type, kind)
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            pending = self._inflight.get(key)
+            if pending is None:
+                self._inflight[key] = Future()
+            else:
+                self.coalesced += 1
+
+        if pending is not None:
+            return pending.result()     # outra thread já está gerando
+
+        try:
+            value = self._load(key) if persist else None
+            if value is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                    evicted = self._store(key, value)
+            else:
+                value = build(grammar, analysis_type)
+                with self._lock:
+                    self.misses += 1
+                    evicted = self._store(key, value)
+                if persist:
+                    self._save(key, value)
+            self._notify(evicted)
+        except BaseException as e:
+            self._finish(key).set_exception(e)
+            raise
+
+        self._finish(key).set_result(value)
+        return value
+
+    def peek(self, grammar: str, analysis_type: str, kind: str = "tables"):
+        """Só o cache em memória: a entrada ou None, sem gerar nada."""
+        key = cache_key(grammar, analysis_type, kind)
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+    def _finish(self, key: str) -> Future:
+        with self._lock:
+            return self._inflight.pop(key)
+
+    def _store(self, key: str, value) -> list[tuple[str, object]]:
+        """Guarda a entrada (com o lock); devolve as que saíram do LRU."""
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        evicted = []
+        while len(self._entries) > self.maxsize:
+            evicted.append(self._entries.popitem(last=False))
+        return evicted
+
+    def on_evict(self, listener) -> None:
+        """listener(chave) é chamado para cada entrada que sai do LRU."""
+        self._evict_listeners.append(listener)
+
+    def _notify(self, evicted: list[tuple[str, object]]) -> None:
+        # solta os valores antes de avisar: quem escuta pode querer liberar
+        # recursos presos a eles (ex.: mmaps de app.shared_tables)
+        keys = [key for key, _ in evicted]
+        evicted.clear()
+        for key in keys:
+            for listener in self._evict_listeners:
+                listener(key)
+
+    # -----------------------------------------------------------------------
+    # Persistência
+    # -----------------------------------------------------------------------
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pickle")
+
+    def _load(self, key: str):
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(key), "rb") as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, TypeError, AttributeError):
+            return None               # ausente, corrompido ou de outra versão
+
+    def _save(self, key: str, value) -> None:
+        if not self.directory:
+            return
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._path(key))
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    # -----------------------------------------------------------------------
+    # Manutenção / estatísticas
+    # -----------------------------------------------------------------------
+    def clear(self) -> None:
+        with self._lock:
+            evicted = list(self._entries.items())
+            self._entries.clear()
+            self.hits = self.disk_hits = self.misses = self.coalesced = 0
+        self._notify(evicted)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "hits":       self.hits,
+                "disk_hits":  self.disk_hits,
+                "misses":     self.misses,
+                "coalesced":  self.coalesced,
+                "hit_rate":   (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                "size":       len(self._entries),
+                "maxsize":    self.maxsize,
+                "persistent": bool(self.directory),
+            }
+
+
+TABLE_CACHE = TableCache()
@@ -0,0 +1,59 @@
+# ---------------------------------------------------------------------------
+# Gravação / reprodução das páginas do smlweb (fixtures)
+# ---------------------------------------------------------------------------
+#
+# SASC_FIXTURE_MODE:
+#   off     – comportamento normal (consulta o site a cada tabela nova)
+#   record  – consulta o site e grava cada página recebida em SASC_FIXTURE_DIR
+#   replay  – nunca vai à rede: responde com as páginas gravadas (uma
+#             gramática sem fixture é um erro, não uma consulta escondida)
+#
+# Cada página vira <tipo>-<hash da gramática>.html, com o HTML exatamente
+# como veio do servidor, então o caminho pd.read_html → conversão roda de
+# verdade nos testes e benchmarks offline.
+# ---------------------------------------------------------------------------
+
+import hashlib
+import os
+import tempfile
+
+FIXTURE_MODES = ("off", "record", "replay")
+FIXTURE_MODE  = os.getenv("SASC_FIXTURE_MODE", "off")
+FIXTURE_DIR   = os.getenv("SASC_FIXTURE_DIR", "fixtures/smlweb")
+
+
+class FixtureStore:
+    def __init__(self, directory: str = FIXTURE_DIR, mode: str = FIXTURE_MODE):
+        if mode not in FIXTURE_MODES:
+            raise ValueError(f"SASC_FIXTURE_MODE inválido: {mode}")
+        self.directory = directory
+        self.mode      = mode
+
+    def path(self, grammar: str, analysis_type: str) -> str:
+        digest = hashlib.sha256(grammar.encode()).hexdigest()[:16]
+        return os.path.join(self.directory, f"{analysis_type}-{digest}.html")
+
+    def load(self, grammar: str, analysis_type: str) -> str:
+        try:
+            with open(self.path(grammar, analysis_type), encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            raise LookupError(
+                f"Sem fixture gravada para {analysis_type}: {grammar}"
+            ) from None
+
+    def save(self, grammar: str, analysis_type: str, page: str) -> None:
+        """Gravação atômica (leitores nunca veem um arquivo pela metade)."""
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(page)
+            os.replace(tmp, self.path(grammar, analysis_type))
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+
+FIXTURES = FixtureStore()
@@ -0,0 +1,284 @@
+# ---------------------------------------------------------------------------
+# Benchmarks do SASC (100% offline)
+# ---------------------------------------------------------------------------
+#
+#   python -m benchmarks.bench                      # gera bench_results.json
+#   python -m benchmarks.bench --quick              # tamanhos reduzidos
+#   python -m benchmarks.bench --compare antigo.json --threshold 0.2
+#
+# Mede separadamente utils.grammar_formatter, a geração de tabelas
+# (parsing_table.build_goto_action_tables com o gerador local), a conversão
+# da página do smlweb (gerada por app.smlweb_standin),
+# sep_terminals_nonterminals, grammar_analysis.compute_sets,
+# bottom_up_algorithm (por nível de trace) e os drivers compilado (com e
+# sem árvore sintática) e compactado, sobre famílias sintéticas de
+# gramáticas e entradas.
+# Para cada caso registra tempo (melhor de N), vazão e pico de memória
+# (tracemalloc, numa execução separada para não distorcer o tempo).
+# ---------------------------------------------------------------------------
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from app import compiled_table
+from app import grammar_analysis
+from app import lexer
+from app import packed_table
+from app import parse_tree
+from app import parsing_algorithm
+from app import parsing_table
+from app import smlweb_standin
+from app import utils
+
+SEED = 2024
+
+
+# ---------------------------------------------------------------------------
+# Famílias de gramáticas
+# ---------------------------------------------------------------------------
+
+def operators(depth: int) -> list[str]:
+    """Um operador distinto por nível de precedência."""
+    symbols = ["+", "*", "-", "/", "%", "&"]
+    return [symbols[i] if i < len(symbols) else f"op{i}" for i in range(depth)]
+
+
+def expression_grammar(depth: int) -> str:
+    """E0 -> E0 op0 E1 | E1 … E{d} -> ( E0 ) | id   (um operador por nível)."""
+    rules = []
+    for level, op in enumerate(operators(depth)):
+        rules.append(f"E{level}->E{level} {op} E{level + 1}|E{level + 1}")
+    rules.append(f"E{depth}->(E0)|id")
+    return ".".join(rules)
+
+
+def statement_grammar() -> str:
+    return ("P->S ; P|S ;."
+            "S->print E|if ( E ) { P }|while ( E ) { P }."
+            "E->E + T|T.T->T * F|F.F->( E )|id|num")
+
+
+# ---------------------------------------------------------------------------
+# Geradores de entrada
+# ---------------------------------------------------------------------------
+
+def expression_input(rng: random.Random, depth: int, n_tokens: int) -> str:
+    ops = operators(depth)
+    tokens = ["id"]
+    while len(tokens) < n_tokens:
+        if rng.random() < 0.1:
+            tokens += [rng.choice(ops), "(", "id", rng.choice(ops), "id", ")"]
+        else:
+            tokens += [rng.choice(ops), "id"]
+    return " ".join(tokens)
+
+
+def statement_input(rng: random.Random, n_statements: int) -> str:
+    def expr() -> str:
+        return " + ".join(rng.choice(["id", "num", "( id * num )"])
+                          for _ in range(rng.randint(1, 4)))
+
+    parts = []
+    for _ in range(n_statements):
+        kind = rng.random()
+        if kind < 0.7:
+            parts.append(f"print {expr()} ;")
+        elif kind < 0.85:
+            parts.append(f"if ( {expr()} ) {{ print {expr()} ; }} ;")
+        else:
+            parts.append(f"while ( {expr()} ) {{ print {expr()} ; }} ;")
+    return " ".join(parts)
+
+
+def corrupt(rng: random.Random, text: str, rate: float) -> str:
+    """Troca/insere tokens inválidos numa fração `rate` das posições."""
+    tokens = text.split()
+    for i in range(len(tokens)):
+        if rng.random() < rate:
+            tokens[i] = rng.choice([";", ")", "*", "id id", "{"])
+    return " ".join(tokens)
+
+
+# ---------------------------------------------------------------------------
+# Medição
+# ---------------------------------------------------------------------------
+
+def measure(fn, repeat: int) -> dict:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"seconds": best, "peak_bytes": peak}
+
+
+def case(results: list, name: str, fn, repeat: int, units: int, unit: str,
+         **params) -> None:
+    row = {"name": name, **params, **measure(fn, repeat), "units": units,
+           "unit": unit}
+    row["throughput"] = units / row["seconds"] if row["seconds"] else None
+    results.append(row)
+    print(f"{name:<28} {json.dumps(params):<48} "
+          f"{row['seconds'] * 1e3:10.3f} ms  "
+          f"{row['peak_bytes'] / 1024:10.1f} KiB", file=sys.stderr)
+
+
+def run(quick: bool, repeat: int) -> list[dict]:
+    rng = random.Random(SEED)
+    results: list[dict] = []
+
+    depths      = [2, 4] if quick else [2, 4, 8]
+    token_sizes = [100, 1_000] if quick else [100, 1_000, 10_000]
+    statements  = [50] if quick else [50, 500, 5_000]
+    error_rates = [0.01, 0.1]
+
+    families = [(f"expr-{d}", expression_grammar(d), d) for d in depths]
+    families.append(("statements", statement_grammar(), None))
+
+    for family, raw, depth in families:
+        grammar = utils.grammar_formatter(raw)
+
+        case(results, "grammar_formatter", lambda: utils.grammar_formatter(raw),
+             repeat, 1, "grammar", family=family)
+        case(results, "sep_terminals_nonterminals",
+             lambda: parsing_table.sep_terminals_nonterminals(grammar),
+             repeat, 1, "grammar", family=family)
+        case(results, "compute_sets",
+             lambda: grammar_analysis.compute_sets(grammar),
+             repeat, 1, "grammar", family=family)
+
+        for analysis_type in ("slr1", "lalr1", "lr1", "ll1"):
+            case(results, "get_goto_action_tables",
+                 lambda: parsing_table.build_goto_action_tables(
+                     grammar, analysis_type, source="native"),
+                 repeat, 1, "grammar", family=family, analysis_type=analysis_type)
+
+        # caminho do site (HTML no leiaute do smlweb, sem rede)
+        page = smlweb_standin.render_page(grammar, "lalr1")
+        case(results, "convert_scraped_table",
+             lambda: parsing_table.convert_scraped_table(
+                 grammar, parsing_table.read_parsing_table(page, "lalr1")),
+             repeat, 1, "grammar", family=family)
+        case(results, "convert_scraped_page",
+             lambda: parsing_table.convert_scraped_page(grammar, page, "lalr1"),
+             repeat, 1, "grammar", family=family)
+
+        tables   = parsing_table.build_goto_action_tables(grammar, "lalr1", source="native")
+        compiled = compiled_table.compile_tables(tables["action_table"],
+                                                 tables["goto_table"])
+        packed   = packed_table.pack_tables(compiled)
+        stream_lexer = lexer.build_lexer(compiled.terminals, compiled.terminal_ids)
+        case(results, "pack_tables", lambda: packed_table.pack_tables(compiled),
+             repeat, 1, "grammar", family=family)
+
+        if depth is None:
+            inputs = [(n, statement_input(rng, n)) for n in statements]
+        else:
+            inputs = [(n, expression_input(rng, depth, n)) for n in token_sizes]
+
+        for size, text in inputs:
+            variants = [("valid", text)] + [
+                (f"errors-{rate}", corrupt(rng, text, rate)) for rate in error_rates
+            ]
+            for variant, source in variants:
+                tokens = parsing_algorithm.tokenize(source)
+                n = len(tokens)
+                for level in parsing_algorithm.TRACE_LEVELS:
+                    case(results, "bottom_up_algorithm",
+                         lambda: parsing_algorithm.bottom_up_algorithm(
+                             tables["action_table"], tables["goto_table"],
+                             source, level),
+                         repeat, n, "token", family=family, size=size,
+                         input=variant, trace=level)
+                case(results, "parse_compiled",
+                     lambda: compiled_table.parse_compiled(compiled, tokens),
+                     repeat, n, "token", family=family, size=size, input=variant)
+                case(results, "parse_packed",
+                     lambda: packed_table.parse_packed(packed, tokens),
+                     repeat, n, "token", family=family, size=size, input=variant)
+                case(results, "parse_compiled+tree",
+                     lambda: compiled_table.parse_compiled(
+                         compiled, tokens, tree=parse_tree.tree_for(compiled)),
+                     repeat, n, "token", family=family, size=size, input=variant)
+                data = source.encode()
+                case(results, "parse_stream",
+                     lambda: packed_table.parse_stream(
+                         compiled, stream_lexer.scan_bytes(data), len(data)),
+                     repeat, n, "token", family=family, size=size, input=variant)
+
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Comparação entre execuções
+# ---------------------------------------------------------------------------
+
+def _key(row: dict) -> tuple:
+    ignored = {"seconds", "peak_bytes", "throughput", "units", "unit"}
+    return tuple(sorted((k, str(v)) for k, v in row.items() if k not in ignored))
+
+
+def compare(previous: dict, current: dict, threshold: float) -> int:
+    """Imprime as variações; devolve o número de regressões acima do limiar."""
+    before = {_key(row): row for row in previous["results"]}
+    regressions = 0
+    for row in current["results"]:
+        old = before.get(_key(row))
+        if not old:
+            continue
+        for metric in ("seconds", "peak_bytes"):
+            if not old[metric]:
+                continue
+            change = row[metric] / old[metric] - 1
+            if change > threshold:
+                regressions += 1
+                print(f"REGRESSÃO {metric:<10} {change:+7.1%}  "
+                      f"{dict(_key(row))}", file=sys.stderr)
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks offline do SASC")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--quick", action="store_true")
+    parser.add_argument("--compare", metavar="ARQUIVO")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="variação relativa considerada regressão")
+    args = parser.parse_args()
+
+    report = {
+        "metadata": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python":    platform.python_version(),
+            "platform":  platform.platform(),
+            "seed":      SEED,
+            "repeat":    args.repeat,
+            "quick":     args.quick,
+        },
+        "results": run(args.quick, args.repeat),
+    }
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            return 1 if compare(json.load(f), report, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,16 +2,45 @@
 # main.py – FastAPI do SASC
 # ---------------------------------------------------------------------------
 
+import json
+import mmap
+import os
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi import Request, Response, UploadFile
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 
 # Módulos internos
+from app import batch
+from app import grammar_analysis
+from app import http_cache
+from app import metrics
+from app import packed_table
+from app import parse_tree
 from app import parsing_table
 from app import parsing_algorithm
 from app import utils
+from app.grammar_registry import GRAMMARS
+from app.incremental import SESSIONS
+from app.shared_tables import SHARED_TABLES
+from app.table_cache import TABLE_CACHE
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # pool de processos da análise em lote: um só, dividido pelas requisições
+    batch.start_pool()
+    try:
+        yield
+    finally:
+        batch.shutdown_pool()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 
 origins = ["*"]
@@ -39,50 +68,776 @@ async def read_root() -> dict:
     return {"message": "Testando API"}
 
 
+@app.get("/cache/stats")
+async def cache_stats() -> dict:
+    return {**TABLE_CACHE.stats(), "shared": SHARED_TABLES.stats()}
+
+
+@app.get("/metrics")
+async def prometheus_metrics() -> PlainTextResponse:
+    """Latência por fase, passos, erros e cache no formato do Prometheus."""
+    return PlainTextResponse(
+        metrics.render(TABLE_CACHE.stats()),
+        media_type=metrics.CONTENT_TYPE,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Execução do parser (comum às rotas por gramática e por ID)
+# ---------------------------------------------------------------------------
+
+def _run_parser(analysis_type: str, tables: dict, tokens: list[str], ids: list[int],
+                trace: str, compiled=None, recovery=None, tree_format: str = "none"):
+    """
+    LL(1) → top_down; LR sem trace → driver rápido (`compiled`, densa ou
+    compactada);
+    LR com trace → bottom_up com `recovery`.  `tokens`/`ids` vêm do léxico
+    da gramática (app.lexer).  Com `tree_format` ≠ "none" (só LR), a árvore
+    sintática é montada durante as reduções.
+    Devolve (steps, errors, trace, tree).
+    """
+    if tree_format not in parse_tree.TREE_FORMATS:
+        raise ValueError(f"Formato de árvore inválido: {tree_format}")
+    if tree_format != "none" and analysis_type == "ll1":
+        raise ValueError("A árvore sintática só é montada nas análises LR.")
+
+    step_trace = parsing_algorithm.StepTrace(trace)
+    tree = None
+
+    with metrics.phase("parse"):
+        if analysis_type == "ll1":
+            steps_parsing, errors = parsing_algorithm.top_down_algorithm(
+                tables["ll1_table"],
+                tables["start_symbol"],
+                tokens,
+                tables["follow_table"],
+                step_trace
+            )
+        elif trace == "none":
+            # sem passo-a-passo: driver rápido sobre as tabelas compiladas
+            if tree_format != "none":
+                tree = parse_tree.tree_for(compiled)
+            result = packed_table.parse_tables(compiled, tokens, ids=ids, tree=tree)
+            steps_parsing, errors = [], result["errors"]
+            step_trace.accepted   = result["accepted"]
+            step_trace.count      = result["steps"]
+        else:
+            if tree_format != "none":
+                tree = parse_tree.TreeArena()
+            steps_parsing, errors = parsing_algorithm.bottom_up_algorithm(
+                tables["action_table"],
+                tables["goto_table"],
+                tokens,
+                step_trace,
+                recovery,
+                tree
+            )
+
+    metrics.record_analysis(analysis_type, step_trace.accepted,
+                            step_trace.count, len(errors))
+    return steps_parsing, errors, step_trace, tree
+
+
+def _tree_payload(arena, tree_format: str, grammar_lexer, input: str):
+    """`parseTree` da resposta; as folhas levam o texto original do token."""
+    if arena is None or arena.root == -1:
+        return None
+    lexemes = [token.lexeme for token in grammar_lexer.scan(input)]
+    return parse_tree.serialize_tree(arena, tree_format, lexemes)
+
+
+TABLE_FORMATS = ("full", "packed", "none")
+
+
+async def _table_payload(tables: dict, grammar: str, analysis_type: str,
+                         table_format: str):
+    """`parsingTable` da resposta na forma pedida pelo cliente."""
+    if table_format not in TABLE_FORMATS:
+        raise ValueError(f"Formato de tabela inválido: {table_format}")
+    if table_format == "none":
+        return None
+    if table_format == "full":
+        return tables
+    if analysis_type == "ll1":
+        raise ValueError("A tabela compactada só existe para análises LR.")
+    return packed_table.packed_to_dict(await parsing_table.get_packed_tables_async(
+        grammar, analysis_type
+    ))
+
+
 # ---------------------------------------------------------------------------
 # Rota principal de análise
 #  /analyze/{analysis_type}/{grammar}/{input}
 # ---------------------------------------------------------------------------
 
 @app.get("/analyze/{analysis_type}/{grammar}/{input}")
-async def analyze(input: str, grammar: str, analysis_type: str) -> dict:
+async def analyze(input: str, grammar: str, analysis_type: str,
+                  request: Request, trace: str = "full",
+                  table_format: str = "full", tree: str = "none") -> Response:
     """
     Devolve:
-      • parsingTable   – tabelas action/goto + terminais/não-terminais
-      • stepsParsing   – passo-a-passo detalhado (para a UI)
+      • parsingTable   – conforme `table_format`:
+                           full   → tabelas action/goto (ou ll1_table, para
+                                    "ll1") + terminais/não-terminais
+                           packed → tabela LR compactada (packed_table)
+                           none   → null
+      • stepsParsing   – passo-a-passo conforme `trace`:
+                           none    → lista vazia
+                           summary → só as mensagens de cada passo
+                           full    → mensagens + deltas da pilha (pop/push);
+                                     o 1º passo traz stack/input completos
+      • accepted       – a entrada pertence à linguagem: o parser chegou à
+                         aceitação sem nenhum erro (se houve recuperação de
+                         erros, false – os erros estão em `errors`)
       • errors         – lista de erros {index, lexeme, message}
+      • parseTree      – árvore sintática (só LR e só se aceita), conforme
+                         `tree`:
+                           none   → null
+                           nested → {symbol, start, end, children} aninhados;
+                                    folhas {symbol, index, lexeme}
+                           arrays → vetores paralelos da arena (parse_tree)
       • grammar        – gramática já formatada (lista de produções)
+
+    O cabeçalho Server-Timing traz a duração de cada fase (grammar, tables,
+    fetch/convert ou build quando a tabela é gerada, parse).  A resposta
+    é determinística: leva ETag / Cache-Control, um If-None-Match igual
+    recebe 304 sem nova análise e o corpo vem comprimido se o cliente
+    aceitar (app.http_cache).
     """
+    cached = http_cache.not_modified(request)
+    if cached is not None:
+        return cached
+
+    try:
+        with metrics.request_timer(analysis_type) as timer:
+            # 1) Normaliza gramática (espaços, →, ponto final…)
+            with metrics.phase("grammar"):
+                formatted_grammar = utils.grammar_formatter(grammar)
+                grammar_list      = formatted_grammar.split(".")[:-1]
+
+            # 2) Gera tabelas de análise (action/goto) – as de string só
+            #    quando usadas (LL(1), passo-a-passo ou parsingTable "full");
+            #    o driver rápido trabalha só com as compiladas
+            tables = None
+            if analysis_type == "ll1" or trace != "none" or table_format == "full":
+                tables = await parsing_table.get_goto_action_tables_async(
+                    formatted_grammar,
+                    analysis_type
+                )
+
+            # 3) Executa o parser  →  retorna (steps, errors)
+            compiled = recovery = None
+            if analysis_type != "ll1":
+                if trace == "none":
+                    compiled = await parsing_table.get_runtime_tables_async(
+                        formatted_grammar, analysis_type
+                    )
+                else:
+                    recovery = await parsing_table.get_recovery_table_async(
+                        formatted_grammar, analysis_type
+                    )
+
+            grammar_lexer = await parsing_table.get_lexer_async(
+                formatted_grammar, analysis_type
+            )
+            tokens, ids = grammar_lexer.tokenize(input)
+
+            steps_parsing, errors, step_trace, parse_tree_arena = _run_parser(
+                analysis_type, tables, tokens, ids, trace, compiled, recovery,
+                tree
+            )
+
+        # 4) Resposta
+        return http_cache.json_response(request, {
+            "ERROR_CODE":   0,
+            "parsingTable": await _table_payload(
+                tables, formatted_grammar, analysis_type, table_format
+            ),
+            "stepsParsing": steps_parsing,
+            "accepted":     step_trace.accepted,
+            "errors":       errors,           # << NOVO CAMPO
+            "parseTree":    _tree_payload(parse_tree_arena, tree, grammar_lexer, input),
+            "grammar":      grammar_list,
+        }, headers={"Server-Timing": timer.server_timing()})
+
+    except Exception as e:
+        metrics.record_failure(analysis_type)
+        # Envuelve qualquer exceção num JSON padronizado
+        return http_cache.json_response(request, {
+            "ERROR_CODE":   1,
+            "errorMessage": f"Houve um erro! {e}"
+        }, cacheable=False)
+
+
+# ---------------------------------------------------------------------------
+# Análise da gramática (sem entrada)
+#  /grammar-analysis/{grammar}?analysis_type=ll1,slr1,lalr1,lr1
+#  (padrão: ll1, lr0 e slr1; lalr1 e lr1 são caros e só vêm quando pedidos)
+# ---------------------------------------------------------------------------
+
+@app.get("/grammar-analysis/{grammar}")
+async def analyze_grammar(grammar: str, request: Request,
+                          analysis_type: str | None = None) -> Response:
+    """
+    Devolve nullable, first, follow (por não-terminal) e, para cada tipo de
+    análise pedido, `conflicts[tipo]` e `valid[tipo]` – útil para validar a
+    gramática antes de analisar entradas.
+    """
+    cached = http_cache.not_modified(request)
+    if cached is not None:
+        return cached
+
     try:
-        # 1) Normaliza gramática (espaços, →, ponto final…)
         formatted_grammar = utils.grammar_formatter(grammar)
-        grammar_list      = formatted_grammar.split(".")[:-1]
+        analysis_types = (
+            grammar_analysis.DEFAULT_ANALYSIS_TYPES if analysis_type is None
+            else tuple(t.strip() for t in analysis_type.split(",") if t.strip())
+        )
+        report = await run_in_threadpool(
+            grammar_analysis.analyze_grammar, formatted_grammar, analysis_types,
+            parsing_table.get_conflicts,
+        )
+        return http_cache.json_response(request, {
+            "ERROR_CODE": 0,
+            "grammar":    formatted_grammar.split(".")[:-1],
+            **report,
+        })
+
+    except Exception as e:
+        return http_cache.json_response(request, {
+            "ERROR_CODE":   1,
+            "errorMessage": f"Houve um erro! {e}"
+        }, cacheable=False)
+
+
+# ---------------------------------------------------------------------------
+# Gramáticas registradas (tabelas pré-compiladas, acessadas por ID)
+#  POST /grammars                           {grammar, analysis_type}
+#  GET  /grammars/{grammar_id}?table_format=full|packed|none
+#  GET  /grammars/{grammar_id}/footprint
+#  GET  /grammars/{grammar_id}/analyze/{input}?trace=full
+# ---------------------------------------------------------------------------
+
+class GrammarRequest(BaseModel):
+    grammar:       str
+    analysis_type: str
+
+
+async def _register(formatted_grammar: str, analysis_type: str):
+    """Gera tabelas, léxico e recuperação e guarda a entrada no registro."""
+    tables = await parsing_table.get_goto_action_tables_async(
+        formatted_grammar,
+        analysis_type
+    )
+    compiled = recovery = None
+    if analysis_type != "ll1":
+        compiled = await parsing_table.get_runtime_tables_async(
+            formatted_grammar, analysis_type
+        )
+        recovery = await parsing_table.get_recovery_table_async(
+            formatted_grammar, analysis_type
+        )
+
+    grammar_lexer = await parsing_table.get_lexer_async(
+        formatted_grammar, analysis_type
+    )
+    return GRAMMARS.register(formatted_grammar, analysis_type,
+                             tables, grammar_lexer, compiled, recovery)
+
+
+async def _registered(grammar_id: str):
+    """
+    Entrada do registro; se este processo não a tem (outro worker a
+    registrou, ou ela saiu do LRU), é reconstruída a partir da gramática
+    gravada para o ID.
+    """
+    try:
+        return GRAMMARS.get(grammar_id)
+    except LookupError:
+        formatted_grammar, analysis_type = GRAMMARS.source(grammar_id)
+        return await _register(formatted_grammar, analysis_type)
+
+
+@app.post("/grammars")
+async def register_grammar(request: GrammarRequest) -> dict:
+    """
+    Gera e guarda as tabelas (string, compiladas e de recuperação) e o
+    léxico da gramática.  `grammarId` é derivado do conteúdo: registrar
+    de novo a mesma gramática devolve o mesmo ID.
+    """
+    try:
+        entry = await _register(utils.grammar_formatter(request.grammar),
+                                request.analysis_type)
+        return {
+            "ERROR_CODE":             0,
+            "grammarId":              entry.grammar_id,
+            "analysisType":           entry.analysis_type,
+            "grammar":                entry.productions,
+            "terminals_nonterminals": entry.tables["terminals_nonterminals"],
+            "conflicts":              entry.tables.get("conflicts", []),
+        }
+
+    except Exception as e:
+        return {
+            "ERROR_CODE":   1,
+            "errorMessage": f"Houve um erro! {e}"
+        }
+
+
+@app.get("/grammars/{grammar_id}")
+async def get_grammar(grammar_id: str, request: Request,
+                      table_format: str = "full") -> Response:
+    cached = http_cache.not_modified(request)
+    if cached is not None:
+        return cached
+
+    try:
+        entry = await _registered(grammar_id)
+        return http_cache.json_response(request, {
+            "ERROR_CODE":   0,
+            "grammarId":    entry.grammar_id,
+            "analysisType": entry.analysis_type,
+            "grammar":      entry.productions,
+            "parsingTable": await _table_payload(
+                entry.tables, entry.grammar, entry.analysis_type, table_format
+            ),
+        })
+
+    except Exception as e:
+        return http_cache.json_response(request, {
+            "ERROR_CODE":   1,
+            "errorMessage": f"Houve um erro! {e}"
+        }, cacheable=False)
 
-        # 2) Gera tabelas de análise (action/goto)
+
+@app.get("/grammars/{grammar_id}/footprint")
+async def grammar_footprint(grammar_id: str) -> dict:
+    """
+    Memória e tamanho do JSON das tabelas desta gramática em cada
+    representação: strings (UI), densa (compiled_table) e compactada.
+    """
+    try:
+        entry = await _registered(grammar_id)
+        if entry.analysis_type == "ll1":
+            raise ValueError("O relatório de memória só existe para análises LR.")
+
+        compiled = await parsing_table.get_compiled_tables_async(
+            entry.grammar, entry.analysis_type
+        )
+        packed = await parsing_table.get_packed_tables_async(
+            entry.grammar, entry.analysis_type
+        )
+        return {
+            "ERROR_CODE": 0,
+            "grammarId":  grammar_id,
+            **packed_table.footprint_report(entry.tables, compiled, packed),
+        }
+
+    except Exception as e:
+        return {
+            "ERROR_CODE":   1,
+            "errorMessage": f"Houve um erro! {e}"
+        }
+
+
+@app.get("/grammars/{grammar_id}/analyze/{input}")
+async def analyze_registered(grammar_id: str, input: str, request: Request,
+                             trace: str = "full", tree: str = "none") -> Response:
+    """
+    Mesma resposta de /analyze, sem `parsingTable` (consulte
+    GET /grammars/{grammar_id}): nada da gramática é refeito aqui.
+    """
+    cached = http_cache.not_modified(request)
+    if cached is not None:
+        return cached
+
+    analysis_type = None
+    try:
+        entry = await _registered(grammar_id)
+        analysis_type = entry.analysis_type
+
+        with metrics.request_timer(analysis_type) as timer:
+            tokens, ids = entry.lexer.tokenize(input)
+            steps_parsing, errors, step_trace, parse_tree_arena = _run_parser(
+                analysis_type, entry.tables, tokens, ids, trace,
+                entry.compiled, entry.recovery, tree
+            )
+
+        return http_cache.json_response(request, {
+            "ERROR_CODE":   0,
+            "grammarId":    grammar_id,
+            "stepsParsing": steps_parsing,
+            "accepted":     step_trace.accepted,
+            "errors":       errors,
+            "parseTree":    _tree_payload(parse_tree_arena, tree, entry.lexer, input),
+        }, headers={"Server-Timing": timer.server_timing()})
+
+    except Exception as e:
+        metrics.record_failure(analysis_type)
+        return http_cache.json_response(request, {
+            "ERROR_CODE":   1,
+            "errorMessage": f"Houve um erro! {e}"
+        }, cacheable=False)
+
+
+# ---------------------------------------------------------------------------
+# Análise de arquivo enviado (entradas grandes)
+#  POST /analyze-file/{analysis_type}/{grammar}     multipart, campo "file"
+#  POST /grammars/{grammar_id}/analyze-file
+# ---------------------------------------------------------------------------
+#
+# O arquivo é mapeado com mmap e o léxico (Lexer.scan_bytes) entrega os
+# tokens ao driver (packed_table.parse_stream) sob demanda: nem o texto
+# decodificado nem a fita de tokens ficam na memória.  Só análises LR, sem
+# passo-a-passo nem árvore; os erros trazem `offset` em bytes.
+
+UPLOAD_MAX_ERRORS = int(os.getenv("SASC_UPLOAD_MAX_ERRORS", "1000"))
+
+
+def _parse_upload(file, tables, grammar_lexer) -> tuple[dict, int]:
+    """(resultado de parse_stream, tamanho em bytes) do arquivo enviado."""
+    fd   = file.fileno()          # SpooledTemporaryFile: vai para o disco aqui
+    size = os.fstat(fd).st_size
+    if size == 0:                 # mmap não aceita arquivo vazio
+        return packed_table.parse_stream(tables, ()), 0
+
+    with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mapped:
+        tokens = grammar_lexer.scan_bytes(mapped)
+        try:
+            return packed_table.parse_stream(
+                tables, tokens, size, max_errors=UPLOAD_MAX_ERRORS
+            ), size
+        finally:
+            tokens.close()        # solta o buffer antes de fechar o mmap
+
+
+async def _analyze_upload(analysis_type: str, tables, grammar_lexer,
+                          file: UploadFile) -> dict:
+    if analysis_type == "ll1":
+        raise ValueError("A análise de arquivos só é suportada nas análises LR.")
+
+    with metrics.phase("parse"):
+        result, size = await run_in_threadpool(
+            _parse_upload, file.file, tables, grammar_lexer
+        )
+    metrics.record_analysis(analysis_type, result["accepted"],
+                            result["steps"], len(result["errors"]))
+    return {
+        "accepted": result["accepted"],
+        "errors":   result["errors"],
+        "steps":    result["steps"],
+        "bytes":    size,
+    }
+
+
+@app.post("/analyze-file/{analysis_type}/{grammar}")
+async def analyze_file(grammar: str, analysis_type: str, file: UploadFile,
+                       request: Request) -> Response:
+    """
+    Analisa o arquivo enviado (UTF-8).  Devolve {accepted, errors, steps,
+    bytes, grammar}; cada erro é {index, offset, lexeme, message}, com
+    `offset` em bytes a partir do início do arquivo.  Passados
+    SASC_UPLOAD_MAX_ERRORS erros, a análise é interrompida.
+    """
+    try:
+        with metrics.request_timer(analysis_type) as timer:
+            with metrics.phase("grammar"):
+                formatted_grammar = utils.grammar_formatter(grammar)
+
+            compiled = grammar_lexer = None
+            if analysis_type != "ll1":
+                compiled = await parsing_table.get_runtime_tables_async(
+                    formatted_grammar, analysis_type
+                )
+                grammar_lexer = await parsing_table.get_lexer_async(
+                    formatted_grammar, analysis_type
+                )
+            payload = await _analyze_upload(analysis_type, compiled,
+                                            grammar_lexer, file)
+
+        return http_cache.json_response(request, {
+            "ERROR_CODE": 0,
+            **payload,
+            "grammar":    formatted_grammar.split(".")[:-1],
+        }, cacheable=False, headers={"Server-Timing": timer.server_timing()})
+
+    except Exception as e:
+        metrics.record_failure(analysis_type)
+        return http_cache.json_response(request, {
+            "ERROR_CODE":   1,
+            "errorMessage": f"Houve um erro! {e}"
+        }, cacheable=False)
+
+    finally:
+        await file.close()
+
+
+@app.post("/grammars/{grammar_id}/analyze-file")
+async def analyze_registered_file(grammar_id: str, file: UploadFile,
+                                  request: Request) -> Response:
+    """Mesma resposta de /analyze-file, com a gramática registrada."""
+    analysis_type = None
+    try:
+        entry = await _registered(grammar_id)
+        analysis_type = entry.analysis_type
+
+        with metrics.request_timer(analysis_type) as timer:
+            payload = await _analyze_upload(analysis_type, entry.compiled,
+                                            entry.lexer, file)
+
+        return http_cache.json_response(request, {
+            "ERROR_CODE": 0,
+            "grammarId":  grammar_id,
+            **payload,
+        }, cacheable=False, headers={"Server-Timing": timer.server_timing()})
+
+    except Exception as e:
+        metrics.record_failure(analysis_type)
+        return http_cache.json_response(request, {
+            "ERROR_CODE":   1,
+            "errorMessage": f"Houve um erro! {e}"
+        }, cacheable=False)
+
+    finally:
+        await file.close()
+
+
+# ---------------------------------------------------------------------------
+# Análise em lote
+#  POST /analyze/batch  {grammar, analysis_type, inputs, workers?, trace?}
+# ---------------------------------------------------------------------------
+
+class BatchRequest(BaseModel):
+    grammar:       str
+    analysis_type: str
+    inputs:        list[str]
+    workers:       int | None = None     # até SASC_BATCH_WORKERS (padrão: nº de CPUs)
+    trace:         str = "none"
+
+
+@app.post("/analyze/batch")
+async def analyze_batch(request: BatchRequest) -> dict:
+    """
+    Gera as tabelas uma vez e analisa todas as entradas num pool de
+    processos.  `results[i]` corresponde a `inputs[i]` e tem o formato
+    {ERROR_CODE, accepted, errors, stepsParsing}.
+    """
+    try:
+        formatted_grammar = utils.grammar_formatter(request.grammar)
+        tables = await parsing_table.get_goto_action_tables_async(
+            formatted_grammar,
+            request.analysis_type
+        )
+        grammar_lexer = await parsing_table.get_lexer_async(
+            formatted_grammar, request.analysis_type
+        )
+        compiled = recovery = None
+        if request.analysis_type != "ll1":
+            recovery = await parsing_table.get_recovery_table_async(
+                formatted_grammar, request.analysis_type
+            )
+            if request.trace == "none":
+                compiled = await parsing_table.get_runtime_tables_async(
+                    formatted_grammar, request.analysis_type
+                )
+
+        results = await run_in_threadpool(
+            batch.run_batch,
+            request.analysis_type,
+            tables,
+            request.inputs,
+            grammar_lexer,
+            compiled,
+            recovery,
+            request.trace,
+            request.workers,
+        )
+
+        return {
+            "ERROR_CODE": 0,
+            "grammar":    formatted_grammar.split(".")[:-1],
+            "results":    results,
+        }
+
+    except Exception as e:
+        return {
+            "ERROR_CODE":   1,
+            "errorMessage": f"Houve um erro! {e}"
+        }
+
+
+# ---------------------------------------------------------------------------
+# Análise em streaming (NDJSON / Server-Sent Events)
+#  /analyze-stream/{analysis_type}/{grammar}/{input}?format=ndjson|sse
+# ---------------------------------------------------------------------------
+
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse":    "text/event-stream",
+}
+
+
+def _stream_events(input: str, grammar: str, analysis_type: str, trace: str):
+    """
+    Eventos, na ordem:
+      {"type": "tables", parsingTable, grammar}
+      {"type": "step", ...} / {"type": "error", index, lexeme, message}
+      {"type": "result", accepted, errorCount}
+    ou {"type": "failure", ERROR_CODE, errorMessage} se algo der errado.
+    """
+    try:
+        formatted_grammar = utils.grammar_formatter(grammar)
         tables = parsing_table.get_goto_action_tables(
             formatted_grammar,
             analysis_type
         )
+        yield {
+            "type":         "tables",
+            "parsingTable": tables,
+            "grammar":      formatted_grammar.split(".")[:-1],
+        }
+
+        tokens, _ = parsing_table.get_lexer(
+            formatted_grammar, analysis_type
+        ).tokenize(input)
+
+        step_trace = parsing_algorithm.StepTrace(trace, keep=False)
+        if analysis_type == "ll1":
+            events = parsing_algorithm.iter_top_down(
+                tables["ll1_table"], tables["start_symbol"], tokens,
+                tables["follow_table"], step_trace
+            )
+        else:
+            events = parsing_algorithm.iter_bottom_up(
+                tables["action_table"], tables["goto_table"], tokens,
+                step_trace,
+                parsing_table.get_recovery_table(formatted_grammar, analysis_type)
+            )
+
+        error_count = 0
+        for kind, item in events:
+            error_count += kind == "error"
+            yield {"type": kind, **item}
+
+        yield {
+            "type":       "result",
+            "accepted":   step_trace.accepted,
+            "errorCount": error_count,
+        }
+
+    except Exception as e:
+        yield {
+            "type":         "failure",
+            "ERROR_CODE":   1,
+            "errorMessage": f"Houve um erro! {e}"
+        }
+
+
+def _encode_ndjson(events):
+    for event in events:
+        yield json.dumps(event, ensure_ascii=False) + "\n"
+
+
+def _encode_sse(events):
+    for event in events:
+        yield f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+@app.get("/analyze-stream/{analysis_type}/{grammar}/{input}")
+async def analyze_stream(input: str, grammar: str, analysis_type: str,
+                         trace: str = "full", format: str = "ndjson"):
+    """Mesma análise de /analyze, enviada passo a passo enquanto executa."""
+    if format not in STREAM_MEDIA_TYPES:
+        return {
+            "ERROR_CODE":   1,
+            "errorMessage": f"Houve um erro! Formato inválido: {format}"
+        }
+
+    encode = _encode_sse if format == "sse" else _encode_ndjson
+    return StreamingResponse(
+        encode(_stream_events(input, grammar, analysis_type, trace)),
+        media_type=STREAM_MEDIA_TYPES[format],
+    )
+
+
+# ---------------------------------------------------------------------------
+# Sessões de análise incremental (editores ao vivo)
+#  POST   /sessions        {grammar, analysis_type, text}
+#  PATCH  /sessions/{id}   {offset, length, text}
+#  DELETE /sessions/{id}
+# ---------------------------------------------------------------------------
+
+class SessionRequest(BaseModel):
+    grammar:       str
+    analysis_type: str
+    text:          str = ""
+
+
+class EditRequest(BaseModel):
+    offset: int              # posição (em caracteres) do início da troca
+    length: int = 0          # quantos caracteres são removidos
+    text:   str = ""         # texto inserido no lugar
 
-        # 3) Executa o parser  →  retorna (steps, errors)
-        steps_parsing, errors = parsing_algorithm.bottom_up_algorithm(
-            tables["action_table"],
-            tables["goto_table"],
-            input
+
+@app.post("/sessions")
+async def create_session(request: SessionRequest) -> dict:
+    """
+    Abre uma sessão: analisa `text` uma vez e guarda os checkpoints da
+    pilha.  Só análises LR (as tabelas compiladas são usadas).
+    """
+    try:
+        if request.analysis_type == "ll1":
+            raise ValueError("Sessões incrementais só suportam análises LR.")
+
+        formatted_grammar = utils.grammar_formatter(request.grammar)
+        compiled = await parsing_table.get_compiled_tables_async(
+            formatted_grammar,
+            request.analysis_type
+        )
+        grammar_lexer = await parsing_table.get_lexer_async(
+            formatted_grammar,
+            request.analysis_type
         )
+        session_id, session = SESSIONS.create(compiled, grammar_lexer,
+                                              request.text)
 
-        # 4) Resposta
         return {
-            "ERROR_CODE":   0,
-            "parsingTable": tables,
-            "stepsParsing": steps_parsing,
-            "errors":       errors,           # << NOVO CAMPO
-            "grammar":      grammar_list,
+            "ERROR_CODE": 0,
+            "sessionId":  session_id,
+            **session.result(),
         }
 
     except Exception as e:
-        # Envuelve qualquer exceção num JSON padronizado
         return {
             "ERROR_CODE":   1,
             "errorMessage": f"Houve um erro! {e}"
         }
+
+
+@app.patch("/sessions/{session_id}")
+async def edit_session(session_id: str, request: EditRequest) -> dict:
+    """
+    Aplica uma edição e re-analisa só o trecho afetado.  `reparsedTokens`
+    informa quantos tokens precisaram passar de novo pelo parser.
+    """
+    try:
+        session = SESSIONS.get(session_id)
+        session.edit(request.offset, request.length, request.text)
+
+        return {
+            "ERROR_CODE": 0,
+            "sessionId":  session_id,
+            **session.result(),
+        }
+
+    except Exception as e:
+        return {
+            "ERROR_CODE":   1,
+            "errorMessage": f"Houve um erro! {e}"
+        }
+
+
+@app.delete("/sessions/{session_id}")
+async def delete_session(session_id: str) -> dict:
+    SESSIONS.delete(session_id)
+    return {"ERROR_CODE": 0}
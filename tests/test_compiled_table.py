@@ -0,0 +1,47 @@
+# ---------------------------------------------------------------------------
+# Driver compilado: mesmo resultado do driver sobre as tabelas de string
+# (aceitação, erros e número de movimentos)
+# ---------------------------------------------------------------------------
+
+import random
+
+import pytest
+
+from app import compiled_table, lexer, lr_table
+from app.parsing_algorithm import StepTrace, bottom_up_algorithm
+from app.utils import grammar_formatter
+
+GRAMMARS = [
+    "S -> S ; A | A. A -> id = E | id. E -> E + id | id.",
+    "E -> E + T | T. T -> T * F | F. F -> ( E ) | id.",
+    "S -> A B. A -> a | . B -> b B | .",
+]
+
+PIECES = ["id", "=", "+", "*", ";", "(", ")", "a", "b", "?", " "]
+
+
+def _inputs(count: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    return ["id = id ; id = id + id", "id + id * ( id )", "a b b", ""] + [
+        " ".join(rng.choice(PIECES) for _ in range(rng.randint(0, 12)))
+        for _ in range(count)
+    ]
+
+
+@pytest.mark.parametrize("analysis_type", ["slr1", "lalr1", "lr1"])
+@pytest.mark.parametrize("grammar", GRAMMARS)
+def test_compiled_matches_string_tables(grammar, analysis_type):
+    tables   = lr_table.build_lr_tables(grammar_formatter(grammar), analysis_type)
+    compiled = compiled_table.compile_tables(tables.action_table, tables.goto_table)
+    lex      = lexer.build_lexer(compiled.terminals, compiled.terminal_ids)
+
+    for text in _inputs(200, seed=len(grammar)):
+        tokens, ids = lex.tokenize(text)
+
+        trace = StepTrace("none")
+        _, errors = bottom_up_algorithm(tables.action_table, tables.goto_table,
+                                        tokens, trace)
+        expected = {"accepted": trace.accepted, "errors": errors,
+                    "steps": trace.count}
+
+        assert compiled_table.parse_compiled(compiled, tokens, ids=ids) == expected, text
@@ -0,0 +1,51 @@
+# ---------------------------------------------------------------------------
+# Análise da gramática com bitsets: conjuntos iguais aos de app.grammar e
+# conflitos LR só para os tipos pedidos
+# ---------------------------------------------------------------------------
+
+import pytest
+
+from app import grammar_analysis, lr_table
+from app.grammar import first_sets, follow_sets, nullable_set, parse_grammar
+from app.utils import grammar_formatter
+
+GRAMMARS = [
+    "E -> T E2. E2 -> + T E2 | . T -> id | ( E ).",
+    "S -> A B. A -> a | . B -> b B | .",
+    "S -> L = R | R. L -> * R | id. R -> L.",
+]
+
+
+@pytest.mark.parametrize("grammar", GRAMMARS)
+def test_sets_match_grammar_module(grammar):
+    grammar = grammar_formatter(grammar)
+    parsed  = parse_grammar(grammar)
+    report  = grammar_analysis.analyze_grammar(grammar)
+
+    assert set(report["nullable"]) == nullable_set(parsed)
+    assert {nt: set(s) for nt, s in report["first"].items()} == first_sets(parsed)
+    assert {nt: set(s) for nt, s in report["follow"].items()} == follow_sets(parsed)
+
+
+def test_default_types_skip_lr1_closures():
+    calls = []
+
+    def lr_conflicts(grammar, analysis_type):
+        calls.append(analysis_type)
+        return lr_table.build_lr_tables(grammar, analysis_type).conflicts
+
+    grammar = grammar_formatter(GRAMMARS[2])
+    report = grammar_analysis.analyze_grammar(grammar, lr_conflicts=lr_conflicts)
+
+    assert tuple(report["valid"]) == grammar_analysis.DEFAULT_ANALYSIS_TYPES
+    assert calls == ["lr0", "slr1"]
+    assert report["valid"] == {"ll1": False, "lr0": False, "slr1": False}
+
+    report = grammar_analysis.analyze_grammar(grammar, ("lalr1", "lr1"),
+                                              lr_conflicts=lr_conflicts)
+    assert report["valid"] == {"lalr1": True, "lr1": True}
+
+
+def test_unknown_type():
+    with pytest.raises(ValueError):
+        grammar_analysis.analyze_grammar(grammar_formatter(GRAMMARS[0]), ("lr2",))
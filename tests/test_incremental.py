@@ -0,0 +1,66 @@
+# ---------------------------------------------------------------------------
+# Sessões incrementais: depois de cada edição, o estado deve ser o mesmo de
+# uma sessão nova criada com o texto final
+# ---------------------------------------------------------------------------
+
+import random
+
+import pytest
+
+from app import compiled_table, lexer, lr_table
+from app.incremental import ParseSession, SessionStore
+from app.utils import grammar_formatter
+
+GRAMMAR = "S -> S ; A | A. A -> id = E | id. E -> E + id | id."
+
+PIECES = ["id", "=", "+", ";", " ", "?", "i", "d", "<"]
+
+
+def _tables():
+    tables   = lr_table.build_lr_tables(grammar_formatter(GRAMMAR), "lalr1")
+    compiled = compiled_table.compile_tables(tables.action_table, tables.goto_table)
+    return compiled, lexer.build_lexer(compiled.terminals, compiled.terminal_ids)
+
+
+def _state(session: ParseSession):
+    result = session.result()
+    return (session.text, session.starts, session.lexemes, session.ids,
+            result["accepted"], result["errors"], result["tokens"])
+
+
+def test_session_result():
+    compiled, lex = _tables()
+    session = ParseSession(compiled, lex, "id = id ; id = id + id")
+
+    assert session.result()["accepted"]
+    session.edit(22, 0, " +")
+    assert not session.result()["accepted"]
+    session.edit(22, 2, "")
+    assert session.result()["accepted"]
+
+
+def test_edits_match_fresh_session():
+    compiled, lex = _tables()
+    rng = random.Random(5)
+
+    for _ in range(500):
+        text = "".join(rng.choice(PIECES) for _ in range(rng.randint(0, 15)))
+        session = ParseSession(compiled, lex, text)
+        for _ in range(5):
+            offset = rng.randint(0, len(session.text))
+            length = rng.randint(0, len(session.text) - offset)
+            insert = "".join(rng.choice(PIECES) for _ in range(rng.randint(0, 4)))
+            session.edit(offset, length, insert)
+
+            fresh = ParseSession(compiled, lex, session.text)
+            assert _state(session) == _state(fresh), session.text
+
+
+def test_session_store():
+    compiled, lex = _tables()
+    store = SessionStore(maxsize=2)
+
+    ids = [store.create(compiled, lex, "id")[0] for _ in range(3)]
+    assert store.get(ids[2]).text == "id"
+    with pytest.raises(LookupError):
+        store.get(ids[0])                  # a mais antiga saiu do LRU
@@ -0,0 +1,92 @@
+# ---------------------------------------------------------------------------
+# Lexer: scan_chunks / scan_bytes devem produzir os mesmos tokens de scan, e
+# tokens fora da gramática viram erro léxico em todos os drivers
+# ---------------------------------------------------------------------------
+
+import random
+
+import pytest
+
+from app import compiled_table, lexer, ll_table, lr_table, packed_table
+from app.error_recovery import LEXICAL_ERROR_MESSAGE
+from app.incremental import ParseSession
+from app.parsing_algorithm import bottom_up_algorithm, top_down_algorithm
+from app.utils import grammar_formatter
+
+TERMINALS = ["id", "num", "==", "=", "+", "++", "(", ")", ";", "while", "if"]
+
+PIECES = ["id", "num", "=", "==", "+", "++", "(", ")", ";", "while", "whilex",
+          "if", "x1", "42", "?", "é", " ", "\n", "  "]
+
+
+@pytest.fixture(scope="module")
+def lex():
+    return lexer.build_lexer(TERMINALS)
+
+
+def _texts(count: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    return ["", "while ( id == num ) id = id ++ ;", "é?id"] + [
+        "".join(rng.choice(PIECES) for _ in range(rng.randint(0, 40)))
+        for _ in range(count)
+    ]
+
+
+def test_scan_ids(lex):
+    tokens = list(lex.scan("id == ? while"))
+
+    assert [t.terminal for t in tokens] == ["id", "==", "?", "while"]
+    assert [t.offset for t in tokens] == [0, 3, 6, 8]
+    assert tokens[0].id == lex.terminal_ids["id"]
+    assert tokens[2].id == lexer.LEXICAL_ERROR
+
+
+def test_scan_from_position(lex):
+    text = "id = id + id"
+    assert list(lex.scan(text, pos=5)) == [t for t in lex.scan(text) if t.offset >= 5]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64])
+def test_scan_chunks_matches_scan(lex, size):
+    for text in _texts(300, seed=size):
+        chunks = (text[i:i + size] for i in range(0, len(text), size))
+        assert list(lex.scan_chunks(chunks)) == list(lex.scan(text)), text
+
+
+def test_scan_bytes_matches_scan(lex):
+    for text in _texts(300, seed=0):
+        data = text.encode()
+        expected = [
+            t._replace(offset=len(text[:t.offset].encode()))
+            for t in lex.scan(text)
+        ]
+        assert list(lex.scan_bytes(data)) == expected, text
+
+
+# ---------------------------------------------------------------------------
+# Token fora da gramática (id LEXICAL_ERROR): erro léxico em todos os drivers
+# ---------------------------------------------------------------------------
+
+def test_lexical_error_in_every_driver():
+    grammar = grammar_formatter("E -> T E2. E2 -> + T E2 | . T -> id | ( E ).")
+    tables   = lr_table.build_lr_tables(grammar, "lalr1")
+    compiled = compiled_table.compile_tables(tables.action_table, tables.goto_table)
+    packed   = packed_table.pack_tables(compiled)
+    lex      = lexer.build_lexer(compiled.terminals, compiled.terminal_ids)
+    ll1      = ll_table.build_ll1_table(grammar)
+
+    text = "id + ? id"
+    tokens, ids = lex.tokenize(text)
+    assert ids[2] == lexer.LEXICAL_ERROR
+    expected = [{"index": 2, "lexeme": "?", "message": LEXICAL_ERROR_MESSAGE}]
+
+    assert bottom_up_algorithm(tables.action_table, tables.goto_table,
+                               tokens, "full")[1] == expected
+    assert top_down_algorithm(ll1.ll1_table, ll1.start_symbol, tokens,
+                              ll1.follow_table, "full")[1] == expected
+    for runtime in (compiled, packed):
+        assert packed_table.parse_tables(runtime, tokens, ids=ids)["errors"] == expected
+        streamed = packed_table.parse_stream(runtime, lex.scan(text), len(text))
+        assert streamed["errors"] == [dict(expected[0], offset=5)]
+    session = ParseSession(compiled, lex, text)
+    assert session.errors() == [dict(expected[0], offset=5)]
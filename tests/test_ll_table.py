@@ -0,0 +1,29 @@
+# ---------------------------------------------------------------------------
+# Geração da tabela LL(1)
+# ---------------------------------------------------------------------------
+
+from app import ll_table
+from app.utils import grammar_formatter
+
+
+def test_ll1_table():
+    grammar = grammar_formatter("E -> T E2. E2 -> + T E2 | . T -> id | ( E ).")
+    table = ll_table.build_ll1_table(grammar)
+
+    assert table.conflicts == []
+    assert table.start_symbol == "E"
+    assert table.ll1_table == {
+        "+":  {"E": "ERRO!", "E2": "E2 -> + T E2", "T": "ERRO!"},
+        "id": {"E": "E -> T E2", "E2": "ERRO!", "T": "T -> id"},
+        "(":  {"E": "E -> T E2", "E2": "ERRO!", "T": "T -> ( E )"},
+        ")":  {"E": "ERRO!", "E2": "E2 -> ", "T": "ERRO!"},
+        "$":  {"E": "ERRO!", "E2": "E2 -> ", "T": "ERRO!"},
+    }
+    assert table.follow_table == {
+        "E": [")", "$"], "E2": [")", "$"], "T": [")", "+", "$"],
+    }
+
+
+def test_ll1_conflicts():
+    table = ll_table.build_ll1_table(grammar_formatter("E -> E + id | id."))
+    assert table.conflicts
@@ -0,0 +1,72 @@
+# ---------------------------------------------------------------------------
+# Geração das tabelas LR(0) / SLR(1) / LALR(1) / LR(1)
+# ---------------------------------------------------------------------------
+#
+# Gramáticas clássicas que separam as classes: cada uma é da sua classe e
+# de todas as maiores, e tem conflito em todas as menores.
+# ---------------------------------------------------------------------------
+
+import pytest
+
+from app import lr_table
+from app.utils import grammar_formatter
+
+LR_GRAMMARS = {
+    "lr0":   "S -> ( S ) | x.",
+    "slr1":  "E -> T + E | T. T -> id.",
+    "lalr1": "S -> L = R | R. L -> * R | id. R -> L.",
+    "lr1":   "S -> a A d | b B d | a B e | b A e. A -> c. B -> c.",
+}
+
+
+@pytest.mark.parametrize("grammar_class", lr_table.ANALYSIS_TYPES)
+@pytest.mark.parametrize("analysis_type", lr_table.ANALYSIS_TYPES)
+def test_lr_conflicts_by_class(grammar_class, analysis_type):
+    grammar = grammar_formatter(LR_GRAMMARS[grammar_class])
+    conflicts = lr_table.build_lr_tables(grammar, analysis_type).conflicts
+
+    order = lr_table.ANALYSIS_TYPES
+    if order.index(analysis_type) >= order.index(grammar_class):
+        assert conflicts == []
+    else:
+        assert conflicts
+
+
+def test_lr0_table():
+    tables = lr_table.build_lr_tables(grammar_formatter(LR_GRAMMARS["lr0"]), "lr0")
+
+    assert tables.action_table == {
+        "(": {1: "EMPILHAR[ 2 ]", 2: "ERRO!", 3: "EMPILHAR[ 2 ]",
+              4: "REDUZIR[ S -> x ]", 5: "ERRO!", 6: "REDUZIR[ S -> ( S ) ]"},
+        ")": {1: "ERRO!", 2: "ERRO!", 3: "ERRO!",
+              4: "REDUZIR[ S -> x ]", 5: "EMPILHAR[ 5 ]", 6: "REDUZIR[ S -> ( S ) ]"},
+        "x": {1: "EMPILHAR[ 3 ]", 2: "ERRO!", 3: "EMPILHAR[ 3 ]",
+              4: "REDUZIR[ S -> x ]", 5: "ERRO!", 6: "REDUZIR[ S -> ( S ) ]"},
+        "$": {1: "ERRO!", 2: "ACEITO", 3: "ERRO!",
+              4: "REDUZIR[ S -> x ]", 5: "ERRO!", 6: "REDUZIR[ S -> ( S ) ]"},
+    }
+    assert tables.goto_table == {
+        "S": {1: "EMPILHAR[ 1 ]", 2: " ", 3: "EMPILHAR[ 4 ]",
+              4: " ", 5: " ", 6: " "},
+    }
+
+
+def test_slr1_resolves_lr0_conflict_with_follow():
+    grammar = grammar_formatter(LR_GRAMMARS["slr1"])
+    lr0  = lr_table.build_lr_tables(grammar, "lr0")
+    slr1 = lr_table.build_lr_tables(grammar, "slr1")
+
+    assert lr0.conflicts == [
+        "Estado 2, símbolo '+': EMPILHAR[ 4 ] / REDUZIR[ E -> T ]"
+    ]
+    # FOLLOW(E) = {$}: a redução E -> T só fica na coluna '$'
+    assert slr1.action_table["+"][3] == "EMPILHAR[ 4 ]"
+    assert slr1.action_table["$"][3] == "REDUZIR[ E -> T ]"
+
+
+def test_lalr1_merges_lr1_states():
+    grammar = grammar_formatter(LR_GRAMMARS["lalr1"])
+    lalr1 = lr_table.build_lr_tables(grammar, "lalr1")
+    lr1   = lr_table.build_lr_tables(grammar, "lr1")
+
+    assert len(lalr1.action_table["$"]) < len(lr1.action_table["$"])
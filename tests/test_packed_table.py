@@ -0,0 +1,70 @@
+# ---------------------------------------------------------------------------
+# Tabelas compactadas: célula a célula iguais à tabela compilada, e o
+# driver parse_packed com os mesmos resultados de parse_compiled
+# ---------------------------------------------------------------------------
+
+import random
+
+import pytest
+
+from app import compiled_table, lexer, lr_table, packed_table
+from app.utils import grammar_formatter
+
+# várias com produções vazias (linhas/colunas que começam longe da 1ª posição)
+GRAMMARS = [
+    "S -> ( S ) S | .",
+    "S -> A B. A -> a | . B -> b B | .",
+    "S -> A S b | . A -> a A | .",
+    "S -> S ; A | A. A -> id = E | id. E -> E + id | id.",
+    "E -> E + T | T. T -> T * F | F. F -> ( E ) | id.",
+]
+
+PIECES = ["id", "=", "+", "*", ";", "(", ")", "a", "b", "?", " "]
+
+
+def _tables(grammar: str, analysis_type: str):
+    tables   = lr_table.build_lr_tables(grammar_formatter(grammar), analysis_type)
+    compiled = compiled_table.compile_tables(tables.action_table, tables.goto_table)
+    return compiled, packed_table.pack_tables(compiled)
+
+
+@pytest.mark.parametrize("analysis_type", lr_table.ANALYSIS_TYPES)
+@pytest.mark.parametrize("grammar", GRAMMARS)
+def test_packed_cells_match_compiled(grammar, analysis_type):
+    compiled, packed = _tables(grammar, analysis_type)
+    n_t, n_nt = len(compiled.terminals), len(compiled.nonterminals)
+
+    assert min(packed.base) >= 0 and min(packed.goto_base) >= 0
+    for state in range(compiled.n_states):
+        for tid in range(n_t):
+            assert (packed_table.packed_action(packed, state, tid)
+                    == compiled.action[state * n_t + tid]), (state, tid)
+        for ntid in range(n_nt):
+            target = compiled.goto[state * n_nt + ntid]
+            if target >= 0:                # células vazias caem no padrão
+                assert packed_table.packed_goto(packed, state, ntid) == target
+
+
+def test_negative_base_is_not_stored():
+    # tabela compactada antes de base >= 0: índices negativos contam como livres
+    compiled, packed = _tables(GRAMMARS[0], "slr1")
+    ntid = compiled.nonterminal_ids["S"]
+    goto_base = packed.goto_base[:]
+    goto_base[ntid] -= len(packed.goto_check)
+    stale = packed._replace(goto_base=goto_base)
+
+    assert packed_table.packed_goto(stale, 0, ntid) == packed.goto_default[ntid]
+
+
+@pytest.mark.parametrize("analysis_type", ["slr1", "lalr1", "lr1"])
+@pytest.mark.parametrize("grammar", GRAMMARS)
+def test_packed_driver_matches_compiled(grammar, analysis_type):
+    compiled, packed = _tables(grammar, analysis_type)
+    lex = lexer.build_lexer(compiled.terminals, compiled.terminal_ids)
+    rng = random.Random(len(grammar))
+
+    for _ in range(200):
+        text = " ".join(rng.choice(PIECES) for _ in range(rng.randint(0, 12)))
+        tokens, ids = lex.tokenize(text)
+        assert (packed_table.parse_packed(packed, tokens, ids=ids)
+                == compiled_table.parse_compiled(compiled, tokens, ids=ids)), text
@@ -0,0 +1,81 @@
+# ---------------------------------------------------------------------------
+# Store compartilhado (arquivos mapeados) e tabelas derivadas das tabelas do
+# driver rápido
+# ---------------------------------------------------------------------------
+
+import os
+
+import pytest
+
+from app import compiled_table, error_recovery, lr_table, packed_table
+from app.shared_tables import SharedTableStore, _map_table
+from app.utils import grammar_formatter
+
+GRAMMAR = grammar_formatter("S -> S ; A | A. A -> id = E | id. E -> E + id | id.")
+
+
+def _compile(grammar, analysis_type):
+    tables = lr_table.build_lr_tables(grammar, analysis_type)
+    return compiled_table.compile_tables(tables.action_table, tables.goto_table)
+
+
+def _open_fds() -> int:
+    return len(os.listdir("/proc/self/fd"))
+
+
+@pytest.mark.parametrize("kind", ["compiled", "packed"])
+def test_store_round_trip(tmp_path, kind):
+    build = _compile if kind == "compiled" else (
+        lambda g, t: packed_table.pack_tables(_compile(g, t)))
+    store = SharedTableStore(str(tmp_path))
+    table = store.get_or_build(GRAMMAR, "lalr1", kind, build)
+
+    assert store.stats()["built"] == 1
+    assert [name for name in os.listdir(tmp_path) if name.endswith(".lock")] == []
+    expected = build(GRAMMAR, "lalr1")
+    for name, value in zip(table._fields, table):
+        if isinstance(value, memoryview):
+            value = value.tolist()
+            assert value == list(getattr(expected, name)), name
+        else:
+            assert value == getattr(expected, name), name
+
+
+def test_resolve_maps_once_per_process(tmp_path):
+    store = SharedTableStore(str(tmp_path))
+    ref = store.reference(store.get_or_build(GRAMMAR, "lalr1", "compiled", _compile))
+
+    worker = SharedTableStore(str(tmp_path))    # outro processo (ex.: o pool)
+    first = worker.resolve(ref)
+
+    assert worker.resolve(ref) is first
+    assert worker.stats()["mapped"] == 1
+
+
+def test_invalid_file_is_closed(tmp_path):
+    path = tmp_path / "bad.tbl"
+    path.write_bytes(b"NOTATBL!" + b"\0" * 64)
+    before = _open_fds()
+
+    with pytest.raises(ValueError) as raised:     # o traceback segura os frames
+        _map_table(str(path), "compiled")
+    assert _open_fds() == before
+    del raised
+
+
+def test_lru_releases_mappings(tmp_path):
+    store = SharedTableStore(str(tmp_path), maxsize=2)
+    for analysis_type in lr_table.ANALYSIS_TYPES:
+        store.get_or_build(GRAMMAR, analysis_type, "compiled", _compile)
+
+    assert store.stats()["mapped"] == 2
+    assert store.stats()["released"] == 2
+
+
+def test_recovery_table_from_runtime_tables():
+    tables   = lr_table.build_lr_tables(GRAMMAR, "lalr1")
+    compiled = compiled_table.compile_tables(tables.action_table, tables.goto_table)
+    expected = error_recovery.build_recovery_table(tables.action_table)
+
+    assert packed_table.recovery_table(compiled) == expected
+    assert packed_table.recovery_table(packed_table.pack_tables(compiled)) == expected
@@ -0,0 +1,55 @@
+# ---------------------------------------------------------------------------
+# parse_stream (tokens sob demanda): mesmos resultados de parse_tables, com
+# a posição de cada erro na entrada
+# ---------------------------------------------------------------------------
+
+import random
+
+import pytest
+
+from app import compiled_table, lexer, lr_table, packed_table
+from app.utils import grammar_formatter
+
+GRAMMARS = [
+    "S -> S ; A | A. A -> id = E | id. E -> E + id | id.",
+    "E -> E + T | T. T -> T * F | F. F -> ( E ) | id.",
+    "S -> ( S ) S | .",
+]
+
+PIECES = ["id", "=", "+", "*", ";", "(", ")", "?", " ", "é"]
+
+
+@pytest.mark.parametrize("packed", [False, True])
+@pytest.mark.parametrize("grammar", GRAMMARS)
+def test_stream_matches_parse_tables(grammar, packed):
+    tables = lr_table.build_lr_tables(grammar_formatter(grammar), "lalr1")
+    runtime = compiled_table.compile_tables(tables.action_table, tables.goto_table)
+    if packed:
+        runtime = packed_table.pack_tables(runtime)
+    lex = lexer.build_lexer(runtime.terminals, runtime.terminal_ids)
+    rng = random.Random(len(grammar))
+
+    for _ in range(200):
+        text = " ".join(rng.choice(PIECES) for _ in range(rng.randint(0, 12)))
+        tokens, ids = lex.tokenize(text)
+        expected = packed_table.parse_tables(runtime, tokens, ids=ids)
+
+        data = text.encode()
+        streamed = packed_table.parse_stream(runtime, lex.scan_bytes(data), len(data))
+        starts = [t.offset for t in lex.scan_bytes(data)] + [len(data)]
+        for error in streamed["errors"]:
+            assert error.pop("offset") == starts[error["index"]]
+        assert streamed == expected, text
+
+
+def test_stream_max_errors():
+    tables = lr_table.build_lr_tables(grammar_formatter(GRAMMARS[0]), "lalr1")
+    runtime = compiled_table.compile_tables(tables.action_table, tables.goto_table)
+    lex = lexer.build_lexer(runtime.terminals, runtime.terminal_ids)
+
+    text = "id = = = = id"
+    result = packed_table.parse_stream(runtime, lex.scan(text), len(text),
+                                       max_errors=2)
+    assert not result["accepted"]
+    assert [e["index"] for e in result["errors"]] == [2, 3, 4]
+    assert result["errors"][-1]["message"] == "Análise interrompida: mais de 2 erros."
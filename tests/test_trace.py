@@ -0,0 +1,83 @@
+# ---------------------------------------------------------------------------
+# expand_trace: o trace "full" (pilha em deltas) contra os instantâneos
+# completos – pilha e fita em cada passo – do formato original
+# ---------------------------------------------------------------------------
+
+from app import ll_table, lr_table
+from app.parsing_algorithm import (
+    bottom_up_algorithm, expand_trace, top_down_algorithm,
+)
+from app.utils import grammar_formatter
+
+
+def _snapshots(steps):
+    return [(step["stepByStep"][0], step["stack"], step["pointer"])
+            for step in expand_trace(steps)]
+
+
+def test_expand_trace_lr():
+    tables = lr_table.build_lr_tables(grammar_formatter("S -> ( S ) | x."), "slr1")
+    steps, errors = bottom_up_algorithm(tables.action_table, tables.goto_table,
+                                        "( x )")
+
+    assert errors == []
+    assert _snapshots(steps) == [
+        ("Inicio da análise", ["0"], 0),
+        ("Recuperação concluída em '('.", ["0"], 0),
+        ("AÇÃO[(, 0] => EMPILHAR[ 2 ]", ["0"], 0),
+        ("Recuperação concluída em 'x'.", ["2", "(", "0"], 1),
+        ("AÇÃO[x, 2] => EMPILHAR[ 3 ]", ["2", "(", "0"], 1),
+        ("Recuperação concluída em ')'.", ["3", "x", "2", "(", "0"], 2),
+        ("AÇÃO[), 3] => REDUZIR[ S -> x ]", ["3", "x", "2", "(", "0"], 2),
+        ("Recuperação concluída em ')'.", ["4", "S", "2", "(", "0"], 2),
+        ("AÇÃO[), 4] => EMPILHAR[ 5 ]", ["4", "S", "2", "(", "0"], 2),
+        ("Recuperação concluída em '$'.", ["5", ")", "4", "S", "2", "(", "0"], 3),
+        ("AÇÃO[$, 5] => REDUZIR[ S -> ( S ) ]", ["5", ")", "4", "S", "2", "(", "0"], 3),
+        ("Recuperação concluída em '$'.", ["1", "S", "0"], 3),
+        ("AÇÃO[$, 1] => ACEITO", ["1", "S", "0"], 3),
+        ("A entrada foi aceita!", ["1", "S", "0"], 3),
+    ]
+    assert all(step["input"] == ["(", "x", ")", "$"] for step in expand_trace(steps))
+
+
+def test_expand_trace_ll1():
+    table = ll_table.build_ll1_table(
+        grammar_formatter("E -> T E2. E2 -> + T E2 | . T -> id | ( E ).")
+    )
+    steps, errors = top_down_algorithm(table.ll1_table, table.start_symbol,
+                                       "id + id", table.follow_table)
+
+    assert errors == []
+    assert _snapshots(steps) == [
+        ("Inicio da análise", ["E", "$"], 0),
+        ("M[E, id] => E -> T E2", ["T", "E2", "$"], 0),
+        ("M[T, id] => T -> id", ["id", "E2", "$"], 0),
+        ("CASAR 'id'", ["E2", "$"], 1),
+        ("M[E2, +] => E2 -> + T E2", ["+", "T", "E2", "$"], 1),
+        ("CASAR '+'", ["T", "E2", "$"], 2),
+        ("M[T, id] => T -> id", ["id", "E2", "$"], 2),
+        ("CASAR 'id'", ["E2", "$"], 3),
+        ("M[E2, $] => E2 -> ", ["$"], 3),
+        ("A entrada foi aceita!", ["$"], 3),
+    ]
+
+
+def test_expand_trace_keeps_summary_fields():
+    tables = lr_table.build_lr_tables(
+        grammar_formatter("S -> S ; A | A. A -> id = E | id. E -> E + id | id."),
+        "lalr1",
+    )
+    full, full_errors = bottom_up_algorithm(
+        tables.action_table, tables.goto_table, "id = = id ; id +", "full"
+    )
+    summary, summary_errors = bottom_up_algorithm(
+        tables.action_table, tables.goto_table, "id = = id ; id +", "summary"
+    )
+
+    assert full_errors == summary_errors != []
+    assert [{key: step[key] for key in ("stepByStep", "pointer", "stepMarker")}
+            for step in expand_trace(full)] == summary
+
+
+def test_expand_trace_empty():
+    assert expand_trace([]) == []